@@ -0,0 +1,467 @@
+"""
+Análise estática de fluxo de controle e avanço de laços em forma fechada.
+
+GrafoFluxo percorre mem_instr a partir do PC inicial, decodificando com
+Simulador.decode_word (mesmos campos de decode()), e monta o grafo de blocos
+básicos a partir dos desvios j/jal/beq/bne e dos terminadores jr/ret/call/halt.
+Os alvos de jr, ret e call dependem de registradores e ficam sem sucessor
+estático (o bloco é marcado como indireto); jal e call seguem também para a
+instrução seguinte (ponto de retorno). Sobre o grafo calcula os dominadores
+(algoritmo iterativo) e os laços naturais (arestas de volta n → h com h
+dominando n).
+
+AvancadorLacos usa a análise para pular laços contados: um laço natural de um
+único bloco que termina em `bne ra, rb, <início>` e cujo corpo só faz
+aritmética de registradores. O corpo é executado simbolicamente uma vez, com
+cada registrador como combinação afim dos valores no início da volta. Cada
+registrador escrito precisa cair em uma das classes:
+- indução:     r = r + d                   (d só depende de invariantes)
+- acumulador:  r = r + c + Σ a·indução     (soma de progressão aritmética)
+- derivado:    r = c + Σ a·indução         (valor da última volta)
+e os operandos do bne devem ser invariantes, induções ou derivados. O número
+de voltas sai da congruência p + q·k ≡ 0 (mod 2^32); o estado final é
+calculado direto, sem iterar, respeitando o limite de passos do run() (se o
+limite acaba antes, avança só as voltas inteiras que cabem). Laços sem saída
+(a congruência não tem solução) também avançam até o limite.
+
+Uso:
+    sim.ativar_avanco_lacos()
+    sim.run(max_steps=None)
+    sim.passos_saltados          # instruções contadas em passos sem serem executadas
+
+    python analise.py programa.asm    # blocos, dominadores e laços
+"""
+import sys
+from math import gcd
+
+MASCARA = 0xFFFFFFFF
+MODULO = 1 << 32
+
+DESVIOS = {'j', 'jal', 'jr', 'beq', 'bne', 'ret', 'call', 'halt'}
+INDIRETOS = {'jr', 'ret', 'call'}
+
+# ops de registrador que o avanço sabe executar simbolicamente
+LINEARES = {'add', 'sub', 'inc', 'dec', 'zeros', 'passa'}
+CONSTANTES = {
+    'xor':      lambda a, b, c: a ^ b,
+    'or':       lambda a, b, c: a | b,
+    'and':      lambda a, b, c: a & b,
+    'mult':     lambda a, b, c: (a * b) & MASCARA,
+    'div':      lambda a, b, c: 0 if b == 0 else (a // b) & MASCARA,
+    'passnota': lambda a, b, c: (~a) & MASCARA,
+    'asl':      lambda a, b, c: (a << 1) & MASCARA,
+    'lsl':      lambda a, b, c: (a << 1) & MASCARA,
+    'asr':      lambda a, b, c: a >> 1,
+    'lsr':      lambda a, b, c: a >> 1,
+}
+
+
+class BlocoBasico:
+    def __init__(self, inicio):
+        self.inicio = inicio
+        self.instrucoes = []     # (pc, op, ra, rb, rc, addr)
+        self.sucessores = []
+        self.predecessores = []
+        self.indireto = False    # termina em jr/ret/call: sucessor depende de registrador
+
+    @property
+    def fim(self):
+        return self.instrucoes[-1][0] if self.instrucoes else self.inicio
+
+    def __repr__(self):
+        return f"BlocoBasico({self.inicio}..{self.fim} -> {self.sucessores})"
+
+
+class LacoNatural:
+    def __init__(self, cabecalho, corpo, origens):
+        self.cabecalho = cabecalho   # início do bloco cabeçalho
+        self.corpo = corpo           # inícios dos blocos do laço, ordenados
+        self.origens = origens       # blocos com aresta de volta para o cabeçalho
+
+    def __repr__(self):
+        return f"LacoNatural(cabecalho={self.cabecalho}, corpo={self.corpo})"
+
+
+class GrafoFluxo:
+    def __init__(self, sim, entrada=None):
+        self.sim = sim
+        self.base = sim.base_adress
+        self.entrada = sim.pc if entrada is None else entrada
+        self.blocos = {}    # início -> BlocoBasico
+        self._decodificadas = {}
+        self._construir()
+
+    def _decodificar(self, pc):
+        if pc not in self._decodificadas:
+            try:
+                self._decodificadas[pc] = self.sim.decode_word(self.sim.mem_instr[pc])
+            except (ValueError, IndexError):
+                self._decodificadas[pc] = None
+        return self._decodificadas[pc]
+
+    def _sucessores(self, pc, op, addr):
+        if op == 'j':
+            return [self.base + addr]
+        if op == 'jal':
+            return [self.base + addr, pc + 1]
+        if op in ('beq', 'bne'):
+            return [self.base + addr, pc + 1]
+        if op == 'call':
+            return [pc + 1]
+        if op in ('jr', 'ret', 'halt'):
+            return []
+        return [pc + 1]
+
+    def _construir(self):
+        tamanho = len(self.sim.mem_instr)
+        # 1) instruções alcançáveis e líderes (inícios de bloco)
+        lideres = {self.entrada}
+        vistos = set()
+        pendentes = [self.entrada]
+        while pendentes:
+            pc = pendentes.pop()
+            if pc in vistos or not 0 <= pc < tamanho:
+                continue
+            vistos.add(pc)
+            dec = self._decodificar(pc)
+            if dec is None:
+                continue
+            _, op, _, _, _, addr = dec
+            sucessores = self._sucessores(pc, op, addr)
+            if op in DESVIOS:
+                lideres.update(s for s in sucessores if 0 <= s < tamanho)
+            pendentes.extend(sucessores)
+
+        # 2) blocos: de cada líder até um desvio ou o próximo líder
+        for inicio in sorted(lideres & vistos):
+            bloco = BlocoBasico(inicio)
+            pc = inicio
+            while pc in vistos:
+                dec = self._decodificar(pc)
+                if dec is None:
+                    break
+                _, op, ra, rb, rc, addr = dec
+                bloco.instrucoes.append((pc, op, ra, rb, rc, addr))
+                if op in DESVIOS:
+                    bloco.sucessores = [s for s in self._sucessores(pc, op, addr) if s in vistos]
+                    bloco.indireto = op in INDIRETOS
+                    break
+                pc += 1
+                if pc in lideres:
+                    bloco.sucessores = [pc]
+                    break
+            self.blocos[inicio] = bloco
+
+        for bloco in self.blocos.values():
+            bloco.sucessores = [s for s in dict.fromkeys(bloco.sucessores) if s in self.blocos]
+            for s in bloco.sucessores:
+                self.blocos[s].predecessores.append(bloco.inicio)
+
+    def _pos_ordem_reversa(self):
+        ordem, visitados = [], set()
+        pilha = [(self.entrada, iter(self.blocos[self.entrada].sucessores))] if self.entrada in self.blocos else []
+        if pilha:
+            visitados.add(self.entrada)
+        while pilha:
+            no, filhos = pilha[-1]
+            for filho in filhos:
+                if filho not in visitados:
+                    visitados.add(filho)
+                    pilha.append((filho, iter(self.blocos[filho].sucessores)))
+                    break
+            else:
+                ordem.append(no)
+                pilha.pop()
+        return ordem[::-1]
+
+    def dominadores(self):
+        """{início do bloco: conjunto dos blocos que o dominam (inclui ele mesmo)}."""
+        ordem = self._pos_ordem_reversa()
+        todos = set(ordem)
+        dom = {b: set(todos) for b in ordem}
+        if ordem:
+            dom[self.entrada] = {self.entrada}
+        mudou = True
+        while mudou:
+            mudou = False
+            for b in ordem[1:]:
+                preds = [dom[p] for p in self.blocos[b].predecessores if p in dom]
+                novo = set.intersection(*preds) if preds else set()
+                novo.add(b)
+                if novo != dom[b]:
+                    dom[b] = novo
+                    mudou = True
+        return dom
+
+    def lacos_naturais(self):
+        """Laços naturais, um por cabeçalho (arestas de volta para o mesmo cabeçalho são unidas)."""
+        dom = self.dominadores()
+        origens = {}
+        for b in dom:
+            for s in self.blocos[b].sucessores:
+                if s in dom[b]:
+                    origens.setdefault(s, []).append(b)
+
+        lacos = []
+        for cabecalho, fontes in sorted(origens.items()):
+            corpo = {cabecalho}
+            pendentes = [f for f in fontes if f != cabecalho]
+            while pendentes:
+                b = pendentes.pop()
+                if b not in corpo:
+                    corpo.add(b)
+                    pendentes.extend(p for p in self.blocos[b].predecessores if p in dom)
+            lacos.append(LacoNatural(cabecalho, sorted(corpo), sorted(fontes)))
+        return lacos
+
+    def relatorio(self):
+        linhas = [f"=== Blocos básicos (entrada {self.entrada}) ==="]
+        for inicio, bloco in sorted(self.blocos.items()):
+            extra = " (indireto)" if bloco.indireto else ""
+            linhas.append(f"{inicio:>6}..{bloco.fim:<6} -> {bloco.sucessores}{extra}")
+        linhas.append("=== Dominadores imediatos ===")
+        dom = self.dominadores()
+        for b in sorted(dom):
+            estritos = dom[b] - {b}
+            # o dominador imediato é o estrito dominado por todos os outros estritos
+            imediato = max(estritos, key=lambda d: len(dom[d]), default=None)
+            linhas.append(f"{b:>6}: {imediato}")
+        linhas.append("=== Laços naturais ===")
+        for laco in self.lacos_naturais():
+            linhas.append(f"cabeçalho {laco.cabecalho}: blocos {laco.corpo}")
+        return "\n".join(linhas)
+
+
+# ----------------------------------------------------------------------
+# Avanço de laços em forma fechada
+# ----------------------------------------------------------------------
+
+def _soma(x, y, fator=1):
+    """x + fator·y para expressões afins {símbolo: coeficiente, None: constante}."""
+    r = dict(x)
+    for k, v in y.items():
+        r[k] = r.get(k, 0) + fator * v
+    return {k: v for k, v in r.items() if v % MODULO}
+
+
+class FormaFechada:
+    """
+    Resumo simbólico de uma volta de um laço de bloco único terminado em bne.
+    `fim[r]` é o valor de r no fim da volta como expressão afim dos valores no
+    início da volta ({registrador: coeficiente, None: constante}).
+    """
+
+    def __init__(self, inicio, saida, n_instrucoes, fim, ra, rb):
+        self.inicio = inicio
+        self.saida = saida
+        self.n_instrucoes = n_instrucoes
+        self.fim = fim
+        self.ra, self.rb = ra, rb
+
+        escritos = set(fim)
+        self.inducoes = {}      # r -> expressão do passo d
+        self.acumuladores = {}  # r -> expressão do incremento (sem o próprio r)
+        self.derivados = {}     # r -> expressão
+        for r, expr in fim.items():
+            outros = {k: v for k, v in expr.items() if k is not None and k != r}
+            if expr.get(r, 0) % MODULO == 1 and not any(k in escritos for k in outros):
+                self.inducoes[r] = {k: v for k, v in expr.items() if k != r}
+        for r, expr in fim.items():
+            if r in self.inducoes:
+                continue
+            proprio = expr.get(r, 0) % MODULO
+            outros = [k for k in expr if k is not None and k != r]
+            if any(k in escritos and k not in self.inducoes for k in outros):
+                raise ValueError(f"r{r} depende de registrador não linear no laço")
+            incremento = {k: v for k, v in expr.items() if k != r}
+            if proprio == 1:
+                self.acumuladores[r] = incremento
+            elif proprio == 0:
+                self.derivados[r] = incremento
+            else:
+                raise ValueError(f"r{r} não é indução nem acumulação")
+        for r in (ra, rb):
+            if r in self.acumuladores:
+                raise ValueError("condição do bne depende de acumulador")
+
+    def _afim(self, expr, reg):
+        """Avalia expr (com induções no início da volta k) como (p, q): p + q·k."""
+        p = q = 0
+        for k, v in expr.items():
+            if k is None:
+                p += v
+            elif k in self.inducoes:
+                p += v * reg[k]
+                q += v * self._passo[k]
+            else:
+                p += v * reg[k]
+        return p % MODULO, q % MODULO
+
+    def _no_fim(self, r, reg):
+        """Valor de r no fim da volta k como (p, q)."""
+        if r in self.inducoes:
+            d = self._passo[r]
+            return (reg[r] + d) % MODULO, d
+        if r in self.derivados:
+            return self._afim(self.derivados[r], reg)
+        return reg[r], 0
+
+    def avancar(self, sim, restante):
+        """
+        Aplica as voltas inteiras que cabem em `restante` passos (todas até a
+        saída, se couberem; restante None = sem limite). Retorna o número de
+        instruções avançadas (0 = não avançou).
+        """
+        reg = sim.reg
+        self._passo = {r: self._afim(d, reg)[0] for r, d in self.inducoes.items()}
+
+        pa, qa = self._no_fim(self.ra, reg)
+        pb, qb = self._no_fim(self.rb, reg)
+        p, q = (pa - pb) % MODULO, (qa - qb) % MODULO
+        voltas = _primeira_raiz(p, q)   # bne sai na volta k em que p + q·k ≡ 0
+        if restante is None:
+            if voltas is None:
+                return 0  # o laço não sai: sem limite não há voltas a contar
+            limite = voltas + 1
+        else:
+            limite = restante // self.n_instrucoes
+        if voltas is None or voltas + 1 > limite:
+            n, sai = limite, False
+        else:
+            n, sai = voltas + 1, True
+        if n <= 0:
+            return 0
+
+        novos = {}
+        for r in self.inducoes:
+            novos[r] = reg[r] + self._passo[r] * n
+        for r, incremento in self.acumuladores.items():
+            pi, qi = self._afim(incremento, reg)
+            novos[r] = reg[r] + n * pi + qi * (n * (n - 1) // 2)
+        for r, expr in self.derivados.items():
+            pd, qd = self._afim(expr, reg)
+            novos[r] = pd + qd * (n - 1)
+        for r, valor in novos.items():
+            reg[r] = valor & MASCARA
+        sim.pc = self.saida if sai else self.inicio
+        return n * self.n_instrucoes
+
+
+def _primeira_raiz(p, q):
+    """Menor k >= 0 com p + q·k ≡ 0 (mod 2^32), ou None se não existe."""
+    if p == 0:
+        return 0
+    g = gcd(q, MODULO)
+    if q == 0 or (-p) % g:
+        return None
+    m = MODULO // g
+    return ((-p) % MODULO // g) * pow(q // g, -1, m) % m
+
+
+def forma_fechada(sim, bloco):
+    """FormaFechada de um bloco que é laço de si mesmo via bne, ou None se não se aplica."""
+    instrucoes = bloco.instrucoes
+    if not instrucoes:
+        return None
+    pc_bne, op, ra, rb, _, addr = instrucoes[-1]
+    if op != 'bne' or sim.base_adress + addr != bloco.inicio or ra >= 32 or rb >= 32:
+        return None
+
+    valores = {}   # r -> expressão afim; ausente = valor do início da volta
+    def ler(r):
+        return valores.get(r, {r: 1})
+
+    for _, op, ra_i, rb_i, rc, _ in instrucoes[:-1]:
+        if max(ra_i, rb_i, rc) >= 32 and op not in ('lcl', 'lch'):
+            return None
+        if op == 'add':
+            valores[rc] = _soma(ler(ra_i), ler(rb_i))
+        elif op == 'sub':
+            valores[rc] = _soma(ler(ra_i), ler(rb_i), -1)
+        elif op == 'inc':
+            valores[rc] = _soma(ler(rc), {None: 1})
+        elif op == 'dec':
+            valores[rc] = _soma(ler(rc), {None: -1})
+        elif op == 'zeros':
+            valores[rc] = {}
+        elif op == 'passa':
+            valores[rc] = ler(ra_i)
+        elif op in ('lcl', 'lch'):
+            if rc >= 32:
+                return None
+            atual = ler(rc)
+            if any(k is not None for k in atual):
+                return None  # só sobre valor constante
+            c = atual.get(None, 0) % MODULO
+            const16 = (ra_i << 8) | rb_i
+            novo = (c & 0xFFFF0000) | const16 if op == 'lcl' else (const16 << 16) | (c & 0xFFFF)
+            valores[rc] = {None: novo} if novo else {}
+        elif op in CONSTANTES:
+            a, b = ler(ra_i), ler(rb_i)
+            if any(k is not None for k in a) or any(k is not None for k in b):
+                return None
+            novo = CONSTANTES[op](a.get(None, 0) % MODULO, b.get(None, 0) % MODULO, None)
+            valores[rc] = {None: novo} if novo else {}
+        else:
+            return None  # memória, desvio ou op desconhecida
+
+    fim = {r: {k: v % MODULO for k, v in expr.items()} for r, expr in valores.items()}
+    try:
+        return FormaFechada(bloco.inicio, pc_bne + 1, len(instrucoes), fim, ra, rb)
+    except ValueError:
+        return None
+
+
+class AvancadorLacos:
+    """Laços avançáveis do programa de `sim`, indexados pelo PC do cabeçalho."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self._lacos = None
+
+    def invalidar(self):
+        """Descarta a análise (a memória de instruções mudou)."""
+        self._lacos = None
+
+    def lacos(self):
+        if self._lacos is None:
+            sim = self.sim
+            grafo = GrafoFluxo(sim, sim.base_adress)
+            self._lacos = {}
+            for laco in grafo.lacos_naturais():
+                if laco.corpo == [laco.cabecalho]:
+                    forma = forma_fechada(sim, grafo.blocos[laco.cabecalho])
+                    if forma is not None:
+                        self._lacos[laco.cabecalho] = forma
+        return self._lacos
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python analise.py <programa.asm|.bin|.uobj>")
+        return
+    from interpretador import Interpretador
+    from simulador import Simulador
+
+    caminho = sys.argv[1]
+    interp = Interpretador(verbose=False)
+    if caminho.lower().endswith('.uobj'):
+        interp.carregar_objeto(caminho)
+    else:
+        with open(caminho, 'r') as f:
+            texto = f.read()
+        if caminho.lower().endswith('.asm'):
+            interp.carregar_asm(texto)
+        else:
+            interp.carregar_arquivo(texto)
+    mem_info = interp.exportar_memoria()
+    sim = Simulador(mem_info['mem_instr'], mem_info['address_start'])
+    print(GrafoFluxo(sim).relatorio())
+    print("=== Laços avançáveis em forma fechada ===")
+    for inicio, forma in sorted(AvancadorLacos(sim).lacos().items()):
+        print(f"{inicio}: induções {sorted(forma.inducoes)}, acumuladores {sorted(forma.acumuladores)}, "
+              f"derivados {sorted(forma.derivados)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# benchmark.py
+"""
+Suíte de regressão e desempenho do simulador UFLA-RISC.
+
+Para cada programa de testes/ (teste*.asm) e para kernels sintéticos maiores
+(laço, memória, chamadas com jal/jr, pilha com push), em cada motor de execução:
+- monta o assembly (tempo de montagem), carrega na memória e cria o Simulador
+  (tempo de carga) e executa até o halt (tempo de execução, instruções/s);
+- confere registradores e memória de dados finais com o esperado: para os
+  programas de testes/ o esperado vem do dump final capturado em
+  teste*_output.txt; para os kernels, dos valores calculados em KERNELS.
+
+Os resultados podem ser gravados em JSON e comparados com uma execução
+anterior para detectar regressões de desempenho.
+
+Uso:
+    python benchmark.py --saida base.json
+    python benchmark.py --comparar base.json --tolerancia 0.15
+    python benchmark.py --engines despacho blocos --escala 4 --repeticoes 5
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+
+from interpretador import Interpretador
+from simulador import Simulador
+
+DIRETORIO_TESTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'testes')
+PASSOS_MINIMOS_COMPARACAO = 10_000   # abaixo disso o tempo medido é dominado por ruído
+
+
+def ler_esperado(caminho):
+    """
+    Extrai registradores e memória de dados do dump final de uma saída capturada
+    (seções "=== Registradores ===" e "=== Memória de Dados (não zero) ===").
+    """
+    registradores = {}
+    memoria = {}
+    secao = None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if linha.startswith('=== Registradores'):
+                secao, registradores = 'reg', {}
+            elif linha.startswith('=== Memória de Dados'):
+                secao, memoria = 'mem', {}
+            elif secao and ':' in linha and linha.endswith(')'):
+                chave, valor = linha.split(':', 1)
+                valor = int(valor.rsplit('(', 1)[1].rstrip(')'))
+                if secao == 'reg' and chave.startswith('R'):
+                    registradores[int(chave[1:])] = valor
+                elif secao == 'mem' and chave.isdigit():
+                    memoria[int(chave)] = valor
+            elif linha:
+                secao = None
+    return {'registradores': registradores, 'memoria': memoria}
+
+
+# ----------------------------------------------------------------------
+# Kernels sintéticos: (assembly, esperado) em função da escala
+# ----------------------------------------------------------------------
+
+def _constante(reg, valor):
+    return f"lch r{reg}, {valor >> 16}\nlcl r{reg}, {valor & 0xFFFF}\n"
+
+
+def kernel_laco(escala):
+    """Laço apertado de soma: add + bne."""
+    n = 200_000 * escala
+    asm = "address 0\nzeros r0\nlcl r1, 1\n" + _constante(3, n) + \
+          "add r0, r0, r1\nbne r0, r3, 4\nhalt\n"
+    return asm, {'registradores': {0: n, 1: 1, 3: n}, 'memoria': {}}
+
+
+def kernel_memoria(escala):
+    """Escreve mem[i] = i e depois soma o vetor com load."""
+    n = min(10_000 * escala, 0x7FFF)
+    asm = ("address 0\nzeros r0\nlcl r1, 1\nlcl r3, %d\nzeros r5\n"
+           "store r0, r0\nadd r0, r0, r1\nbne r0, r3, 4\n"
+           "zeros r0\nload r4, r0\nadd r5, r5, r4\nadd r0, r0, r1\nbne r0, r3, 8\nhalt\n") % n
+    esperado = {
+        'registradores': {0: n, 3: n, 4: n - 1, 5: n * (n - 1) // 2 & 0xFFFFFFFF},
+        'memoria': {i: i for i in range(1, n)},
+    }
+    return asm, esperado
+
+
+def kernel_chamadas(escala):
+    """Chamadas de sub-rotina com jal / jr r31."""
+    n = 50_000 * escala
+    asm = ("address 0\nzeros r0\nlcl r1, 1\n" + _constante(3, n) + "zeros r5\n"
+           "jal 9\nadd r0, r0, r1\nbne r0, r3, 5\nhalt\n"
+           "add r5, r5, r1\nadd r5, r5, r1\njr r31\n")
+    return asm, {'registradores': {0: n, 5: 2 * n, 31: 6}, 'memoria': {}}
+
+
+def kernel_pilha(escala):
+    """Empilha valores com push (r31 como ponteiro de pilha)."""
+    n = min(10_000 * escala, 0x7FFF)
+    asm = ("address 0\nzeros r0\nlcl r1, 1\nlcl r3, %d\nlcl r31, %d\n"
+           "push r0\nadd r0, r0, r1\nbne r0, r3, 4\nhalt\n") % (n, n)
+    esperado = {
+        'registradores': {0: n, 31: 0},
+        'memoria': {n - 1 - i: i for i in range(1, n)},
+    }
+    return asm, esperado
+
+
+KERNELS = {
+    'kernel_laco': kernel_laco,
+    'kernel_memoria': kernel_memoria,
+    'kernel_chamadas': kernel_chamadas,
+    'kernel_pilha': kernel_pilha,
+}
+
+
+def listar_casos(diretorio=DIRETORIO_TESTES, escala=1, kernels=True):
+    """Retorna [(nome, assembly, esperado)] dos programas de testes/ e dos kernels."""
+    casos = []
+    for caminho in sorted(glob.glob(os.path.join(diretorio, '*.asm'))):
+        saida = os.path.splitext(caminho)[0] + '_output.txt'
+        if not os.path.exists(saida):
+            continue
+        with open(caminho, 'r', encoding='utf-8') as f:
+            casos.append((os.path.basename(caminho), f.read(), ler_esperado(saida)))
+    if kernels:
+        for nome, kernel in KERNELS.items():
+            asm, esperado = kernel(escala)
+            casos.append((nome, asm, esperado))
+    return casos
+
+
+def conferir(sim, esperado):
+    """Lista de divergências entre o estado final do simulador e o esperado."""
+    divergencias = []
+    for r, valor in sorted(esperado['registradores'].items()):
+        if sim.reg[r] != valor:
+            divergencias.append(f"R{r:02}={sim.reg[r]} (esperado {valor})")
+    memoria = dict(sim.mem_data.itens_nao_zero())
+    if memoria != esperado['memoria']:
+        enderecos = sorted(set(memoria) | set(esperado['memoria']))
+        erradas = [e for e in enderecos if memoria.get(e, 0) != esperado['memoria'].get(e, 0)]
+        divergencias.append(f"memória difere em {len(erradas)} endereço(s), ex.: {erradas[:5]}")
+    return divergencias
+
+
+def medir(nome, asm, esperado, engine, repeticoes=3, max_passos=50_000_000):
+    """Monta, carrega e executa `repeticoes` vezes; guarda o melhor tempo de cada fase."""
+    resultado = {
+        'programa': nome, 'engine': engine, 'passos': 0, 'motivo_parada': None,
+        'tempo_montagem_s': None, 'tempo_carga_s': None, 'tempo_execucao_s': None,
+        'instrucoes_por_s': None, 'correto': False, 'divergencias': [], 'erro': None,
+    }
+    melhores = {'montagem': float('inf'), 'carga': float('inf'), 'execucao': float('inf')}
+    try:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            interp = Interpretador(verbose=False)
+            segmentos = interp.montar(asm)
+            montado = time.perf_counter()
+            interp.carregar_segmentos(segmentos)
+            mem_info = interp.exportar_memoria()
+            sim = Simulador(mem_info['mem_instr'], mem_info['address_start'], engine=engine)
+            carregado = time.perf_counter()
+            sim.run(max_steps=max_passos)
+            fim = time.perf_counter()
+
+            melhores['montagem'] = min(melhores['montagem'], montado - inicio)
+            melhores['carga'] = min(melhores['carga'], carregado - montado)
+            melhores['execucao'] = min(melhores['execucao'], fim - carregado)
+
+        resultado['passos'] = sim.passos
+        resultado['motivo_parada'] = sim.motivo_parada
+        resultado['tempo_montagem_s'] = melhores['montagem']
+        resultado['tempo_carga_s'] = melhores['carga']
+        resultado['tempo_execucao_s'] = melhores['execucao']
+        resultado['instrucoes_por_s'] = sim.passos / melhores['execucao'] if melhores['execucao'] else None
+        resultado['divergencias'] = conferir(sim, esperado)
+        resultado['correto'] = not resultado['divergencias'] and sim.motivo_parada == 'halt'
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+    return resultado
+
+
+def executar_suite(casos, engines=Simulador.ENGINES, repeticoes=3):
+    return [medir(nome, asm, esperado, engine, repeticoes)
+            for nome, asm, esperado in casos for engine in engines]
+
+
+def comparar(resultados, base, tolerancia=0.15):
+    """
+    Compara instruções/s com uma execução anterior (mesmo programa e motor).
+    Retorna [(programa, engine, ips_base, ips_atual)] das quedas maiores que `tolerancia`.
+    Casos com menos de PASSOS_MINIMOS_COMPARACAO instruções não são comparados.
+    """
+    anteriores = {(r['programa'], r['engine']): r for r in base['resultados']}
+    regressoes = []
+    for r in resultados:
+        anterior = anteriores.get((r['programa'], r['engine']))
+        if not anterior or not anterior['instrucoes_por_s'] or not r['instrucoes_por_s']:
+            continue
+        if r['passos'] < PASSOS_MINIMOS_COMPARACAO:
+            continue
+        if r['instrucoes_por_s'] < anterior['instrucoes_por_s'] * (1 - tolerancia):
+            regressoes.append((r['programa'], r['engine'], anterior['instrucoes_por_s'], r['instrucoes_por_s']))
+    return regressoes
+
+
+def relatorio(resultados):
+    linhas = [f"{'programa':<18} {'engine':<9} {'passos':>10} {'montagem':>10} {'carga':>10} "
+              f"{'execução':>10} {'MIPS':>8}  ok"]
+    for r in resultados:
+        if r['erro']:
+            linhas.append(f"{r['programa']:<18} {r['engine']:<9} ERRO: {r['erro']}")
+            continue
+        linhas.append(
+            f"{r['programa']:<18} {r['engine']:<9} {r['passos']:>10} "
+            f"{1e3 * r['tempo_montagem_s']:>8.3f}ms {1e3 * r['tempo_carga_s']:>8.3f}ms "
+            f"{1e3 * r['tempo_execucao_s']:>8.2f}ms {r['instrucoes_por_s'] / 1e6:>8.2f}  "
+            f"{'sim' if r['correto'] else 'NÃO: ' + '; '.join(r['divergencias'])}"
+        )
+    return "\n".join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark e regressão do simulador UFLA-RISC")
+    parser.add_argument("--testes", default=DIRETORIO_TESTES, help="diretório com teste*.asm e *_output.txt")
+    parser.add_argument("--engines", nargs='+', choices=Simulador.ENGINES, default=list(Simulador.ENGINES))
+    parser.add_argument("--escala", type=int, default=1, help="multiplica o tamanho dos kernels sintéticos")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por caso (vale o melhor tempo)")
+    parser.add_argument("--sem-kernels", action="store_true", help="só os programas de testes/")
+    parser.add_argument("--saida", help="grava os resultados em JSON")
+    parser.add_argument("--comparar", metavar="BASE.json", help="compara com resultados anteriores")
+    parser.add_argument("--tolerancia", type=float, default=0.15,
+                        help="queda relativa de instruções/s aceita na comparação (padrão: 0.15)")
+    args = parser.parse_args()
+
+    casos = listar_casos(args.testes, args.escala, not args.sem_kernels)
+    resultados = executar_suite(casos, args.engines, args.repeticoes)
+    print(relatorio(resultados))
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'data': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'escala': args.escala,
+                'resultados': resultados,
+            }, f, indent=2, ensure_ascii=False)
+
+    falhas = [r for r in resultados if not r['correto']]
+    regressoes = []
+    if args.comparar:
+        with open(args.comparar, 'r') as f:
+            regressoes = comparar(resultados, json.load(f), args.tolerancia)
+        for programa, engine, antes, agora in regressoes:
+            print(f"REGRESSÃO {programa} [{engine}]: {antes / 1e6:.2f} → {agora / 1e6:.2f} MIPS")
+
+    if falhas or regressoes:
+        print(f"{len(falhas)} caso(s) incorreto(s), {len(regressoes)} regressão(ões) de desempenho")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Modelo de hierarquia de cache de dados para o UFLA-RISC.
+
+Cada NivelCache é associativo por conjunto, com tamanho e linha medidos em
+palavras, política de substituição ('lru', 'fifo' ou 'aleatorio') e política
+de escrita:
+- 'write_back':    escrita com alocação; a linha fica suja e só desce ao
+                   próximo nível quando é despejada (writeback)
+- 'write_through': toda escrita desce ao próximo nível; falta de escrita não
+                   aloca linha (no-write-allocate)
+
+HierarquiaCache é um monitor do Simulador: antes de cada instrução consulta
+sim.acessos_memoria (load, store, push, call) e passa os acessos pelo L1 e,
+se houver, pelo L2. A memória de dados continua sendo lida e escrita pelo
+simulador; a cache só contabiliza acertos, faltas, despejos, writebacks e o
+custo estimado em ciclos (latência de cada nível e da memória).
+
+Uso:
+    cache = HierarquiaCache(NivelCache('L1', 256, 4, 2), NivelCache('L2', 4096, 8, 4, latencia=10))
+    sim.adicionar_monitor(cache)
+    sim.run(max_steps=100000)
+    print(cache.relatorio())
+"""
+import random
+from collections import OrderedDict
+
+SUBSTITUICOES = ('lru', 'fifo', 'aleatorio')
+ESCRITAS = ('write_back', 'write_through')
+
+
+class NivelCache:
+    def __init__(self, nome, tamanho, linha=4, associatividade=1, substituicao='lru',
+                 escrita='write_back', latencia=1, semente=0):
+        if substituicao not in SUBSTITUICOES:
+            raise ValueError(f"Substituição desconhecida: {substituicao} (use {', '.join(SUBSTITUICOES)})")
+        if escrita not in ESCRITAS:
+            raise ValueError(f"Política de escrita desconhecida: {escrita} (use {', '.join(ESCRITAS)})")
+        if tamanho <= 0 or linha <= 0 or associatividade <= 0:
+            raise ValueError(f"Configuração inválida para {nome}: tamanho ({tamanho}), linha ({linha}) "
+                             f"e associatividade ({associatividade}) devem ser positivos")
+        if tamanho % (linha * associatividade):
+            raise ValueError(f"Configuração inválida para {nome}: tamanho {tamanho} não é múltiplo "
+                             f"de linha ({linha}) × associatividade ({associatividade})")
+
+        self.nome = nome
+        self.tamanho = tamanho
+        self.linha = linha
+        self.associatividade = associatividade
+        self.substituicao = substituicao
+        self.escrita = escrita
+        self.latencia = latencia
+        self.n_conjuntos = tamanho // (linha * associatividade)
+        # cada conjunto: etiqueta -> suja; a ordem do OrderedDict é a ordem de despejo
+        self.conjuntos = [OrderedDict() for _ in range(self.n_conjuntos)]
+        self.proximo = None  # nível seguinte (None = memória de dados)
+        self._aleatorio = random.Random(semente)
+
+        # estatísticas
+        self.leituras = 0
+        self.escritas = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.despejos = 0
+        self.writebacks = 0
+        self.por_pc = {}  # pc -> [acertos, faltas]
+
+    def _despejar(self, conjunto, indice, pc):
+        if self.substituicao == 'aleatorio':
+            etiqueta = self._aleatorio.choice(list(conjunto))
+            suja = conjunto.pop(etiqueta)
+        else:
+            etiqueta, suja = conjunto.popitem(last=False)
+        self.despejos += 1
+        if not suja:
+            return 0
+        self.writebacks += 1
+        endereco = (etiqueta * self.n_conjuntos + indice) * self.linha
+        return self._descer(endereco, True, pc)
+
+    def _descer(self, endereco, escrita, pc):
+        """Repassa o acesso ao próximo nível; retorna o custo em ciclos abaixo deste nível."""
+        if self.proximo is None:
+            return 0
+        return self.proximo.acessar(endereco, escrita, pc)
+
+    def acessar(self, endereco, escrita, pc):
+        """
+        Contabiliza um acesso à palavra `endereco`.
+        Retorna o custo em ciclos: latência deste nível mais a dos níveis abaixo que foram acessados.
+        """
+        bloco = endereco // self.linha
+        indice = bloco % self.n_conjuntos
+        etiqueta = bloco // self.n_conjuntos
+        conjunto = self.conjuntos[indice]
+
+        if escrita:
+            self.escritas += 1
+        else:
+            self.leituras += 1
+        contagem = self.por_pc.setdefault(pc, [0, 0])
+        custo = self.latencia
+
+        if etiqueta in conjunto:
+            self.acertos += 1
+            contagem[0] += 1
+            if self.substituicao == 'lru':
+                conjunto.move_to_end(etiqueta)
+            if escrita:
+                if self.escrita == 'write_back':
+                    conjunto[etiqueta] = True
+                else:
+                    custo += self._descer(endereco, True, pc)
+            return custo
+
+        self.faltas += 1
+        contagem[1] += 1
+
+        if escrita and self.escrita == 'write_through':
+            # no-write-allocate: a escrita só desce
+            return custo + self._descer(endereco, True, pc)
+
+        if len(conjunto) >= self.associatividade:
+            custo += self._despejar(conjunto, indice, pc)
+        custo += self._descer(bloco * self.linha, False, pc)
+        conjunto[etiqueta] = escrita and self.escrita == 'write_back'
+        return custo
+
+    def taxa_acerto(self):
+        total = self.acertos + self.faltas
+        return self.acertos / total if total else 0.0
+
+    def estatisticas(self):
+        return {
+            'nivel': self.nome,
+            'tamanho': self.tamanho,
+            'linha': self.linha,
+            'associatividade': self.associatividade,
+            'substituicao': self.substituicao,
+            'escrita': self.escrita,
+            'leituras': self.leituras,
+            'escritas': self.escritas,
+            'acertos': self.acertos,
+            'faltas': self.faltas,
+            'despejos': self.despejos,
+            'writebacks': self.writebacks,
+            'taxa_acerto': self.taxa_acerto(),
+            'por_pc': {str(pc): {'acertos': a, 'faltas': f}
+                       for pc, (a, f) in sorted(self.por_pc.items())},
+        }
+
+
+class MemoriaPrincipal:
+    """Último nível da hierarquia: conta acessos que chegam à memória de dados."""
+
+    nome = 'memoria'
+
+    def __init__(self, latencia=100):
+        self.latencia = latencia
+        self.leituras = 0
+        self.escritas = 0
+
+    def acessar(self, endereco, escrita, pc):
+        if escrita:
+            self.escritas += 1
+        else:
+            self.leituras += 1
+        return self.latencia
+
+
+class HierarquiaCache:
+    """Monitor do Simulador que passa os acessos de dados por L1 (e L2 opcional)."""
+
+    def __init__(self, l1, l2=None, latencia_memoria=100):
+        self.niveis = [l1] if l2 is None else [l1, l2]
+        self.memoria = MemoriaPrincipal(latencia_memoria)
+        for nivel, proximo in zip(self.niveis, self.niveis[1:] + [self.memoria]):
+            nivel.proximo = proximo
+        self.acessos = 0
+        self.ciclos = 0
+
+    def antes(self, sim, pc, dec):
+        _, op, ra, _, rc, _ = dec
+        l1 = self.niveis[0]
+        for tipo, endereco in sim.acessos_memoria(op, ra, rc):
+            self.acessos += 1
+            self.ciclos += l1.acessar(endereco, tipo == 'w', pc)
+
+    def tempo_medio_acesso(self):
+        return self.ciclos / self.acessos if self.acessos else 0.0
+
+    def estatisticas(self):
+        return {
+            'acessos': self.acessos,
+            'ciclos': self.ciclos,
+            'tempo_medio_acesso': self.tempo_medio_acesso(),
+            'niveis': [nivel.estatisticas() for nivel in self.niveis],
+            'memoria': {'leituras': self.memoria.leituras, 'escritas': self.memoria.escritas},
+        }
+
+    def relatorio(self, top=10):
+        linhas = [f"=== Cache de dados: {self.acessos} acessos, {self.ciclos} ciclos "
+                  f"(média {self.tempo_medio_acesso():.2f}) ==="]
+        for nivel in self.niveis:
+            linhas += [
+                "",
+                f"--- {nivel.nome}: {nivel.tamanho} palavras, linha {nivel.linha}, "
+                f"{nivel.associatividade}-associativa, {nivel.substituicao}, {nivel.escrita} ---",
+                f"Leituras/escritas:  {nivel.leituras}/{nivel.escritas}",
+                f"Acertos:            {nivel.acertos} ({100 * nivel.taxa_acerto():.2f}%)",
+                f"Faltas:             {nivel.faltas}",
+                f"Despejos:           {nivel.despejos}",
+                f"Writebacks:         {nivel.writebacks}",
+            ]
+            piores = sorted(nivel.por_pc.items(), key=lambda item: -item[1][1])[:top]
+            for pc, (a, f) in piores:
+                if f:
+                    linhas.append(f"PC={pc:<6} acertos={a:<8} faltas={f}")
+        linhas += ["", f"Memória: {self.memoria.leituras} leituras, {self.memoria.escritas} escritas"]
+        return "\n".join(linhas)
+
+
+def ler_configuracao(nome, texto, **opcoes):
+    """Cria um NivelCache a partir de 'tamanho:linha:associatividade' (ex.: '256:4:2')."""
+    try:
+        tamanho, linha, associatividade = (int(campo) for campo in texto.split(':'))
+    except ValueError:
+        raise ValueError(f"Configuração de cache inválida: {texto} (use tamanho:linha:associatividade)")
+    return NivelCache(nome, tamanho, linha, associatividade, **opcoes)
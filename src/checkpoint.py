@@ -0,0 +1,168 @@
+"""
+Checkpoint do estado completo do Simulador UFLA-RISC (.ckpt).
+
+Guarda registradores, PC, base_adress, running, passos, motor de execução e as
+memórias de instruções e de dados. As memórias (memoria.MemoriaPaginada) são
+gravadas página a página e só as páginas alocadas e não nulas entram no
+arquivo; o conteúdo depois do cabeçalho é comprimido com zlib.
+
+Layout (little-endian):
+    cabeçalho   '<4sHH'    mágico b'UCKP', versão, reservado
+    zlib(
+      estado    '<QIBQB'   pc, base_adress, running, passos, tamanho do nome do motor + nome
+      registradores        32 palavras
+      memória   '<III'     nº de palavras, palavras por página, nº de páginas gravadas
+                           (instruções e depois dados)
+        página  '<I'       índice da página, seguido das palavras da página
+    )
+
+Uso:
+    sim.salvar_checkpoint("estado.ckpt")
+    sim = carregar_checkpoint("estado.ckpt")         # novo Simulador
+    sim.restaurar_checkpoint("estado.ckpt")          # no mesmo Simulador
+    sim.run(max_steps=10_000_000, checkpoint_cada=1_000_000, checkpoint_arquivo="estado.ckpt")
+"""
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from memoria import MemoriaPaginada
+
+MAGICO = b'UCKP'
+VERSAO = 3
+CABECALHO = struct.Struct('<4sHH')
+ESTADO = struct.Struct('<QIBQB')
+MEMORIA = struct.Struct('<III')
+PAGINA = struct.Struct('<I')
+
+
+def _palavras_para_bytes(palavras):
+    dados = array('I', palavras)
+    if sys.byteorder != 'little':
+        dados.byteswap()
+    return dados.tobytes()
+
+
+def _bytes_para_palavras(dados):
+    palavras = array('I')
+    palavras.frombytes(dados)
+    if sys.byteorder != 'little':
+        palavras.byteswap()
+    return palavras
+
+
+def _serializar_memoria(memoria):
+    """Geometria + páginas alocadas e não nulas de uma MemoriaPaginada."""
+    paginas = []
+    for indice in sorted(memoria.paginas):
+        dados = _palavras_para_bytes(memoria.paginas[indice])
+        if dados.count(0) != len(dados):
+            paginas.append(PAGINA.pack(indice) + dados)
+    return (MEMORIA.pack(memoria.tamanho, memoria.palavras_por_pagina, len(paginas))
+            + b''.join(paginas))
+
+
+def _desserializar_memoria(dados, pos):
+    """Lê uma memória gravada por _serializar_memoria; retorna (MemoriaPaginada, nova posição)."""
+    tamanho, palavras_por_pagina, n_paginas = MEMORIA.unpack_from(dados, pos)
+    pos += MEMORIA.size
+    memoria = MemoriaPaginada(tamanho, palavras_por_pagina)
+    for _ in range(n_paginas):
+        (indice,) = PAGINA.unpack_from(dados, pos)
+        pos += PAGINA.size
+        n = min(palavras_por_pagina, tamanho - indice * palavras_por_pagina)
+        memoria.paginas[indice] = _bytes_para_palavras(dados[pos:pos + 4 * n])
+        pos += 4 * n
+    return memoria, pos
+
+
+def salvar_checkpoint(sim, caminho):
+    """
+    Grava o estado de `sim` em `caminho`.
+    A escrita vai para um arquivo temporário renomeado no fim: um checkpoint
+    anterior nunca fica pela metade se o processo morrer durante a gravação.
+    """
+    motor = sim.engine.encode('utf-8')
+    conteudo = b''.join([
+        ESTADO.pack(sim.pc, sim.base_adress, sim.running, sim.passos, len(motor)), motor,
+        _palavras_para_bytes(sim.reg),
+        _serializar_memoria(sim.mem_instr),
+        _serializar_memoria(sim.mem_data),
+    ])
+    temporario = caminho + '.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(CABECALHO.pack(MAGICO, VERSAO, 0))
+        f.write(zlib.compress(conteudo, 1))
+    os.replace(temporario, caminho)
+
+
+def ler_checkpoint(caminho):
+    """Lê um checkpoint e retorna um dicionário com o estado gravado."""
+    with open(caminho, 'rb') as f:
+        bruto = f.read()
+    magico, versao, _ = CABECALHO.unpack_from(bruto, 0)
+    if magico != MAGICO:
+        raise ValueError(f"Arquivo não é um checkpoint UFLA-RISC: {caminho}")
+    if versao != VERSAO:
+        raise ValueError(f"Versão de checkpoint não suportada: {versao}")
+
+    dados = zlib.decompress(bruto[CABECALHO.size:])
+    pc, base_adress, running, passos, tamanho_motor = ESTADO.unpack_from(dados, 0)
+    pos = ESTADO.size
+    engine = dados[pos:pos + tamanho_motor].decode('utf-8')
+    pos += tamanho_motor
+    reg = _bytes_para_palavras(dados[pos:pos + 4 * 32])
+    pos += 4 * 32
+    mem_instr, pos = _desserializar_memoria(dados, pos)
+    mem_data, pos = _desserializar_memoria(dados, pos)
+    return {
+        'pc': pc, 'base_adress': base_adress, 'running': bool(running), 'passos': passos,
+        'engine': engine, 'reg': reg, 'mem_instr': mem_instr, 'mem_data': mem_data,
+    }
+
+
+def restaurar_checkpoint(sim, caminho):
+    """Substitui o estado de `sim` pelo do checkpoint (o motor de `sim` é mantido)."""
+    estado = ler_checkpoint(caminho)
+    sim.reg[:] = estado['reg']
+    sim.mem_data = estado['mem_data']
+    sim.mem_instr = estado['mem_instr']
+    sim._instr_compartilhada = False
+    sim.limpar_cache_decodificacao()
+    sim.pc = estado['pc']
+    sim.base_adress = estado['base_adress']
+    sim.running = estado['running']
+    sim.passos = estado['passos']
+    sim.motivo_parada = None
+    if sim.diario is not None:
+        sim.diario.entradas.clear()  # o diário de execução reversa não vale para o novo estado
+
+
+def carregar_checkpoint(caminho, engine=None, rastreador=None):
+    """Cria um Simulador a partir de um checkpoint (engine=None usa o motor gravado)."""
+    from simulador import Simulador
+
+    estado = ler_checkpoint(caminho)
+    sim = Simulador(estado['mem_instr'], estado['base_adress'],
+                    engine=engine or estado['engine'], rastreador=rastreador)
+    sim._instr_compartilhada = False  # o array lido é exclusivo deste simulador
+    sim.reg[:] = estado['reg']
+    sim.mem_data = estado['mem_data']
+    sim.pc = estado['pc']
+    sim.running = estado['running']
+    sim.passos = estado['passos']
+    return sim
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python checkpoint.py <estado.ckpt>")
+    else:
+        estado = ler_checkpoint(sys.argv[1])
+        print(f"PC={estado['pc']} base={estado['base_adress']} running={estado['running']} "
+              f"passos={estado['passos']} motor={estado['engine']}")
+        for i, val in enumerate(estado['reg']):
+            if val:
+                print(f"R{i:02}: {val}")
@@ -0,0 +1,207 @@
+class CompiladorBlocos:
+    """
+    Tradutor de blocos básicos UFLA-RISC para funções Python.
+
+    Um bloco começa em um PC de entrada e segue sequencialmente até a primeira
+    instrução que altera o fluxo (j, jal, jr, beq, bne, ret, call, halt).
+    Cada bloco vira uma única função `bloco(sim, r, m)` gerada como código-fonte,
+    que executa todas as operações do bloco e devolve o próximo PC.
+
+    Os registradores usados pelo bloco são copiados para variáveis locais na
+    entrada e os modificados são devolvidos a `r` na saída (inclusive quando uma
+    instrução lança exceção), evitando um acesso ao array('I') por operando.
+
+    Blocos cujo desvio final (beq, bne ou j) volta para o próprio início são
+    gerados como laço: `bloco(sim, r, m, max_voltas)` repete o corpo até o desvio
+    sair do bloco ou até max_voltas iterações, e devolve (próximo PC, voltas).
+
+    Instruções sem tradução (opcode inválido, cmp) encerram o bloco antes delas;
+    nesse caso o simulador executa a instrução pelo interpretador.
+    """
+
+    MAX_INSTRUCOES = 64  # limita o tamanho do bloco (granularidade do limite de steps)
+
+    TERMINADORES = {'j', 'jal', 'jr', 'beq', 'bne', 'ret', 'call', 'halt'}
+
+    # op -> comandos; {A}/{B}/{C} = variáveis locais de ra/rb/rc, r31 = registrador 31,
+    # m = memória de dados
+    MODELOS = {
+        'add':      "{C} = ({A} + {B}) & 0xFFFFFFFF",
+        'sub':      "{C} = ({A} - {B}) & 0xFFFFFFFF",
+        'xor':      "{C} = {A} ^ {B}",
+        'or':       "{C} = {A} | {B}",
+        'and':      "{C} = {A} & {B}",
+        'mult':     "{C} = ({A} * {B}) & 0xFFFFFFFF",
+        'div':      "{C} = 0 if {B} == 0 else ({A} // {B}) & 0xFFFFFFFF",
+        'inc':      "{C} = ({C} + 1) & 0xFFFFFFFF",
+        'dec':      "{C} = ({C} - 1) & 0xFFFFFFFF",
+        'zeros':    "{C} = 0",
+        'passnota': "{C} = (~{A}) & 0xFFFFFFFF",
+        'passa':    "{C} = {A}",
+        'lcl':      "{C} = ({C} & 0xFFFF0000) | {const16}",
+        'lch':      "{C} = {const16_alto} | ({C} & 0x0000FFFF)",
+        'asl':      "{C} = ({A} << 1) & 0xFFFFFFFF",
+        'asr':      "{C} = {A} >> 1",
+        'lsl':      "{C} = ({A} << 1) & 0xFFFFFFFF",
+        'lsr':      "{C} = {A} >> 1",
+        # operações que podem falhar (índice de memória) registram o PC antes
+        # push/call: o endereço da pilha dá a volta na memória de dados (r31 == 0 → topo)
+        'push':     "sim.pc = {pc}\nr31 = (r31 - 1) & 0xFFFFFFFF\nm[r31 % len(m)] = {A}",
+        # load/store acessam a página de m (memoria.MemoriaPaginada) direto pelo dicionário
+        # `pg` e o store marca a página como suja com `sj`; página ausente ou endereço
+        # inválido caem no acesso normal m[e]: o load lê 0 (ou lança IndexError) sem
+        # alocar, o store aloca a página (ou lança IndexError)
+        'load':     "sim.pc = {pc}\ne = {base} + {A}\np = pg.get(e >> {bits})\n"
+                    "{C} = (m[e] if p is None else p[e & {mascara}]) & 0xFFFFFFFF",
+        'store':    "sim.pc = {pc}\ne = {base} + {C}\np = pg.get(e >> {bits})\n"
+                    "if p is None:\n    m[e] = {A}\nelse:\n    p[e & {mascara}] = {A}\n    sj(e >> {bits})",
+        # terminadores: comandos que terminam com `proximo` = próximo PC
+        'j':        "proximo = {alvo}",
+        'jal':      "r31 = {proximo}\nproximo = {alvo}",
+        'jr':       "proximo = {base} + {A}",
+        'beq':      "proximo = {alvo} if {A} == {B} else {proximo}",
+        'bne':      "proximo = {alvo} if {A} != {B} else {proximo}",
+        'ret':      "proximo = {base} + r31",
+        'call':     "sim.pc = {pc}\nr31 = (r31 - 1) & 0xFFFFFFFF\nm[r31 % len(m)] = {proximo}\nproximo = {A} + 1",
+        'halt':     "sim.running = False\nproximo = {pc}",
+    }
+
+    # registradores lidos/escritos por op, em termos dos campos 'ra', 'rb', 'rc' ou 31
+    LEITURAS = {
+        'add': ('ra', 'rb'), 'sub': ('ra', 'rb'), 'xor': ('ra', 'rb'), 'or': ('ra', 'rb'),
+        'and': ('ra', 'rb'), 'mult': ('ra', 'rb'), 'div': ('ra', 'rb'),
+        'inc': ('rc',), 'dec': ('rc',), 'zeros': (), 'passnota': ('ra',), 'passa': ('ra',),
+        'lcl': ('rc',), 'lch': ('rc',), 'asl': ('ra',), 'asr': ('ra',), 'lsl': ('ra',),
+        'lsr': ('ra',), 'push': ('ra', 31), 'load': ('ra',), 'store': ('ra', 'rc'),
+        'j': (), 'jal': (), 'jr': ('ra',), 'beq': ('ra', 'rb'), 'bne': ('ra', 'rb'),
+        'ret': (31,), 'call': ('ra', 31), 'halt': (),
+    }
+    ESCRITAS = {op: ('rc',) for op in LEITURAS}
+    ESCRITAS.update({
+        'push': (31,), 'store': (), 'j': (), 'jal': (31,), 'jr': (), 'beq': (),
+        'bne': (), 'ret': (), 'call': (31,), 'halt': (),
+    })
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    def descobrir(self, pc_inicio):
+        """
+        Percorre mem_instr a partir de pc_inicio e devolve a lista de instruções
+        decodificadas (pc, op, ra, rb, rc, addr) que formam o bloco. O bloco
+        termina antes de código desconhecido ou de registrador >= 32.
+        """
+        sim = self.sim
+        instrucoes = []
+        pc = pc_inicio
+        while pc < len(sim.mem_instr) and len(instrucoes) < self.MAX_INSTRUCOES:
+            dec = sim.decode_cache.get(pc)
+            if dec is None:
+                try:
+                    dec = sim.decode_word(sim.mem_instr[pc])
+                except ValueError:
+                    break  # código desconhecido: o interpretador trata
+                sim.decode_cache[pc] = dec
+            _, op, ra, rb, rc, addr = dec
+            if op not in self.MODELOS:
+                break
+            campos = {'ra': ra, 'rb': rb, 'rc': rc, 31: 31}
+            if any(campos[c] >= 32 for c in self.LEITURAS[op] + self.ESCRITAS[op]):
+                # registrador inexistente (o montador aceita até 0xFF): os registradores
+                # são carregados na entrada do bloco, então a instrução fica fora dele e o
+                # interpretador lança o IndexError no PC dela
+                break
+            instrucoes.append((pc, op, ra, rb, rc, addr))
+            if op in self.TERMINADORES:
+                break
+            pc += 1
+        return instrucoes
+
+    def registradores(self, instrucoes):
+        """Retorna (usados, escritos): índices dos registradores lidos/escritos pelo bloco."""
+        usados, escritos = set(), set()
+        for _, op, ra, rb, rc, _ in instrucoes:
+            campos = {'ra': ra, 'rb': rb, 'rc': rc, 31: 31}
+            usados.update(campos[c] for c in self.LEITURAS[op])
+            escritos.update(campos[c] for c in self.ESCRITAS[op])
+        # um registrador escrito também é carregado: se o bloco parar no meio
+        # (exceção), o valor devolvido a `r` é o original
+        return sorted(usados | escritos), sorted(escritos)
+
+    def _comandos(self, pc, op, ra, rb, rc, addr):
+        base = self.sim.base_adress
+        campos = {
+            'pc': pc, 'proximo': pc + 1, 'base': base,
+            'A': f"r{ra}", 'B': f"r{rb}", 'C': f"r{rc}",
+            'alvo': base + addr if addr is not None else None,
+            'const16': (ra << 8) | rb,
+            'const16_alto': ((ra << 8) | rb) << 16,
+            'bits': self.sim.mem_data.bits_pagina,
+            'mascara': self.sim.mem_data.mascara_pagina,
+        }
+        return self.MODELOS[op].format(**campos).split("\n")
+
+    def eh_laco(self, pc_inicio, instrucoes):
+        """Verdadeiro se o desvio final do bloco (beq/bne/j) volta para pc_inicio."""
+        _, op, _, _, _, addr = instrucoes[-1]
+        return op in ('beq', 'bne', 'j') and self.sim.base_adress + addr == pc_inicio
+
+    def gerar_fonte(self, pc_inicio, instrucoes):
+        """Gera o código-fonte Python da função que executa o bloco."""
+        usados, escritos = self.registradores(instrucoes)
+        carga = [f"    r{i} = r[{i}]" for i in usados]
+        if any(op in ('load', 'store') for _, op, _, _, _, _ in instrucoes):
+            carga += ["    pg = m.paginas", "    sj = m.sujas.add"]
+        devolve = [f"r[{i}] = r{i}" for i in escritos]
+
+        if self.eh_laco(pc_inicio, instrucoes):
+            linhas = [f"def bloco_{pc_inicio}(sim, r, m, max_voltas):"] + carga
+            linhas += ["    voltas = 0", "    try:", "        while True:", "            voltas += 1"]
+            for instrucao in instrucoes[:-1]:
+                linhas += ["            " + c for c in self._comandos(*instrucao)]
+
+            pc, op, ra, rb, _, _ = instrucoes[-1]
+            condicao = "True" if op == 'j' else f"r{ra} {'==' if op == 'beq' else '!='} r{rb}"
+            linhas += [
+                f"            if {condicao}:",
+                "                if voltas < max_voltas:",
+                "                    continue",
+                f"                proximo = {pc_inicio}",
+                "            else:",
+                f"                proximo = {pc + 1}",
+                "            break",
+            ]
+            retorno = "    return proximo, voltas"
+        else:
+            linhas = [f"def bloco_{pc_inicio}(sim, r, m):"] + carga + ["    try:"]
+            for instrucao in instrucoes:
+                linhas += ["        " + c for c in self._comandos(*instrucao)]
+
+            ultimo_pc, ultimo_op = instrucoes[-1][0], instrucoes[-1][1]
+            if ultimo_op not in self.TERMINADORES:
+                linhas.append(f"        proximo = {ultimo_pc + 1}")
+            retorno = "    return proximo"
+
+        linhas += ["    except BaseException:"]
+        if self.eh_laco(pc_inicio, instrucoes):
+            # voltas começadas até a exceção: run_blocos conta as instruções já executadas
+            linhas += ["        sim._voltas = voltas"]
+        linhas += ["        " + d for d in devolve] or ["        pass"]
+        linhas += ["        raise"]
+        linhas += ["    " + d for d in devolve]
+        linhas.append(retorno)
+        return "\n".join(linhas) + "\n"
+
+    def compilar(self, pc_inicio):
+        """
+        Compila o bloco que começa em pc_inicio.
+        Retorna (funcao, n_instrucoes, eh_laco) ou None se não há instrução traduzível no PC.
+        """
+        instrucoes = self.descobrir(pc_inicio)
+        if not instrucoes:
+            return None
+
+        fonte = self.gerar_fonte(pc_inicio, instrucoes)
+        escopo = {}
+        exec(compile(fonte, f"<bloco {pc_inicio}>", "exec"), escopo)
+        return escopo[f"bloco_{pc_inicio}"], len(instrucoes), self.eh_laco(pc_inicio, instrucoes)
@@ -0,0 +1,287 @@
+"""
+Fuzzer diferencial entre os motores de execução e do round-trip do montador.
+
+Gera programas assembly aleatórios e válidos sobre a tabela de opcodes do
+Interpretador (os mnemônicos que têm formato em FORMATOS_ASM) e, para cada um:
+- confere o round-trip montar → segmentos_para_bin → carregar_arquivo: a
+  memória de instruções e o PC inicial devem ser os mesmos da carga direta;
+- executa o programa em todos os motores, em fatias de `fatia` instruções, e
+  compara registradores, PC, running, passos e memória de dados de cada motor
+  com o motor de referência ('classico', o Simulador.step original) ao fim de
+  cada fatia. Uma exceção também faz parte do estado (tipo da exceção).
+
+Além dos motores, entram na comparação as variantes de execução que têm de
+chegar ao mesmo estado: 'avanco' (classico com avanço de laços em forma
+fechada), 'pipeline' (modelo ciclo a ciclo sobre o despacho) e 'vetorizado'
+(SimuladorVetorizado com 1 lane, só se o NumPy estiver instalado). Às vezes o
+gerador usa registradores r32..r255, que os campos de 8 bits aceitam mas o
+banco de 32 registradores não tem.
+
+Os programas são executados em um pool de processos. Cada programa divergente
+é reduzido a um reprodutor mínimo: instruções são trocadas por `passa r0, r0`
+(não altera nada e mantém os endereços dos desvios) enquanto a divergência
+persistir, e as instruções finais que sobram sem efeito são removidas.
+
+Uso:
+    python fuzzer.py --programas 5000 --workers 4
+    python fuzzer.py --programas 200 --tamanho 64 --passos 2000 --saida reprodutores/
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import vetorizado
+from interpretador import Interpretador
+from pipeline import SimuladorPipeline
+from simulador import Simulador
+
+NOP = "passa r0, r0"
+REFERENCIA = 'classico'
+AVANCO = 'avanco'
+PIPELINE = 'pipeline'
+VETORIZADO = 'vetorizado'
+REGISTRADORES = list(range(8)) + [31]   # r31: ponteiro de pilha / link de jal, call e ret
+REGISTRADORES_INVALIDOS = (32, 40, 0xFF)   # cabem no campo de 8 bits, mas não existem
+CHANCE_INVALIDO = 0.005                    # por operando: ~1 programa em 3 tem um
+CONSTANTES = (0, 1, 2, 3, 0xFF, 0x7FFF, 0x8000, 0xFFFF)
+
+
+def variantes():
+    """Motores e variantes de execução disponíveis para a comparação."""
+    nomes = list(Simulador.ENGINES) + [AVANCO, PIPELINE]
+    if vetorizado.np is not None:
+        nomes.append(VETORIZADO)
+    return nomes
+
+
+def mnemonicos():
+    """Mnemônicos da tabela de opcodes que o montador sabe codificar (exceto halt)."""
+    interp = Interpretador(verbose=False)
+    return sorted(m for m in set(interp.opcodes.values()) if m in Interpretador.FORMATOS_ASM and m != 'halt')
+
+
+def gerar_programa(rnd, tamanho=32, ops=None):
+    """
+    Retorna (base, linhas): `tamanho` instruções aleatórias seguidas de halt.
+    Endereços de desvio caem dentro do programa; a base às vezes é não nula.
+    """
+    ops = ops or mnemonicos()
+    base = 0 if rnd.random() < 0.7 else rnd.randrange(1, 64)
+    linhas = []
+    for _ in range(tamanho):
+        op = rnd.choice(ops)
+        operandos = []
+        for campo in Interpretador.FORMATOS_ASM[op]:
+            if campo in ('ra', 'rb', 'rc'):
+                invalido = rnd.random() < CHANCE_INVALIDO
+                operandos.append(f"r{rnd.choice(REGISTRADORES_INVALIDOS if invalido else REGISTRADORES)}")
+            elif campo == 'const16':
+                operandos.append(str(rnd.choice(CONSTANTES) if rnd.random() < 0.5 else rnd.randrange(0x10000)))
+            else:  # addr8 / addr24: relativo à base
+                operandos.append(str(rnd.randrange(tamanho + 1)))
+        linhas.append(f"{op} {', '.join(operandos)}" if operandos else op)
+    linhas.append("halt")
+    return base, linhas
+
+
+def texto_programa(base, linhas):
+    return f"address {base}\n" + "\n".join(linhas) + "\n"
+
+
+def conferir_round_trip(texto):
+    """Mensagem de erro se montar → .bin → carregar_arquivo não reproduz a carga direta, senão None."""
+    direto = Interpretador(verbose=False)
+    segmentos = direto.montar(texto)
+    direto.carregar_segmentos(segmentos)
+    via_bin = Interpretador(verbose=False)
+    via_bin.carregar_arquivo(direto.segmentos_para_bin(segmentos))
+
+    a, b = direto.exportar_memoria(), via_bin.exportar_memoria()
+    if a['address_start'] != b['address_start']:
+        return f"PC inicial {a['address_start']} != {b['address_start']} após .bin"
+    if a['mem_instr'].instantaneo() != b['mem_instr'].instantaneo():
+        return "memória de instruções difere após .bin"
+    return None
+
+
+class Execucao:
+    """Um motor ou variante rodando o programa, com run(n) e estado() no mesmo formato."""
+
+    def __init__(self, nome, mem_info):
+        self.erro = None
+        self.pipeline = None
+        self.vetorizado = None
+        if nome == VETORIZADO:
+            self.vetorizado = vetorizado.SimuladorVetorizado(mem_info['mem_instr'], mem_info['address_start'])
+            return
+        engine = {AVANCO: 'classico', PIPELINE: 'despacho'}.get(nome, nome)
+        self.sim = Simulador(mem_info['mem_instr'], mem_info['address_start'], engine=engine)
+        if nome == AVANCO:
+            self.sim.ativar_avanco_lacos()
+        elif nome == PIPELINE:
+            self.pipeline = SimuladorPipeline(self.sim)
+
+    def ativa(self):
+        if self.erro is not None:
+            return False
+        if self.vetorizado is not None:
+            return bool(self.vetorizado.running[0])
+        if self.pipeline is not None:
+            return self.sim.running or not self.pipeline.vazio()
+        return self.sim.running
+
+    def run(self, n):
+        try:
+            if self.vetorizado is not None:
+                self.vetorizado.run(max_steps=n)
+            elif self.pipeline is not None:
+                self.pipeline.run(max_instrucoes=n)
+            else:
+                self.sim.run(max_steps=n)
+        except Exception as e:
+            self.erro = type(e).__name__
+
+    def estado(self):
+        """(registradores, pc, running, passos, memória não zero, erro)."""
+        if self.vetorizado is not None:
+            reg, pc, mem, running = self.vetorizado.estado(0)
+            return (tuple(reg), pc, running, int(self.vetorizado.passos[0]), mem, self.erro)
+        sim = self.sim
+        return (tuple(sim.reg), sim.pc, sim.running, sim.passos, dict(sim.mem_data.itens_nao_zero()), self.erro)
+
+
+def _descrever(estado):
+    nao_zero = {f"r{i}": v for i, v in enumerate(estado[0]) if v}
+    return f"pc={estado[1]} running={estado[2]} passos={estado[3]} erro={estado[5]} reg={nao_zero}"
+
+
+def executar_diferencial(texto, engines, passos=500, fatia=16):
+    """
+    Executa o programa em todos os motores/variantes, fatia a fatia.
+    Retorna None se todos concordam, ou a descrição da primeira divergência.
+    """
+    interp = Interpretador(verbose=False)
+    interp.carregar_segmentos(interp.montar(texto))
+    mem_info = interp.exportar_memoria()
+    execucoes = {e: Execucao(e, mem_info) for e in engines}
+
+    executados = 0
+    while executados < passos:
+        n = min(fatia, passos - executados)
+        for execucao in execucoes.values():
+            if execucao.ativa():
+                execucao.run(n)
+        executados += n
+
+        referencia = execucoes[engines[0]].estado()
+        for engine in engines[1:]:
+            estado = execucoes[engine].estado()
+            if estado != referencia:
+                return (f"após {executados} passos: {engines[0]}: {_descrever(referencia)} | "
+                        f"{engine}: {_descrever(estado)}")
+        if not any(e.ativa() for e in execucoes.values()):
+            break
+    return None
+
+
+def testar_programa(argumentos):
+    """Tarefa do pool: gera o programa da semente e devolve (semente, base, linhas, falha ou None)."""
+    semente, tamanho, engines, passos, fatia = argumentos
+    base, linhas = gerar_programa(random.Random(semente), tamanho)
+    texto = texto_programa(base, linhas)
+    falha = conferir_round_trip(texto)
+    if falha is None:
+        falha = executar_diferencial(texto, engines, passos, fatia)
+    return semente, base, linhas, falha
+
+
+def _falha(base, linhas, engines, passos, fatia):
+    texto = texto_programa(base, linhas)
+    return conferir_round_trip(texto) or executar_diferencial(texto, engines, passos, fatia)
+
+
+def reduzir(base, linhas, engines, passos=500, fatia=16):
+    """
+    Reduz um programa divergente: troca instruções por NOP enquanto a falha
+    persistir (até não haver mais troca possível) e remove o final sem efeito.
+    Retorna as linhas reduzidas.
+    """
+    linhas = list(linhas)
+    mudou = True
+    while mudou:
+        mudou = False
+        for i, linha in enumerate(linhas):
+            if linha in (NOP, 'halt'):
+                continue
+            tentativa = linhas[:i] + [NOP] + linhas[i + 1:]
+            if _falha(base, tentativa, engines, passos, fatia):
+                linhas = tentativa
+                mudou = True
+
+    # corta o final: as instruções que restam após a última útil
+    while len(linhas) > 1:
+        tentativa = linhas[:-2] + [linhas[-1]] if linhas[-2] == NOP else None
+        if tentativa is None or not _falha(base, tentativa, engines, passos, fatia):
+            break
+        linhas = tentativa
+    return linhas
+
+
+def fuzzar(programas=1000, tamanho=32, engines=None, passos=500, fatia=16,
+           workers=None, semente=0):
+    """
+    Roda o fuzzer e retorna (falhas, programas/s); falhas = [(semente, base, linhas reduzidas, descrição)].
+    engines: motores/variantes comparados (padrão: todos os de variantes()).
+    """
+    engines = engines or variantes()
+    engines = [REFERENCIA] + [e for e in engines if e != REFERENCIA]
+    tarefas = [(semente + i, tamanho, engines, passos, fatia) for i in range(programas)]
+    inicio = time.perf_counter()
+    falhas = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for s, base, linhas, falha in pool.map(testar_programa, tarefas, chunksize=32):
+            if falha is not None:
+                falhas.append((s, base, linhas, falha))
+    taxa = programas / (time.perf_counter() - inicio)
+
+    reduzidas = []
+    for s, base, linhas, falha in falhas:
+        minimas = reduzir(base, linhas, engines, passos, fatia)
+        reduzidas.append((s, base, minimas, _falha(base, minimas, engines, passos, fatia) or falha))
+    return reduzidas, taxa
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzer diferencial dos motores do simulador UFLA-RISC")
+    parser.add_argument("--programas", type=int, default=1000, help="programas aleatórios a testar")
+    parser.add_argument("--tamanho", type=int, default=32, help="instruções por programa")
+    parser.add_argument("--passos", type=int, default=500, help="limite de instruções executadas por programa")
+    parser.add_argument("--fatia", type=int, default=16, help="instruções entre comparações de estado")
+    parser.add_argument("--engines", nargs='+', choices=variantes(), default=variantes(),
+                        help="motores e variantes comparados com o classico (padrão: todos)")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument("--semente", type=int, default=0, help="semente do primeiro programa")
+    parser.add_argument("--saida", help="diretório onde gravar os reprodutores .asm")
+    args = parser.parse_args()
+
+    falhas, taxa = fuzzar(args.programas, args.tamanho, args.engines, args.passos, args.fatia,
+                          args.workers, args.semente)
+    print(f"{args.programas} programas, {taxa:.1f} programas/s, {len(falhas)} divergência(s)")
+
+    for semente, base, linhas, falha in falhas:
+        print(f"\n--- semente {semente}: {falha}")
+        print(texto_programa(base, linhas), end='')
+        if args.saida:
+            os.makedirs(args.saida, exist_ok=True)
+            with open(os.path.join(args.saida, f"divergencia_{semente}.asm"), 'w') as f:
+                f.write(f"# {falha}\n" + texto_programa(base, linhas))
+
+    if falhas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
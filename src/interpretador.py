@@ -1,16 +1,30 @@
+
+from memoria import MemoriaPaginada, TAMANHO_PADRAO
+from objeto import escrever_objeto, ler_objeto
+from rastreamento import Rastreador, INSTRUCAO, EV_ADDRESS, EV_LOAD
+
+# Versão da codificação do montador: faz parte da chave do cache de montagem
+# (montagem_cache.py). Incrementar ao mudar opcodes, formatos ou a sintaxe.
+VERSAO_MONTADOR = 1
+
+
 class Interpretador:
     """
     Interpretador de instruções binárias para UFLA-RISC (não executa, não decodifica).
     Apenas carrega instruções na memória de instruções e registra diretivas `address`.
     """
 
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=True, rastreador=None, tamanho_instrucoes=TAMANHO_PADRAO, cache=None):
         # Memória de instruções reservada: metade da memória física
-        # 32K words = 32768 endereços válidos para instruções (0..32767)
-        self.mem_inst = [0] * 32768
-        self.address = 0  # endereço atual de carga
-        self.enderecos_definidos = []  # histórico das diretivas address usadas
+        # 32K words = 32768 endereços válidos para instruções (0..32767) por padrão
+        # MemoriaPaginada: páginas alocadas só onde há código, entregue ao Simulador sem cópia
+        self.reiniciar(tamanho_instrucoes)
         self.verbose = verbose
+        # verbose=True sem rastreador explícito: trace de carga em texto no stdout
+        if rastreador is None and verbose:
+            rastreador = Rastreador(INSTRUCAO)
+        self.rastreador = rastreador
+        self.cache = cache  # montagem_cache.CacheMontagem opcional
 
         self.opcodes = {
             '00000001': 'add', '00000010': 'sub', '00000011': 'zeros',
@@ -27,6 +41,16 @@ class Interpretador:
 
         # mnemonic -> opcode_bin (invertido)
         self.mnemonics = {v: k for k, v in self.opcodes.items()}
+        # mnemonic -> opcode inteiro, usado pelo montador
+        self.opcodes_int_asm = {v: int(k, 2) for k, v in self.opcodes.items()}
+
+    def reiniciar(self, tamanho_instrucoes=TAMANHO_PADRAO):
+        """Descarta o programa carregado (memória nova), mantendo tabelas e configuração."""
+        self.mem_inst = MemoriaPaginada(tamanho_instrucoes)
+        self.address = 0  # endereço atual de carga
+        self.enderecos_definidos = []  # histórico das diretivas address usadas
+        self.segmentos = []  # [origem, nº de palavras] de cada bloco carregado
+        self.simbolos = {}   # nome -> endereço (tabela de símbolos opcional do formato objeto)
 
     def carregar_arquivo(self, texto):
         """
@@ -43,6 +67,8 @@ class Interpretador:
             if linha:  # ignora linhas vazias após remover comentário
                 linhas_sem_comentarios.append(linha)
 
+        rastro = self.rastreador if self.rastreador is not None and self.rastreador.ativo(INSTRUCAO) else None
+
         # Agora 'linhas_sem_comentarios' contém apenas diretivas e códigos binários
         for linha in linhas_sem_comentarios:
             if linha.startswith('address'):
@@ -53,19 +79,24 @@ class Interpretador:
                 else:
                     endereco_atual = 0
                 self.enderecos_definidos.append(endereco_atual)
-                if self.verbose:
-                    print(f"[ADDRESS] Carga agora começará em {endereco_atual}")
+                self.segmentos.append([endereco_atual, 0])
+                if rastro is not None:
+                    rastro.registrar(EV_ADDRESS, endereco_atual)
             else:
                 # considera linha como código binário
                 valor_bin = linha
-                self.mem_inst[endereco_atual] = int(valor_bin, 2)
-                if self.verbose:
-                    print(f"[LOAD] mem_inst[{endereco_atual}] = {valor_bin}")
+                palavra = int(valor_bin, 2)
+                self.mem_inst[endereco_atual] = palavra
+                self.segmentos[-1][1] += 1
+                if rastro is not None:
+                    rastro.registrar(EV_LOAD, endereco_atual, palavra)
                 endereco_atual += 1
 
-    def exportar_memoria(self):
+    def exportar_memoria(self, copiar=False):
         """
         Retorna a memória de instruções e o endereço inicial real (primeiro endereço carregado).
+        Por padrão a memória é entregue sem cópia; use copiar=True se o interpretador
+        ainda for carregar outros programas enquanto o simulador estiver em uso.
         """
         if self.enderecos_definidos:
             endereco_inicio = self.enderecos_definidos[0]
@@ -73,7 +104,7 @@ class Interpretador:
             endereco_inicio = 0  # padrão se nenhuma diretiva address foi usada
 
         return {
-            'mem_instr': self.mem_inst.copy(),
+            'mem_instr': self.mem_inst.copia() if copiar else self.mem_inst,
             'address_start': endereco_inicio
         }
 
@@ -82,227 +113,183 @@ class Interpretador:
         Exibe um trecho da memória de instruções (raw) para depuração.
         """
         print("\n=== DUMP memória de instruções (INST) ===")
-        for i in range(inicio, min(fim, 32768)):
+        for i in range(inicio, min(fim, len(self.mem_inst))):
             print(f"{i:04X}: {self.mem_inst[i]:032b}")
     
-    def asm_to_bin(self, texto):
-        op_map = {v: k for k, v in self.opcodes.items()}
-
-        linhas = texto.splitlines()
-        limpas = []
-        
-        for linha in linhas:
+    # Formato de cada instrução assembly: operandos na ordem escrita -> campo da palavra.
+    # Campos: 'ra' (bits 8-15), 'rb' (bits 16-23), 'rc' (bits 24-31),
+    #         'const16' (bits 8-23), 'addr24' (bits 8-31), 'addr8' (bits 24-31)
+    FORMATOS_ASM = {
+        'add': ('rc', 'ra', 'rb'), 'sub': ('rc', 'ra', 'rb'), 'xor': ('rc', 'ra', 'rb'),
+        'or': ('rc', 'ra', 'rb'), 'and': ('rc', 'ra', 'rb'), 'mult': ('rc', 'ra', 'rb'),
+        'div': ('rc', 'ra', 'rb'), 'cmp': ('rc', 'ra', 'rb'), 'lsl': ('rc', 'ra', 'rb'),
+        'lsr': ('rc', 'ra', 'rb'),
+        'inc': ('rc',), 'dec': ('rc',), 'zeros': ('rc',),
+        'push': ('ra',), 'jr': ('ra',),
+        'ret': (), 'halt': (),
+        'call': ('addr24',), 'jal': ('addr24',), 'j': ('addr24',),
+        'passnota': ('rc', 'ra'), 'passa': ('rc', 'ra'), 'load': ('rc', 'ra'),
+        'store': ('ra', 'rc'),
+        'bne': ('ra', 'rb', 'addr8'), 'beq': ('ra', 'rb', 'addr8'),
+        'lch': ('rc', 'const16'), 'lcl': ('rc', 'const16'),
+    }
+
+    # campo -> (deslocamento, maior valor aceito)
+    CAMPOS_ASM = {
+        'ra': (16, 0xFF), 'rb': (8, 0xFF), 'rc': (0, 0xFF),
+        'const16': (8, 0xFFFF), 'addr24': (0, 0xFFFFFF), 'addr8': (0, 0xFF),
+    }
+
+    ERROS_OPERANDOS = {
+        'inc': "inc requer 1 registradores", 'dec': "dec requer 1 registradores",
+        'push': "push requer 1 registrador", 'jr': "jr requer 1 registrador (ra)",
+        'passnota': "passnota requer 2 registradores (ra) e (rc)",
+        'zeros': "zeros requer 1 registrador (rc)", 'passa': "passa requer rc, ra",
+        'load': "load requer rc, ra", 'store': "store requer ra, rb",
+        'bne': "bne requer ra, rb, end", 'beq': "beq requer ra, rb, end",
+        'call': "call requer endereço", 'jal': "jal requer endereço", 'j': "j requer endereço",
+        'lch': "lch requer rc, const16", 'lcl': "lcl requer rc, const16",
+    }
+
+    def montar_instrucao(self, partes):
+        """
+        Codifica uma instrução (lista de tokens, mnemônico primeiro) em uma palavra
+        de 32 bits usando deslocamentos e máscaras.
+        """
+        instr = partes[0].lower()
+        opcode = self.opcodes_int_asm.get(instr)
+        if opcode is None:
+            raise ValueError(f"Instrução inválida: {instr}")
+        if instr == 'halt':
+            return 0xFFFFFFFF
+
+        formato = self.FORMATOS_ASM.get(instr)
+        if formato is None:
+            raise ValueError(f"Instrução sem handler: {instr}")
+        if len(partes) <= len(formato):
+            raise ValueError(self.ERROS_OPERANDOS.get(instr, f"{instr} requer {len(formato)} registradores"))
+
+        palavra = opcode << 24
+        for campo, token in zip(formato, partes[1:]):
+            if campo in ('ra', 'rb', 'rc'):
+                valor = int(token.lstrip('rR'))  # r5 / R5
+            else:
+                valor = int(token)
+            deslocamento, maximo = self.CAMPOS_ASM[campo]
+            if not 0 <= valor <= maximo:
+                raise ValueError(f"Operando fora do intervalo em {instr}: {token}")
+            palavra |= valor << deslocamento
+        return palavra
+
+    def montar(self, texto):
+        """
+        Monta o texto assembly em uma única passada.
+        Retorna a lista de segmentos [(origem, [palavras])], um por diretiva address;
+        o primeiro segmento tem origem None se o programa não começa com address.
+        Com cache, um texto já montado volta direto do disco.
+        """
+        if self.cache is None:
+            return self._montar_texto(texto)
+        chave = self.cache.chave(texto, VERSAO_MONTADOR)
+        segmentos = self.cache.obter(chave)
+        if segmentos is None:
+            segmentos = self._montar_texto(texto)
+            self.cache.guardar(chave, segmentos)
+        return segmentos
+
+    def _montar_texto(self, texto):
+        segmentos = []
+        palavras = None
+        montar_instrucao = self.montar_instrucao
+
+        for linha in texto.splitlines():
             linha = linha.split('#')[0].strip()
-            if linha:
-                limpas.append(linha)
+            if not linha:
+                continue
+            partes = linha.replace(',', ' ').split()
 
-        program_bin = ''
-
-        for linha in limpas:
-            partes = [p.strip() for p in linha.replace(',', ' ').split()]
-            instr = partes[0].lower()
-
-            if instr == "address":
+            if partes[0].lower() == "address":
                 if len(partes) < 2 or not partes[1].isdigit():
                     raise ValueError(f"Endereço inválido na instrução address: {linha}")
-                program_bin += linha + '\n'
-                continue 
-
-            if instr not in op_map:
-                raise ValueError(f"Instrução inválida: {instr}")
-
-            opcode = op_map[instr].replace(' ','')
-            bits = ['0'] * 32
-            for i in range(8):
-                bits[i] = opcode[i]
-
-            # add/sub/xor/or/and/mult/div/cmp => 3 regs
-            if instr in ['add', 'sub', 'xor', 'or', 'and', 'mult', 'div', 'cmp', 'lsl', 'lsr']:
-                if len(partes) < 4:
-                    raise ValueError(f"{instr} requer 3 registradores")
-
-                rc = int(partes[1].replace('r',''))
-                ra = int(partes[2].replace('r',''))
-                rb = int(partes[3].replace('r',''))
-
-                ra_bin = f"{ra:08b}"
-                rb_bin = f"{rb:08b}"
-                rc_bin = f"{rc:08b}"
-
-                for i in range(8):
-                    bits[8+i]  = ra_bin[i]
-                    bits[16+i] = rb_bin[i]
-                    bits[24+i] = rc_bin[i]
-
-            # inc/dec => 2 regs (ra e rc)
-            elif instr in ['inc', 'dec']:
-                if len(partes) < 2:
-                    raise ValueError(f"{instr} requer 1 registradores")
-
-                rc = int(partes[1].replace('r',''))
-                rc_bin = f"{rc:08b}"
-
-                for i in range(8):
-                    bits[24+i] = rc_bin[i]
-
-            # push ra
-            elif instr == 'push':
-                if len(partes) < 2:
-                    raise ValueError("push requer 1 registrador")
-                ra = int(partes[1].replace('r',''))
-                ra_bin = f"{ra:08b}"
-                for i in range(8):
-                    bits[8+i] = ra_bin[i]
-            
-            elif instr == 'ret':
-                if len(partes) < 1:
-                    raise ValueError("ret requer 0 registrador")
-
-            # pop -> pop rc
-            elif instr == 'pop':
-                if len(partes) < 2:
-                    raise ValueError("pop requer 1 registrador (rc)")
-                rc = int(partes[1].replace('r',''))
-                rc_bin = f"{rc:08b}"
-                for i in range(8):
-                    bits[16+i] = rc_bin[i]  # alguns ISAs usam 16, outros 8. Mantive assim pq seu padrão já usou esse campo
-
-            # call/jal/j -> 24 bits de addr
-            elif instr in ['call', 'jal', 'j']:
-                if len(partes) < 2:
-                    raise ValueError(f"{instr} requer endereço")
-                addr = int(partes[1])
-                addr_bin = f"{addr:024b}"
-                for i in range(24):
-                    bits[8+i] = addr_bin[i]
-
-            # jr ra
-            elif instr == 'jr':
-                if len(partes) < 2:
-                    raise ValueError("jr requer 1 registrador (ra)")
-                ra = int(partes[1].replace('r',''))
-                ra_bin = f"{ra:08b}"
-                for i in range(8):
-                    bits[8+i] = ra_bin[i]
-
-            elif instr == 'passnota':
-                if len(partes) < 3:
-                    raise ValueError("passnota requer 2 registradores (ra) e (rc)")
-                rc = int(partes[1].replace('r',''))
-                ra = int(partes[2].replace('r',''))
-                ra_bin = f"{ra:08b}"
-                rc_bin = f"{rc:08b}"
-
-                for i in range(8):
-                    bits[8+i] = ra_bin[i]
-                    bits[24+i] = rc_bin[i]
-
-            # bne/beq -> 2 regs + endereço 8 bits final
-            elif instr in ['bne', 'beq']:
-                if len(partes) < 4:
-                    raise ValueError(f"{instr} requer ra, rb, end")
-                ra = int(partes[1].replace('r',''))
-                rb = int(partes[2].replace('r',''))
-                addr = int(partes[3])
-
-                ra_bin = f"{ra:08b}"
-                rb_bin = f"{rb:08b}"
-                addr_bin = f"{addr:08b}"
-                for i in range(8):
-                    bits[8+i]  = ra_bin[i]
-                    bits[16+i] = rb_bin[i]
-                for i in range(8):
-                    bits[24+i] = addr_bin[i]
-
-            # halt -> 32 bits 1
-            elif instr == 'halt':
-                bits = ['1'] * 32
-
-            # zeros (somente RC)
-            elif instr == 'zeros':
-                if len(partes) < 2:
-                    raise ValueError("zeros requer 1 registrador (rc)")
-                rc = int(partes[1].replace('r',''))
-                rc_bin = f"{rc:08b}"
-                for i in range(8):
-                    bits[24+i] = rc_bin[i]
-
-            # passa ra→rc (2 fields)
-            elif instr == 'passa':
-                if len(partes) < 3:
-                    raise ValueError("passa requer rc, ra")
-                rc = int(partes[1].replace('r',''))
-                ra = int(partes[2].replace('r',''))
-
-                ra_bin = f"{ra:08b}"
-                rc_bin = f"{rc:08b}"
-
-                for i in range(8):
-                    bits[8+i]  = ra_bin[i]
-                    bits[16+i] = '0'
-                    bits[24+i] = rc_bin[i]
-
-            # load rc, ra  -> rc = mem[ra]
-            elif instr == 'load':
-                if len(partes) < 3:
-                    raise ValueError("load requer rc, ra")
-                rc = int(partes[1].replace('r',''))
-                ra = int(partes[2].replace('r',''))
-
-                rc_bin = f"{rc:08b}"
-                ra_bin = f"{ra:08b}"
-
-                for i in range(8):
-                    bits[8+i] = ra_bin[i]
-                for i in range(8):
-                    bits[24+i] = rc_bin[i]
-
-            # store ra, Rb  -> mem[Rb] = Ra
-            elif instr == 'store':
-                if len(partes) < 3:
-                    raise ValueError("store requer ra, rb")
-                ra = int(partes[1].replace('r',''))
-                rc = int(partes[2].replace('r',''))
-
-                ra_bin = f"{ra:08b}"
-                rc_bin = f"{rc:08b}"
-
-                for i in range(8):
-                    bits[8+i] = ra_bin[i]
-                for i in range(8):
-                    bits[24+i] = rc_bin[i]
-            
-            elif instr == "lch":
-                rc = int(partes[1][1:])  # remove 'R'
-                const16 = int(partes[2])
-
-                # Converte para binário
-                const16_bin = f"{const16:016b}"  # 16 bits
-                rc_bin = f"{rc:08b}"             # 8 bits
-
-                # opcode já deve estar nos bits 0–7
-                for i in range(16):
-                    bits[8 + i] = const16_bin[i]  # bits 8–23
-                for i in range(8):
-                    bits[24 + i] = rc_bin[i]      # bits 24–31
-
-            elif instr == "lcl":
-                rc = int(partes[1][1:])
-                const16 = int(partes[2])
-
-                const16_bin = f"{const16:016b}"
-                rc_bin = f"{rc:08b}"
-
-                for i in range(16):
-                    bits[8 + i] = const16_bin[i]
-                for i in range(8):
-                    bits[24 + i] = rc_bin[i]
-
+                palavras = []
+                segmentos.append((int(partes[1]), palavras))
+                continue
+
+            if palavras is None:
+                palavras = []
+                segmentos.append((None, palavras))
+            palavras.append(montar_instrucao(partes))
+
+        return segmentos
+
+    def segmentos_para_bin(self, segmentos):
+        """Gera o texto .bin (diretivas address + uma palavra binária por linha)."""
+        linhas = []
+        for origem, palavras in segmentos:
+            if origem is not None:
+                linhas.append(f"address {origem}")
+            linhas.extend([f"{palavra:032b}" for palavra in palavras])
+        return "".join(linha + "\n" for linha in linhas)
+
+    def salvar_bin(self, caminho, segmentos):
+        """
+        Grava o .bin dos segmentos só se o conteúdo mudou.
+        Retorna True se o arquivo foi (re)escrito.
+        """
+        conteudo = self.segmentos_para_bin(segmentos)
+        try:
+            with open(caminho, 'r') as f:
+                if f.read() == conteudo:
+                    return False
+        except FileNotFoundError:
+            pass
+        with open(caminho, 'w') as f:
+            f.write(conteudo)
+        return True
+
+    def carregar_segmentos(self, segmentos):
+        """
+        Escreve os segmentos montados diretamente na memória de instruções,
+        sem passar pelo texto .bin.
+        """
+        rastro = self.rastreador if self.rastreador is not None and self.rastreador.ativo(INSTRUCAO) else None
+        for origem, palavras in segmentos:
+            if origem is None:
+                origem = 0
             else:
-                raise ValueError(f"Instrução sem handler: {instr}")
-
-            program_bin += ''.join(bits) + "\n"
+                self.enderecos_definidos.append(origem)
+                if rastro is not None:
+                    rastro.registrar(EV_ADDRESS, origem)
+
+            fim = origem + len(palavras)
+            if fim > len(self.mem_inst):
+                raise IndexError(f"Programa excede a memória de instruções (endereço {fim - 1})")
+            self.mem_inst.escrever_bloco(origem, palavras)
+            self.segmentos.append([origem, len(palavras)])
+            if rastro is not None:
+                for i, palavra in enumerate(palavras):
+                    rastro.registrar(EV_LOAD, origem + i, palavra)
+
+    def carregar_asm(self, texto):
+        """Monta o assembly e carrega na memória de instruções. Retorna os segmentos."""
+        segmentos = self.montar(texto)
+        self.carregar_segmentos(segmentos)
+        return segmentos
 
-        return program_bin
-
-    
+    def asm_to_bin(self, texto):
+        return self.segmentos_para_bin(self.montar(texto))
+
+    def exportar_segmentos(self):
+        """Retorna [(origem, palavras)] de cada segmento carregado."""
+        return [(origem, self.mem_inst.ler_bloco(origem, n)) for origem, n in self.segmentos]
+
+    def salvar_objeto(self, caminho):
+        """Grava os segmentos carregados e a tabela de símbolos no formato objeto (.uobj)."""
+        escrever_objeto(caminho, self.exportar_segmentos(), self.simbolos)
+
+    def carregar_objeto(self, caminho):
+        """Carrega um arquivo objeto (.uobj) direto na memória de instruções."""
+        segmentos, simbolos = ler_objeto(caminho)
+        self.carregar_segmentos(segmentos)
+        self.simbolos.update(simbolos)
+        return segmentos
@@ -0,0 +1,99 @@
+"""
+Detecção de loop infinito por repetição exata de estado.
+
+A máquina é determinística: se o estado completo (PC, registradores e memória
+de dados) se repete, o programa está preso num ciclo e nunca chega ao halt.
+
+DetectorLaco é um monitor do Simulador que mantém um hash do estado de forma
+incremental (estilo Zobrist): o hash é o XOR de uma mistura de (posição, valor)
+para cada registrador e palavra de memória não nulos, e cada instrução só
+atualiza as posições que escreveu (registradores_usados / acessos_memoria).
+Para achar a repetição usa o algoritmo de Brent: guarda o estado em passos
+potência de 2 e compara cada estado seguinte com ele. Uma coincidência de hash
+só vira veredito depois de comparar registradores e memória por completo.
+
+Ao detectar o ciclo, grava sim.detalhe_parada = ('loop_infinito', pc, periodo)
+e run() para com motivo_parada 'loop_infinito'.
+
+Uso:
+    sim.run(max_steps=None, detectar_laco=True)
+"""
+
+MASCARA_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _misturar(posicao, valor):
+    """Mistura de 64 bits de (posição, valor); valor 0 contribui com 0."""
+    if not valor:
+        return 0
+    x = ((posicao << 32) | valor) * 0x9E3779B97F4A7C15 & MASCARA_64
+    x ^= x >> 29
+    x = x * 0xBF58476D1CE4E5B9 & MASCARA_64
+    return x ^ (x >> 32)
+
+
+class DetectorLaco:
+    def __init__(self):
+        self.hash = None
+        self._escrita_reg = None   # (registrador, valor antigo) da instrução em execução
+        self._escrita_mem = None   # (endereço, valor antigo)
+        # Brent: estado salvo na última potência de 2 e distância até ele
+        self._potencia = 1
+        self._distancia = 0
+        self._salvo = None         # (pc, hash, registradores, memória)
+
+    def _hash_completo(self, sim):
+        h = 0
+        for r, valor in enumerate(sim.reg):
+            h ^= _misturar(2 * r + 1, valor)
+        for endereco, valor in sim.mem_data.itens_nao_zero():
+            h ^= _misturar(2 * endereco, valor)
+        return h
+
+    def _salvar(self, sim):
+        self._salvo = (sim.pc, self.hash, bytes(sim.reg), sim.mem_data.instantaneo())
+
+    def antes(self, sim, pc, dec):
+        if self.hash is None:
+            self.hash = self._hash_completo(sim)
+            self._salvar(sim)
+
+        _, op, ra, rb, rc, _ = dec
+        reg = sim.reg
+        self._escrita_reg = self._escrita_mem = None
+
+        _, escritos = sim.registradores_usados(op, ra, rb, rc)
+        if escritos and escritos[0] < len(reg):
+            self._escrita_reg = (escritos[0], reg[escritos[0]])
+
+        try:
+            acessos = sim.acessos_memoria(op, ra, rc)
+        except IndexError:
+            acessos = ()
+        for tipo, endereco in acessos:
+            if tipo == 'w' and 0 <= endereco < len(sim.mem_data):
+                self._escrita_mem = (endereco, sim.mem_data[endereco])
+
+    def depois(self, sim, pc, dec):
+        if self._escrita_reg is not None:
+            r, antigo = self._escrita_reg
+            self.hash ^= _misturar(2 * r + 1, antigo) ^ _misturar(2 * r + 1, sim.reg[r])
+        if self._escrita_mem is not None:
+            endereco, antigo = self._escrita_mem
+            self.hash ^= (_misturar(2 * endereco, antigo)
+                          ^ _misturar(2 * endereco, sim.mem_data[endereco]))
+
+        if not sim.running:
+            return
+
+        self._distancia += 1
+        salvo = self._salvo
+        if (sim.pc == salvo[0] and self.hash == salvo[1]
+                and bytes(sim.reg) == salvo[2] and sim.mem_data.instantaneo() == salvo[3]):
+            sim.detalhe_parada = ('loop_infinito', sim.pc, self._distancia)
+            return
+
+        if self._distancia == self._potencia:
+            self._salvar(sim)
+            self._potencia *= 2
+            self._distancia = 0
@@ -0,0 +1,155 @@
+# lote.py
+"""
+Execução em lote: monta e simula muitos programas .asm/.bin/.uobj em paralelo
+(um processo por worker) e gera um único relatório JSON ou CSV.
+
+Uso:
+    python lote.py testes/ --workers 4 --max-passos 1000000 --max-tempo 5 --saida relatorio.json
+    python lote.py "testes/*.bin" --engine blocos --saida relatorio.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from interpretador import Interpretador
+from montagem_cache import CacheMontagem, LIMITE_PADRAO
+from simulador import Simulador
+
+
+def listar_programas(entradas):
+    """
+    Expande diretórios e globs em uma lista ordenada de arquivos .asm/.bin/.uobj.
+    Em um diretório, um .bin com .asm de mesmo nome é ignorado (é o binário gerado dele).
+    """
+    programas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            asm = sorted(glob.glob(os.path.join(entrada, '*.asm')))
+            bins = [b for b in sorted(glob.glob(os.path.join(entrada, '*.bin')))
+                    if os.path.splitext(b)[0] + '.asm' not in asm]
+            programas += asm + bins + sorted(glob.glob(os.path.join(entrada, '*.uobj')))
+        else:
+            encontrados = sorted(glob.glob(entrada))
+            programas += [p for p in encontrados if os.path.splitext(p)[1].lower() in ('.asm', '.bin', '.uobj')]
+    return programas
+
+
+def executar_programa(caminho, max_passos=1_000_000, max_tempo=None, engine='blocos', detectar_laco=False,
+                      cache_montagem=None, limite_cache=LIMITE_PADRAO):
+    """
+    Monta/carrega e executa um programa, sem trace.
+    cache_montagem: diretório do cache de montagem (montagem_cache.py), compartilhado pelos workers.
+    Retorna um dicionário com o estado final e o motivo da parada.
+    """
+    resultado = {
+        'programa': caminho, 'motivo_parada': None, 'passos': 0, 'tempo_s': 0.0,
+        'pc': None, 'registradores': None, 'memoria': None, 'erro': None,
+    }
+    inicio = time.perf_counter()
+    sim = None
+    try:
+        cache = CacheMontagem(cache_montagem, limite_cache) if cache_montagem else None
+        interp = Interpretador(verbose=False, cache=cache)
+        if caminho.lower().endswith('.uobj'):
+            interp.carregar_objeto(caminho)
+        else:
+            with open(caminho, 'r') as f:
+                texto = f.read()
+            if caminho.lower().endswith('.asm'):
+                interp.carregar_asm(texto)
+            else:
+                interp.carregar_arquivo(texto)
+        mem_info = interp.exportar_memoria()
+
+        sim = Simulador(mem_info['mem_instr'], mem_info['address_start'], engine=engine)
+        # o limite de tempo vale para o programa todo, incluindo a montagem
+        restante = None if max_tempo is None else max(0.0, max_tempo - (time.perf_counter() - inicio))
+        sim.run(max_steps=max_passos, max_tempo=restante, detectar_laco=detectar_laco)
+        resultado['motivo_parada'] = sim.motivo_parada
+    except Exception as e:
+        resultado['motivo_parada'] = 'erro'
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+
+    resultado['tempo_s'] = time.perf_counter() - inicio
+    if sim is not None:
+        resultado['passos'] = sim.passos
+        resultado['pc'] = sim.pc
+        resultado['registradores'] = list(sim.reg)
+        resultado['memoria'] = {str(i): val for i, val in sim.mem_data.itens_nao_zero()}
+    return resultado
+
+
+def _executar(argumentos):
+    return executar_programa(*argumentos)
+
+
+def executar_lote(programas, workers=None, max_passos=1_000_000, max_tempo=None, engine='blocos',
+                  detectar_laco=False, cache_montagem=None, limite_cache=LIMITE_PADRAO):
+    """Executa todos os programas em um pool de processos; resultados na ordem de entrada."""
+    tarefas = [(p, max_passos, max_tempo, engine, detectar_laco, cache_montagem, limite_cache)
+               for p in programas]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_executar, tarefas))
+
+
+def salvar_json(resultados, arquivo):
+    with open(arquivo, 'w') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+
+def salvar_csv(resultados, arquivo):
+    campos = ['programa', 'motivo_parada', 'passos', 'tempo_s', 'pc', 'registradores', 'memoria', 'erro']
+    with open(arquivo, 'w', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=campos)
+        escritor.writeheader()
+        for r in resultados:
+            linha = dict(r)
+            linha['registradores'] = ' '.join(map(str, r['registradores'] or []))
+            linha['memoria'] = ';'.join(f"{k}:{v}" for k, v in (r['memoria'] or {}).items())
+            escritor.writerow(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execução em lote de programas UFLA-RISC")
+    parser.add_argument("entradas", nargs='+', help="diretórios ou globs de arquivos .asm/.bin/.uobj")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument("--max-passos", type=int, default=1_000_000, help="limite de instruções por programa")
+    parser.add_argument("--max-tempo", type=float, default=None, help="limite de tempo por programa (s)")
+    parser.add_argument("--engine", choices=Simulador.ENGINES, default='blocos')
+    parser.add_argument("--detectar-laco", action="store_true",
+                        help="encerra programas presos em loop infinito (motivo 'loop_infinito')")
+    parser.add_argument("--cache-montagem", metavar="DIR",
+                        help="reaproveita montagens anteriores dos .asm guardadas em DIR")
+    parser.add_argument("--cache-montagem-limite", type=int, default=LIMITE_PADRAO // 2**20, metavar="MB",
+                        help="tamanho máximo do cache de montagem (padrão: %(default)s MB)")
+    parser.add_argument("--saida", default=None, help="relatório .json ou .csv (padrão: JSON no stdout)")
+    args = parser.parse_args()
+
+    programas = listar_programas(args.entradas)
+    if not programas:
+        print("Nenhum programa .asm/.bin/.uobj encontrado.")
+        return
+
+    inicio = time.perf_counter()
+    resultados = executar_lote(programas, args.workers, args.max_passos, args.max_tempo, args.engine,
+                               args.detectar_laco, args.cache_montagem, args.cache_montagem_limite * 2**20)
+    total = time.perf_counter() - inicio
+
+    if args.saida is None:
+        json.dump(resultados, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.saida.lower().endswith('.csv'):
+        salvar_csv(resultados, args.saida)
+    else:
+        salvar_json(resultados, args.saida)
+
+    print(f"{len(resultados)} programas em {total:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
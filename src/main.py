@@ -1,57 +1,259 @@
 # main.py
-import sys
+import argparse
 import os
 from interpretador import Interpretador
 from simulador import Simulador
+from perfil import Perfil
+from memoria import TAMANHO_PADRAO
+from checkpoint import carregar_checkpoint
+from montagem_cache import CacheMontagem, LIMITE_PADRAO
+from objeto import ErroObjeto
+from cache import HierarquiaCache, SUBSTITUICOES, ESCRITAS, ler_configuracao
+from pipeline import SimuladorPipeline
+from preditor import MonitorDesvios, PREDITORES, criar_preditor
+from rastreamento import Rastreador, SaidaTexto, SaidaBinaria, SaidaAnel, NIVEIS, DESLIGADO
+
+
+def registrador(texto):
+    """Converte 'r5', 'R5' ou '5' no índice do registrador."""
+    indice = int(texto[1:] if texto[:1] in 'rR' else texto)
+    if not 0 <= indice < 32:
+        raise argparse.ArgumentTypeError(f"registrador inválido: {texto}")
+    return indice
+
+
+def criar_rastreador(args):
+    """Monta o rastreador a partir das opções --trace*; None quando desligado."""
+    nivel = NIVEIS[args.trace]
+    if nivel == DESLIGADO:
+        return None
+    if args.trace_anel:
+        saida = SaidaAnel(args.trace_anel)
+    elif args.trace_formato == 'binario':
+        if not args.trace_saida:
+            raise SystemExit("--trace-formato binario requer --trace-saida")
+        saida = SaidaBinaria(args.trace_saida)
+    else:
+        saida = SaidaTexto(args.trace_saida)
+    return Rastreador(nivel, saida)
+
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python main.py <arquivo.asm|arquivo.bin>")
-        return
+    parser = argparse.ArgumentParser(description="Simulador UFLA-RISC")
+    parser.add_argument("arquivo", help="programa .asm, .bin ou .uobj (ou checkpoint .ckpt para retomar)")
+    parser.add_argument("--engine", choices=Simulador.ENGINES, default=None,
+                        help="motor de execução (padrão: classico; num .ckpt, o motor gravado nele)")
+    parser.add_argument("--trace", choices=list(NIVEIS), default='instrucao',
+                        help="nível do trace: off, resumo ou instrucao (padrão)")
+    parser.add_argument("--trace-saida", metavar="ARQ",
+                        help="grava o trace em arquivo em vez do stdout")
+    parser.add_argument("--trace-formato", choices=('texto', 'binario'), default='texto',
+                        help="formato do arquivo de trace (binario: ver rastreamento.py)")
+    parser.add_argument("--trace-anel", type=int, metavar="N",
+                        help="guarda só os últimos N eventos e os mostra ao final")
+    parser.add_argument("--perfil", nargs='?', const='', metavar="ARQ.json",
+                        help="mostra o perfil de execução (e grava em JSON se ARQ for dado)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="executa no modelo de pipeline de 4 estágios e mostra ciclos/CPI")
+    parser.add_argument("--sem-forwarding", action="store_true",
+                        help="desliga o forwarding no modelo de pipeline")
+    parser.add_argument("--preditor", choices=list(PREDITORES),
+                        help="simula um preditor de desvios e mostra a taxa de acerto")
+    parser.add_argument("--preditor-bits", type=int, default=10, metavar="N",
+                        help="tabela do preditor com 2^N entradas (padrão: 10)")
+    parser.add_argument("--penalidade", type=int, default=2, metavar="CICLOS",
+                        help="ciclos perdidos por predição errada (padrão: 2)")
+    parser.add_argument("--cache-l1", metavar="T:L:A",
+                        help="simula cache L1 de dados: tamanho:linha:associatividade em palavras (ex.: 256:4:2)")
+    parser.add_argument("--cache-l2", metavar="T:L:A",
+                        help="acrescenta uma cache L2 (requer --cache-l1)")
+    parser.add_argument("--cache-substituicao", choices=SUBSTITUICOES, default='lru')
+    parser.add_argument("--cache-escrita", choices=ESCRITAS, default='write_back')
+    parser.add_argument("--checkpoint-cada", type=int, metavar="N",
+                        help="grava um checkpoint a cada N instruções (requer --checkpoint-saida)")
+    parser.add_argument("--checkpoint-saida", metavar="ARQ.ckpt",
+                        help="arquivo de checkpoint (gravado também ao fim da execução)")
+    parser.add_argument("--max-passos", type=int, metavar="N",
+                        help="limite de instruções (padrão: sem limite, roda até o halt)")
+    parser.add_argument("--max-tempo", type=float, metavar="SEG",
+                        help="limite de tempo de execução em segundos")
+    parser.add_argument("--detectar-laco", action="store_true",
+                        help="para ao detectar loop infinito (estado completo repetido)")
+    parser.add_argument("--avancar-lacos", action="store_true",
+                        help="calcula em forma fechada laços contados simples em vez de iterar (analise.py)")
+    parser.add_argument("--break", dest="breakpoints", type=lambda x: int(x, 0), action="append",
+                        default=[], metavar="PC", help="para antes de executar o PC (pode repetir)")
+    parser.add_argument("--watch-reg", type=registrador, action="append", default=[], metavar="R",
+                        help="para quando o registrador mudar (ex.: r5; pode repetir)")
+    parser.add_argument("--watch-mem", type=lambda x: int(x, 0), action="append", default=[],
+                        metavar="END", help="para quando a palavra de memória mudar (pode repetir)")
+    parser.add_argument("--tamanho-instrucoes", type=int, default=TAMANHO_PADRAO, metavar="PALAVRAS",
+                        help=f"tamanho da memória de instruções (padrão: {TAMANHO_PADRAO})")
+    parser.add_argument("--tamanho-dados", type=int, default=TAMANHO_PADRAO, metavar="PALAVRAS",
+                        help=f"tamanho da memória de dados (padrão: {TAMANHO_PADRAO})")
+    parser.add_argument("--sem-bin", action="store_true",
+                        help="não grava o .bin ao montar um .asm")
+    parser.add_argument("--cache-montagem", metavar="DIR",
+                        help="reaproveita montagens anteriores do mesmo .asm guardadas em DIR")
+    parser.add_argument("--cache-montagem-limite", type=int, default=LIMITE_PADRAO // 2**20, metavar="MB",
+                        help="tamanho máximo do cache de montagem (padrão: %(default)s MB)")
+    args = parser.parse_args()
+    if args.checkpoint_cada is not None:
+        if not args.checkpoint_saida:
+            parser.error("--checkpoint-cada requer --checkpoint-saida")
+        if args.checkpoint_cada <= 0:
+            parser.error(f"--checkpoint-cada deve ser positivo: {args.checkpoint_cada}")
+    if args.pipeline:
+        # o modelo de pipeline só respeita --max-passos: as demais paradas seriam ignoradas
+        ignoradas = [opcao for opcao, dada in (
+            ("--break", args.breakpoints), ("--watch-reg", args.watch_reg), ("--watch-mem", args.watch_mem),
+            ("--max-tempo", args.max_tempo is not None), ("--detectar-laco", args.detectar_laco),
+            ("--avancar-lacos", args.avancar_lacos), ("--checkpoint-cada", args.checkpoint_cada is not None),
+        ) if dada]
+        if ignoradas:
+            parser.error(f"--pipeline não suporta {', '.join(ignoradas)}")
 
-    arquivo = sys.argv[1]
+    arquivo = args.arquivo
     ext = os.path.splitext(arquivo)[1].lower()
 
     try:
-        with open(arquivo, "r") as f:
-            texto = f.read()
+        if ext not in ('.uobj', '.ckpt'):
+            with open(arquivo, "r") as f:
+                texto = f.read()
+        elif not os.path.exists(arquivo):
+            raise FileNotFoundError(arquivo)
     except FileNotFoundError:
         print(f"Arquivo não encontrado: {arquivo}")
         return
 
-    interp = Interpretador(verbose=True)
+    rastreador = criar_rastreador(args)
 
-    # Se for ASM, converte e salva bin
-    if ext == '.asm':
-        print("\n🔧 Convertendo ASM → BIN...\n")
-        bin_text = interp.asm_to_bin(texto)
+    if ext == '.ckpt':
+        # Retoma uma execução a partir de um checkpoint (checkpoint.py)
+        sim = carregar_checkpoint(arquivo, engine=args.engine, rastreador=rastreador)
+        print(f"\nCheckpoint carregado: PC={sim.pc}, {sim.passos} passos já executados\n")
+    else:
+        cache = None
+        if args.cache_montagem:
+            cache = CacheMontagem(args.cache_montagem, args.cache_montagem_limite * 2**20)
+        interp = Interpretador(verbose=False, rastreador=rastreador,
+                               tamanho_instrucoes=args.tamanho_instrucoes, cache=cache)
 
-        out_file = arquivo.replace('.asm', '.bin')
-        with open(out_file, "w") as f:
-            f.write(bin_text)
+        # Se for ASM, monta direto para a memória de instruções (e salva bin)
+        if ext == '.asm':
+            print("\n🔧 Convertendo ASM → BIN...\n")
+            segmentos = interp.montar(texto)
 
-        print(f"\n✅ Conversão concluída. BIN salvo em {out_file}\n")
-        texto = bin_text  # passa para pipeline normal
+            if not args.sem_bin:
+                out_file = arquivo.replace('.asm', '.bin')
+                if interp.salvar_bin(out_file, segmentos):
+                    print(f"\n✅ Conversão concluída. BIN salvo em {out_file}\n")
+                else:
+                    print(f"\n✅ Conversão concluída. BIN em {out_file} já estava atualizado\n")
 
-    elif ext != '.bin':
-        print("❌ Extensão não suportada! Use .asm ou .bin")
-        return
+            interp.carregar_segmentos(segmentos)
+
+        elif ext == '.bin':
+            # Carrega instruções já em binário
+            interp.carregar_arquivo(texto)
+
+        elif ext == '.uobj':
+            # Objeto binário compacto (objeto.py)
+            try:
+                interp.carregar_objeto(arquivo)
+            except ErroObjeto as e:
+                print(f"❌ {e}")
+                return
 
-    # Carrega instruções já em binário
-    interp.carregar_arquivo(texto)
+        else:
+            print("❌ Extensão não suportada! Use .asm, .bin, .uobj ou .ckpt")
+            return
 
-    mem_info = interp.exportar_memoria()
-    mem_instr = mem_info['mem_instr']
-    pc_start = mem_info['address_start']
+        mem_info = interp.exportar_memoria()
+        mem_instr = mem_info['mem_instr']
+        pc_start = mem_info['address_start']
 
-    print(f"\nMemória de instruções carregada. Início do PC: {pc_start}\n")
+        print(f"\nMemória de instruções carregada. Início do PC: {pc_start}\n")
 
-    sim = Simulador(mem_instr, pc_start)
-    sim.run(max_steps=1000)
+        sim = Simulador(mem_instr, pc_start, engine=args.engine or 'classico', rastreador=rastreador,
+                        tamanho_dados=args.tamanho_dados)
+
+    for endereco in args.watch_mem:
+        if not 0 <= endereco < len(sim.mem_data):
+            parser.error(f"--watch-mem {endereco} fora da memória de dados (0..{len(sim.mem_data) - 1})")
+
+    perfil = Perfil() if args.perfil is not None else None
+    monitor_desvios = None
+    if args.preditor:
+        if args.preditor == 'gshare':
+            preditor = criar_preditor('gshare', bits=args.preditor_bits)
+        elif args.preditor in ('1bit', '2bits'):
+            preditor = criar_preditor(args.preditor, tamanho=1 << args.preditor_bits)
+        else:
+            preditor = criar_preditor(args.preditor)
+        monitor_desvios = MonitorDesvios(preditor, penalidade=args.penalidade)
+        sim.adicionar_monitor(monitor_desvios)
+    cache = None
+    if args.cache_l1:
+        opcoes = {'substituicao': args.cache_substituicao, 'escrita': args.cache_escrita}
+        try:
+            l1 = ler_configuracao('L1', args.cache_l1, **opcoes)
+            l2 = ler_configuracao('L2', args.cache_l2, latencia=10, **opcoes) if args.cache_l2 else None
+        except ValueError as e:
+            parser.error(str(e))
+        cache = HierarquiaCache(l1, l2)
+        sim.adicionar_monitor(cache)
+    pipe = None
+    if args.pipeline:
+        pipe = SimuladorPipeline(sim, forwarding=not args.sem_forwarding)
+        if perfil is not None:
+            sim.adicionar_monitor(perfil)  # o EX/MEM passa por run_monitorado com monitores
+        pipe.run(max_instrucoes=args.max_passos)
+    else:
+        sim.breakpoints.update(args.breakpoints)
+        sim.watch_reg.update(args.watch_reg)
+        sim.watch_mem.update(args.watch_mem)
+        if args.avancar_lacos:
+            sim.ativar_avanco_lacos()
+        sim.run(max_steps=args.max_passos, max_tempo=args.max_tempo, perfil=perfil,
+                detectar_laco=args.detectar_laco,
+                checkpoint_cada=args.checkpoint_cada, checkpoint_arquivo=args.checkpoint_saida)
+
+    if rastreador is None and sim.motivo_parada != 'halt':
+        print(sim.descrever_parada())
+    if args.avancar_lacos:
+        print(f"Passos saltados por avanço de laços: {sim.passos_saltados} de {sim.passos}")
+
+    if args.checkpoint_saida:
+        sim.salvar_checkpoint(args.checkpoint_saida)
+
+    if rastreador is not None:
+        rastreador.fechar()
+        if args.trace_anel:
+            for linha in rastreador.saida.linhas():
+                print(linha)
 
     sim.dump_regs()
     sim.dump_mem_data()
 
+    if pipe is not None:
+        print()
+        print(pipe.relatorio())
+
+    if monitor_desvios is not None:
+        print()
+        print(monitor_desvios.relatorio())
+
+    if cache is not None:
+        print()
+        print(cache.relatorio())
+
+    if perfil is not None:
+        print()
+        print(perfil.relatorio())
+        if args.perfil:
+            perfil.salvar_json(args.perfil)
+
     # Salva binário final se o usuário quiser atualizar
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+"""
+Memória paginada e esparsa de palavras de 32 bits.
+
+MemoriaPaginada se comporta como uma sequência de `tamanho` palavras (índice,
+atribuição e len(), com IndexError fora dos limites), mas só aloca uma página
+de `palavras_por_pagina` palavras na primeira escrita dentro dela. Leituras de
+páginas não alocadas devolvem 0. O custo em memória fica proporcional ao que o
+programa toca, e o espaço de endereçamento pode passar de 16 bits sem alocar
+tudo de antemão.
+
+Páginas escritas desde o último limpar_sujas() ficam em `sujas`; dumps e
+checkpoints percorrem só as páginas alocadas (itens_nao_zero, paginas).
+
+Uso:
+    mem = MemoriaPaginada(1 << 24)
+    mem[100000] = 7
+    mem[5]                  # 0, sem alocar página
+    list(mem.itens_nao_zero())
+"""
+from array import array
+from itertools import repeat
+
+TAMANHO_PADRAO = 32768        # 32K palavras: metade da memória física do UFLA-RISC
+PALAVRAS_POR_PAGINA = 1024
+
+
+class MemoriaPaginada:
+    def __init__(self, tamanho=TAMANHO_PADRAO, palavras_por_pagina=PALAVRAS_POR_PAGINA):
+        if palavras_por_pagina <= 0 or palavras_por_pagina & (palavras_por_pagina - 1):
+            raise ValueError(f"Tamanho de página deve ser potência de 2: {palavras_por_pagina}")
+        self.tamanho = tamanho
+        self.palavras_por_pagina = palavras_por_pagina
+        self.bits_pagina = palavras_por_pagina.bit_length() - 1
+        self.mascara_pagina = palavras_por_pagina - 1
+        self.paginas = {}   # índice da página -> array('I')
+        self.sujas = set()  # páginas escritas desde o último limpar_sujas()
+
+    @classmethod
+    def de_palavras(cls, palavras, tamanho=None, palavras_por_pagina=PALAVRAS_POR_PAGINA):
+        """Cria uma memória com o conteúdo de `palavras` (tamanho padrão: len(palavras))."""
+        memoria = cls(len(palavras) if tamanho is None else tamanho, palavras_por_pagina)
+        memoria.escrever_bloco(0, palavras)
+        memoria.limpar_sujas()
+        return memoria
+
+    def __len__(self):
+        return self.tamanho
+
+    def _nova_pagina(self, indice):
+        inicio = indice << self.bits_pagina
+        n = min(self.palavras_por_pagina, self.tamanho - inicio)
+        pagina = self.paginas[indice] = array('I', bytes(4 * n))
+        return pagina
+
+    def __getitem__(self, endereco):
+        pagina = self.paginas.get(endereco >> self.bits_pagina)
+        if pagina is not None:
+            return pagina[endereco & self.mascara_pagina]
+        if 0 <= endereco < self.tamanho:
+            return 0
+        raise IndexError("array index out of range")
+
+    def __setitem__(self, endereco, valor):
+        indice = endereco >> self.bits_pagina
+        pagina = self.paginas.get(indice)
+        if pagina is None:
+            if not 0 <= endereco < self.tamanho:
+                raise IndexError("array assignment index out of range")
+            pagina = self._nova_pagina(indice)
+        pagina[endereco & self.mascara_pagina] = valor
+        self.sujas.add(indice)
+
+    def __iter__(self):
+        for inicio in range(0, self.tamanho, self.palavras_por_pagina):
+            pagina = self.paginas.get(inicio >> self.bits_pagina)
+            if pagina is None:
+                yield from repeat(0, min(self.palavras_por_pagina, self.tamanho - inicio))
+            else:
+                yield from pagina
+
+    def ler_bloco(self, origem, n):
+        """Retorna as palavras [origem, origem + n) em um array('I')."""
+        if origem < 0 or origem + n > self.tamanho:
+            raise IndexError(f"Bloco fora da memória: {origem}..{origem + n - 1}")
+        bloco = array('I', bytes(4 * n))
+        for indice, pagina in self.paginas.items():
+            inicio = indice << self.bits_pagina
+            a, b = max(origem, inicio), min(origem + n, inicio + len(pagina))
+            if a < b:
+                bloco[a - origem:b - origem] = pagina[a - inicio:b - inicio]
+        return bloco
+
+    def escrever_bloco(self, origem, palavras):
+        """Escreve uma sequência de palavras a partir de `origem`, página a página."""
+        if not isinstance(palavras, array) or palavras.typecode != 'I':
+            palavras = array('I', palavras)
+        fim = origem + len(palavras)
+        if origem < 0 or fim > self.tamanho:
+            raise IndexError(f"Bloco fora da memória: {origem}..{fim - 1}")
+        vazia = bytes(4 * self.palavras_por_pagina)
+        endereco = origem
+        while endereco < fim:
+            indice = endereco >> self.bits_pagina
+            inicio = indice << self.bits_pagina
+            a = endereco - inicio
+            b = min(fim - inicio, self.palavras_por_pagina)
+            trecho = palavras[endereco - origem:endereco - origem + b - a]
+            pagina = self.paginas.get(indice)
+            if pagina is None and trecho.tobytes() == vazia[:4 * len(trecho)]:
+                pass  # só zeros numa página ainda não alocada
+            else:
+                if pagina is None:
+                    pagina = self._nova_pagina(indice)
+                pagina[a:b] = trecho
+                self.sujas.add(indice)
+            endereco = inicio + b
+
+    def itens_nao_zero(self):
+        """Gera (endereço, valor) das palavras não nulas, em ordem de endereço."""
+        for indice in sorted(self.paginas):
+            inicio = indice << self.bits_pagina
+            for deslocamento, valor in enumerate(self.paginas[indice]):
+                if valor:
+                    yield inicio + deslocamento, valor
+
+    def limpar_sujas(self):
+        self.sujas.clear()
+
+    def copia(self):
+        """Cópia independente (páginas duplicadas, com o mesmo conjunto de páginas sujas)."""
+        nova = MemoriaPaginada(self.tamanho, self.palavras_por_pagina)
+        nova.paginas = {indice: array('I', pagina) for indice, pagina in self.paginas.items()}
+        nova.sujas = set(self.sujas)
+        return nova
+
+    def instantaneo(self):
+        """Conteúdo comparável com ==: {índice: bytes} das páginas não nulas."""
+        instantaneo = {}
+        for indice, pagina in self.paginas.items():
+            dados = pagina.tobytes()
+            if dados.count(0) != len(dados):
+                instantaneo[indice] = dados
+        return instantaneo
+
+
+class MemoriaCompartilhada(MemoriaPaginada):
+    """
+    MemoriaPaginada sobre um buffer externo (ex.: multiprocessing.shared_memory):
+    todas as páginas já existem e são fatias memoryview('I') do buffer, então
+    escritas de um processo são vistas pelos outros. Chamar liberar() antes de
+    fechar o segmento compartilhado.
+    """
+
+    def __init__(self, buffer, tamanho=TAMANHO_PADRAO, palavras_por_pagina=PALAVRAS_POR_PAGINA):
+        super().__init__(tamanho, palavras_por_pagina)
+        self._palavras = memoryview(buffer)[:4 * tamanho].cast('I')
+        for inicio in range(0, tamanho, palavras_por_pagina):
+            self.paginas[inicio >> self.bits_pagina] = self._palavras[inicio:inicio + palavras_por_pagina]
+
+    def ler_bloco(self, origem, n):
+        if origem < 0 or origem + n > self.tamanho:
+            raise IndexError(f"Bloco fora da memória: {origem}..{origem + n - 1}")
+        return array('I', self._palavras[origem:origem + n])
+
+    def liberar(self):
+        """Solta as views do buffer (exigido para fechar o shared_memory)."""
+        for pagina in self.paginas.values():
+            pagina.release()
+        self.paginas = {}
+        self._palavras.release()
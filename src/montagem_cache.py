@@ -0,0 +1,93 @@
+"""
+Cache em disco de montagens (assembly → palavras) para o Interpretador.
+
+A chave é o SHA-256 da versão do montador (interpretador.VERSAO_MONTADOR) e do
+texto-fonte: o mesmo .asm, montado de novo por outra execução ou outro
+processo do lote, devolve os segmentos já codificados sem passar pelo
+montador. Cada entrada é um arquivo objeto (objeto.py) `<chave>.uobj`; um
+segmento sem diretiva address (origem None) é gravado com ORIGEM_AUSENTE.
+
+O diretório tem tamanho limitado: ao passar de `limite_bytes`, as entradas
+menos usadas recentemente são apagadas (LRU pelo mtime, renovado a cada
+acerto). As gravações vão para um temporário renomeado no fim, então vários
+processos podem compartilhar o mesmo diretório.
+
+Uso:
+    cache = CacheMontagem("~/.cache/ufla-risc")
+    interp = Interpretador(verbose=False, cache=cache)
+    interp.montar(texto)        # monta e guarda; nas próximas vezes lê do cache
+"""
+import hashlib
+import os
+
+from objeto import escrever_objeto, ler_objeto
+
+ORIGEM_AUSENTE = 0xFFFFFFFF       # segmento antes de qualquer diretiva address
+LIMITE_PADRAO = 64 * 1024 * 1024  # 64 MiB
+EXTENSAO = '.uobj'
+
+
+class CacheMontagem:
+    def __init__(self, diretorio, limite_bytes=LIMITE_PADRAO):
+        self.diretorio = os.path.expanduser(diretorio)
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.faltas = 0
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def chave(self, texto, versao):
+        return hashlib.sha256(f"{versao}\0{texto}".encode('utf-8')).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + EXTENSAO)
+
+    def obter(self, chave):
+        """Segmentos [(origem, array('I'))] da entrada, ou None se não está no cache."""
+        caminho = self._caminho(chave)
+        try:
+            segmentos, _ = ler_objeto(caminho)
+            os.utime(caminho)  # marca como usada recentemente
+        except (OSError, ValueError):
+            self.faltas += 1
+            return None
+        self.acertos += 1
+        return [(None if origem == ORIGEM_AUSENTE else origem, palavras)
+                for origem, palavras in segmentos]
+
+    def guardar(self, chave, segmentos):
+        """Grava os segmentos montados e aplica o limite de tamanho do diretório."""
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        escrever_objeto(temporario, [(ORIGEM_AUSENTE if origem is None else origem, palavras)
+                                     for origem, palavras in segmentos])
+        os.replace(temporario, caminho)
+        self.despejar()
+
+    def despejar(self):
+        """Apaga as entradas menos usadas até o diretório caber em limite_bytes."""
+        entradas = []
+        total = 0
+        for entrada in os.scandir(self.diretorio):
+            if not entrada.name.endswith(EXTENSAO):
+                continue
+            try:
+                info = entrada.stat()
+            except OSError:
+                continue  # apagada por outro processo
+            entradas.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+
+        entradas.sort()
+        for _, tamanho, caminho in entradas:
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+            total -= tamanho
+
+    def limpar(self):
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.endswith(EXTENSAO):
+                os.remove(entrada.path)
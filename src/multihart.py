@@ -0,0 +1,410 @@
+"""
+Simulação multi-hart: K harts (contextos de execução, cada um com seus
+registradores e PC, como um Simulador) executando o mesmo programa sobre uma
+única memória de dados compartilhada.
+
+Cada hart recebe o seu índice no registrador `registrador_id` (r30 por padrão)
+antes de começar, para o programa dividir o trabalho entre eles; o PC inicial
+pode ser o mesmo para todos ou um por hart (`pcs`). O UFLA-RISC não tem
+instruções atômicas: load/store de harts diferentes no mesmo endereço se
+intercalam livremente (read-modify-write sem sincronização perde atualizações).
+
+Dois modos:
+- MultiHart: todos os harts no mesmo processo, intercalados por um
+  escalonador determinístico. 'round_robin' troca de hart a cada instrução;
+  'quantum' executa `quantum` instruções de um hart antes de passar ao
+  próximo (qualquer motor; com 'blocos' o quantum deve ser grande).
+- executar_processos: um processo por hart, com a memória de dados em um
+  segmento multiprocessing.shared_memory (memoria.MemoriaCompartilhada), para
+  paralelismo real no host. A intercalação é a do sistema operacional e não se
+  repete entre execuções.
+
+Estatísticas: instruções por hart e contenção nos endereços compartilhados
+(EstatisticasContencao). No modo MultiHart a contagem é feita por um monitor
+em cada hart (execução instrução a instrução) e inclui as transferências:
+quantas vezes um endereço passou de um hart a outro com uma escrita em um dos
+dois acessos (o que numa máquina real seria tráfego de coerência). No modo de
+processos cada hart conta só os próprios acessos, sem ordem global.
+
+Uso:
+    multi = MultiHart(mem_info['mem_instr'], mem_info['address_start'], harts=4,
+                      escalonamento='quantum', quantum=100)
+    multi.run(max_passos=1_000_000)
+    print(relatorio(multi.resultado()))
+
+    python multihart.py prog.asm --harts 4 --escalonamento quantum --quantum 100
+    python multihart.py prog.asm --harts 4 --processos --engine blocos
+"""
+import argparse
+import multiprocessing
+import queue
+import sys
+from multiprocessing import shared_memory
+
+from interpretador import Interpretador
+from memoria import MemoriaCompartilhada, MemoriaPaginada, TAMANHO_PADRAO
+from simulador import Simulador
+
+ESCALONAMENTOS = ('round_robin', 'quantum')
+QUANTUM_PADRAO = 100
+REGISTRADOR_ID = 30  # recebe o índice do hart
+ESPERA_FILA = 0.5    # segundos entre conferências de processos de hart encerrados
+
+
+class EstatisticasContencao:
+    """Acessos à memória de dados por endereço e por hart."""
+
+    def __init__(self):
+        self.acessos = {}         # endereço -> {hart: [leituras, escritas]}
+        self.ultimo = {}          # endereço -> (hart, escrita) do último acesso
+        self.transferencias = {}  # endereço -> trocas de hart envolvendo escrita
+        self.ordenada = True      # False depois de mesclar(): sem ordem global, sem transferências
+
+    def registrar(self, hart, escrita, endereco):
+        contagem = self.acessos.setdefault(endereco, {}).setdefault(hart, [0, 0])
+        contagem[escrita] += 1
+        anterior = self.ultimo.get(endereco)
+        if anterior is not None and anterior[0] != hart and (escrita or anterior[1]):
+            self.transferencias[endereco] = self.transferencias.get(endereco, 0) + 1
+        self.ultimo[endereco] = (hart, escrita)
+
+    def mesclar(self, hart, acessos):
+        """Soma os acessos {endereço: (leituras, escritas)} contados à parte por um hart."""
+        self.ordenada = False
+        for endereco, (leituras, escritas) in acessos.items():
+            contagem = self.acessos.setdefault(endereco, {}).setdefault(hart, [0, 0])
+            contagem[0] += leituras
+            contagem[1] += escritas
+
+    def do_hart(self, hart):
+        """{endereço: (leituras, escritas)} de um hart."""
+        return {e: tuple(por_hart[hart]) for e, por_hart in self.acessos.items() if hart in por_hart}
+
+    def compartilhados(self):
+        """Endereços acessados por mais de um hart."""
+        return sorted(e for e, por_hart in self.acessos.items() if len(por_hart) > 1)
+
+    def conflitantes(self):
+        """Endereços compartilhados com pelo menos uma escrita."""
+        return [e for e in self.compartilhados()
+                if any(escritas for _, escritas in self.acessos[e].values())]
+
+    def estatisticas(self):
+        return {
+            'enderecos': len(self.acessos),
+            'compartilhados': len(self.compartilhados()),
+            'conflitantes': len(self.conflitantes()),
+            'transferencias': sum(self.transferencias.values()) if self.ordenada else None,
+        }
+
+    def relatorio(self, top=10):
+        est = self.estatisticas()
+        cabecalho = (f"=== Contenção: {est['enderecos']} endereços acessados, {est['compartilhados']} "
+                     f"compartilhados ({est['conflitantes']} com escrita)")
+        if self.ordenada:
+            cabecalho += f", {est['transferencias']} transferências"
+        linhas = [cabecalho + " ==="]
+        conflitantes = self.conflitantes()
+        conflitantes.sort(key=lambda e: (-self.transferencias.get(e, 0),
+                                         -sum(sum(c) for c in self.acessos[e].values()), e))
+        for endereco in conflitantes[:top]:
+            por_hart = ", ".join(f"h{h}: {l}r/{w}w" for h, (l, w) in sorted(self.acessos[endereco].items()))
+            if self.ordenada:
+                por_hart = f"{self.transferencias.get(endereco, 0)} transferências ({por_hart})"
+            linhas.append(f"mem[{endereco}]: {por_hart}")
+        return "\n".join(linhas)
+
+
+class MonitorHart:
+    """Monitor de um hart: passa os acessos de dados da instrução para a contenção."""
+
+    def __init__(self, contencao, hart):
+        self.contencao = contencao
+        self.hart = hart
+
+    def antes(self, sim, pc, dec):
+        _, op, ra, _, rc, _ = dec
+        for tipo, endereco in sim.acessos_memoria(op, ra, rc):
+            self.contencao.registrar(self.hart, tipo == 'w', endereco)
+
+
+def _validar(harts, pcs, registrador_id):
+    if harts < 1:
+        raise ValueError(f"Número de harts inválido: {harts}")
+    if pcs is not None and len(pcs) != harts:
+        raise ValueError(f"{len(pcs)} PCs iniciais para {harts} harts")
+    if not 0 <= registrador_id < 32:
+        raise ValueError(f"Registrador de índice do hart inválido: r{registrador_id}")
+
+
+def _estado_hart(i, sim, erro):
+    return {
+        'hart': i, 'passos': sim.passos, 'motivo_parada': 'erro' if erro else sim.motivo_parada,
+        'pc': sim.pc, 'registradores': list(sim.reg), 'erro': erro,
+    }
+
+
+class MultiHart:
+    def __init__(self, mem_instr, pc_start=0, harts=2, engine='despacho', escalonamento='round_robin',
+                 quantum=QUANTUM_PADRAO, tamanho_dados=TAMANHO_PADRAO, registrador_id=REGISTRADOR_ID,
+                 pcs=None, contencao=True):
+        _validar(harts, pcs, registrador_id)
+        if escalonamento not in ESCALONAMENTOS:
+            raise ValueError(f"Escalonamento desconhecido: {escalonamento} (use {', '.join(ESCALONAMENTOS)})")
+        if quantum < 1:
+            raise ValueError(f"Quantum inválido: {quantum}")
+        self.escalonamento = escalonamento
+        self.quantum = 1 if escalonamento == 'round_robin' else quantum
+        self.mem_data = MemoriaPaginada(tamanho_dados)
+        self.contencao = EstatisticasContencao() if contencao else None
+        if isinstance(mem_instr, MemoriaPaginada):
+            compartilhada = mem_instr
+        else:
+            compartilhada = MemoriaPaginada.de_palavras(mem_instr)
+
+        self.harts = []
+        for i in range(harts):
+            # base_adress = pc_start em todos: os desvios são relativos ao início do programa
+            sim = Simulador(compartilhada, pc_start, engine=engine, tamanho_dados=tamanho_dados)
+            sim.mem_data = self.mem_data
+            if pcs is not None:
+                sim.pc = pcs[i]
+            sim.reg[registrador_id] = i
+            if self.contencao is not None:
+                sim.adicionar_monitor(MonitorHart(self.contencao, i))
+            self.harts.append(sim)
+        self.erros = [None] * harts
+        self.passos = 0    # instruções somadas de todos os harts
+        self.fatias = 0    # vezes que um hart recebeu o processador
+        self.motivo_parada = None
+
+    def ativos(self):
+        return [i for i, sim in enumerate(self.harts) if sim.running and self.erros[i] is None]
+
+    def run(self, max_passos=None):
+        """
+        Executa os harts intercalados até todos pararem (halt, fim da memória ou
+        exceção) ou até max_passos instruções no total (None = sem limite).
+        Uma exceção em um hart fica em erros[i] e só para aquele hart.
+        motivo_parada: 'halt' quando não resta hart ativo, senão 'max_passos'.
+        """
+        ativos = self.ativos()
+        while ativos:
+            for i in ativos:
+                fatia = self.quantum
+                if max_passos is not None:
+                    fatia = min(fatia, max_passos - self.passos)
+                    if fatia <= 0:
+                        break
+                sim = self.harts[i]
+                if not sim.running or self.erros[i] is not None:
+                    continue
+                antes = sim.passos
+                try:
+                    sim.run(max_steps=fatia)
+                except Exception as e:
+                    self.erros[i] = f"{type(e).__name__}: {e}"
+                self.passos += sim.passos - antes
+                self.fatias += 1
+            if max_passos is not None and self.passos >= max_passos:
+                break
+            ativos = self.ativos()
+        self.motivo_parada = 'max_passos' if self.ativos() else 'halt'
+
+    def resultado(self):
+        """Estado final no mesmo formato de executar_processos()."""
+        return {
+            'harts': [_estado_hart(i, sim, self.erros[i]) for i, sim in enumerate(self.harts)],
+            'passos': self.passos,
+            'mem_data': self.mem_data,
+            'contencao': self.contencao,
+        }
+
+
+def _executar_hart(nome, mem_instr, pc_start, pc, hart, engine, tamanho_dados, registrador_id,
+                   max_passos, contencao, fila):
+    """Processo de um hart: executa sobre o segmento compartilhado e devolve o estado pela fila."""
+    segmento = shared_memory.SharedMemory(name=nome)
+    memoria = MemoriaCompartilhada(segmento.buf, tamanho_dados)
+    sim = None
+    erro = None
+    estatisticas = EstatisticasContencao() if contencao else None
+    try:
+        sim = Simulador(mem_instr, pc_start, engine=engine, tamanho_dados=tamanho_dados)
+        sim.mem_data = memoria
+        sim.pc = pc
+        sim.reg[registrador_id] = hart
+        if estatisticas is not None:
+            sim.adicionar_monitor(MonitorHart(estatisticas, hart))
+        sim.run(max_steps=max_passos)
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+    finally:
+        if sim is not None:
+            sim.mem_data = None
+        memoria.liberar()
+        segmento.close()
+    if sim is None:
+        estado = {'hart': hart, 'passos': 0, 'motivo_parada': 'erro', 'pc': pc,
+                  'registradores': None, 'erro': erro}
+    else:
+        estado = _estado_hart(hart, sim, erro)
+    estado['acessos'] = estatisticas.do_hart(hart) if estatisticas is not None else None
+    fila.put(estado)
+
+
+def _coletar_estados(processos, fila):
+    """
+    Estados devolvidos pelos processos dos harts. Um processo que termina sem
+    devolver o estado (exceção antes do put, falta de memória, kill) não trava
+    a espera: o hart aparece com motivo 'erro' e o código de saída.
+    """
+    estados = {}
+    while len(estados) < len(processos):
+        try:
+            estado = fila.get(timeout=ESPERA_FILA)
+            estados[estado['hart']] = estado
+            continue
+        except queue.Empty:
+            pass
+        encerrados = [i for i, processo in enumerate(processos)
+                      if i not in estados and processo.exitcode is not None]
+        if not encerrados:
+            continue
+        # o estado de um processo que acabou de sair ainda pode estar no pipe
+        try:
+            while True:
+                estado = fila.get(timeout=ESPERA_FILA)
+                estados[estado['hart']] = estado
+        except queue.Empty:
+            pass
+        for i in encerrados:
+            if i not in estados:
+                estados[i] = {'hart': i, 'passos': 0, 'motivo_parada': 'erro', 'pc': None,
+                              'registradores': None, 'acessos': None,
+                              'erro': f"processo do hart terminou (código {processos[i].exitcode}) "
+                                      "sem devolver o estado"}
+    return [estados[i] for i in range(len(processos))]
+
+
+def executar_processos(mem_instr, pc_start=0, harts=2, engine='blocos', tamanho_dados=TAMANHO_PADRAO,
+                       registrador_id=REGISTRADOR_ID, pcs=None, max_passos=None, contencao=False):
+    """
+    Executa cada hart em um processo, todos sobre a mesma memória de dados em
+    shared_memory. max_passos vale por hart. contencao=True conta os acessos de
+    cada hart (execução instrução a instrução nos processos).
+    Retorna o mesmo formato de MultiHart.resultado(), com mem_data copiada do segmento.
+    """
+    _validar(harts, pcs, registrador_id)
+    if isinstance(mem_instr, MemoriaPaginada):
+        mem_instr = mem_instr.copia()
+    segmento = shared_memory.SharedMemory(create=True, size=4 * tamanho_dados)
+    try:
+        fila = multiprocessing.Queue()
+        processos = [multiprocessing.Process(
+            target=_executar_hart,
+            args=(segmento.name, mem_instr, pc_start, pc_start if pcs is None else pcs[i], i, engine,
+                  tamanho_dados, registrador_id, max_passos, contencao, fila))
+            for i in range(harts)]
+        for processo in processos:
+            processo.start()
+        estados = _coletar_estados(processos, fila)
+        for processo in processos:
+            processo.join()
+
+        memoria = MemoriaCompartilhada(segmento.buf, tamanho_dados)
+        try:
+            mem_data = memoria.copia()
+        finally:
+            memoria.liberar()
+    finally:
+        segmento.close()
+        segmento.unlink()
+
+    estatisticas = None
+    if contencao:
+        estatisticas = EstatisticasContencao()
+        for estado in estados:
+            if estado['acessos'] is not None:  # hart cujo processo morreu
+                estatisticas.mesclar(estado['hart'], estado['acessos'])
+    for estado in estados:
+        del estado['acessos']
+    return {
+        'harts': estados,
+        'passos': sum(estado['passos'] for estado in estados),
+        'mem_data': mem_data,
+        'contencao': estatisticas,
+    }
+
+
+def relatorio(resultado, top=10):
+    """Texto com as instruções por hart, a contenção e a memória de dados não nula."""
+    total = resultado['passos']
+    linhas = [f"=== {len(resultado['harts'])} harts, {total} instruções ==="]
+    for estado in resultado['harts']:
+        fracao = estado['passos'] / total if total else 0.0
+        linha = (f"hart {estado['hart']}: {estado['passos']} instruções ({fracao:.1%}), "
+                 f"PC={estado['pc']}, {estado['motivo_parada']}")
+        if estado['erro']:
+            linha += f" ({estado['erro']})"
+        linhas.append(linha)
+    if resultado['contencao'] is not None:
+        linhas.append(resultado['contencao'].relatorio(top))
+    linhas.append("=== Memória de Dados (não zero) ===")
+    for i, val in resultado['mem_data'].itens_nao_zero():
+        linhas.append(f"{i}: {val:032b}  ({val})")
+    return "\n".join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação multi-hart do UFLA-RISC com memória de dados compartilhada")
+    parser.add_argument("arquivo", help="programa .asm, .bin ou .uobj")
+    parser.add_argument("--harts", type=int, default=2, help="número de harts")
+    parser.add_argument("--escalonamento", choices=ESCALONAMENTOS, default='round_robin')
+    parser.add_argument("--quantum", type=int, default=QUANTUM_PADRAO,
+                        help="instruções por vez de cada hart no escalonamento 'quantum'")
+    parser.add_argument("--engine", choices=Simulador.ENGINES, default=None,
+                        help="motor de execução (padrão: despacho; blocos com --processos)")
+    parser.add_argument("--max-passos", type=int, default=None,
+                        help="limite de instruções (total; por hart com --processos)")
+    parser.add_argument("--pcs", type=int, nargs='+', help="PC inicial de cada hart")
+    parser.add_argument("--registrador-id", type=int, default=REGISTRADOR_ID,
+                        help="registrador que recebe o índice do hart")
+    parser.add_argument("--mem-dados", type=int, default=TAMANHO_PADRAO, help="palavras de memória de dados")
+    parser.add_argument("--processos", action="store_true",
+                        help="um processo por hart sobre shared_memory (paralelismo real)")
+    parser.add_argument("--sem-contencao", action="store_true",
+                        help="não conta os acessos compartilhados (execução mais rápida)")
+    args = parser.parse_args()
+
+    interp = Interpretador(verbose=False)
+    if args.arquivo.lower().endswith('.uobj'):
+        interp.carregar_objeto(args.arquivo)
+    else:
+        with open(args.arquivo, 'r') as f:
+            texto = f.read()
+        if args.arquivo.lower().endswith('.asm'):
+            interp.carregar_asm(texto)
+        else:
+            interp.carregar_arquivo(texto)
+    mem_info = interp.exportar_memoria()
+
+    try:
+        if args.processos:
+            resultado = executar_processos(mem_info['mem_instr'], mem_info['address_start'], args.harts,
+                                           args.engine or 'blocos', args.mem_dados, args.registrador_id,
+                                           args.pcs, args.max_passos, not args.sem_contencao)
+        else:
+            multi = MultiHart(mem_info['mem_instr'], mem_info['address_start'], args.harts,
+                              args.engine or 'despacho', args.escalonamento, args.quantum, args.mem_dados,
+                              args.registrador_id, args.pcs, not args.sem_contencao)
+            multi.run(max_passos=args.max_passos)
+            resultado = multi.resultado()
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    print(relatorio(resultado))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Formato objeto binário compacto (.uobj) para programas UFLA-RISC.
+
+Layout (little-endian):
+    cabeçalho   '<4sHHII'  mágico b'UOBJ', versão, reservado, nº de segmentos, nº de símbolos
+    segmentos   '<III'     origem, nº de palavras, deslocamento (bytes desde o início do arquivo)
+    símbolos    '<IH'      endereço, tamanho do nome, seguido do nome em UTF-8
+    dados       palavras de 32 bits de cada segmento, contíguas
+
+Cada segmento corresponde a uma diretiva `address` do formato texto. A carga
+mapeia o arquivo com mmap e copia cada segmento direto para a memória de
+instruções, sem interpretar linha a linha.
+
+Conversão entre formatos:
+    python objeto.py programa.bin programa.uobj
+    python objeto.py programa.uobj programa.bin
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGICO = b'UOBJ'
+VERSAO = 1
+CABECALHO = struct.Struct('<4sHHII')
+SEGMENTO = struct.Struct('<III')
+SIMBOLO = struct.Struct('<IH')
+
+
+class ErroObjeto(ValueError):
+    """Arquivo objeto inválido: mágico, versão, vazio ou truncado."""
+
+
+def escrever_objeto(caminho, segmentos, simbolos=None):
+    """
+    Grava um arquivo objeto.
+    - segmentos: lista de (origem, palavras), palavras em qualquer sequência de inteiros
+    - simbolos: dicionário opcional {nome: endereço}
+    """
+    simbolos = simbolos or {}
+    tabela_simbolos = b''.join(
+        SIMBOLO.pack(endereco, len(nome.encode('utf-8'))) + nome.encode('utf-8')
+        for nome, endereco in simbolos.items()
+    )
+
+    deslocamento = CABECALHO.size + SEGMENTO.size * len(segmentos) + len(tabela_simbolos)
+    tabela_segmentos = []
+    dados = []
+    for origem, palavras in segmentos:
+        bloco = array('I', palavras)
+        if sys.byteorder != 'little':
+            bloco.byteswap()
+        tabela_segmentos.append(SEGMENTO.pack(origem, len(bloco), deslocamento))
+        dados.append(bloco.tobytes())
+        deslocamento += 4 * len(bloco)
+
+    with open(caminho, 'wb') as f:
+        f.write(CABECALHO.pack(MAGICO, VERSAO, 0, len(segmentos), len(simbolos)))
+        f.write(b''.join(tabela_segmentos))
+        f.write(tabela_simbolos)
+        f.write(b''.join(dados))
+
+
+def ler_objeto(caminho):
+    """
+    Lê um arquivo objeto via mmap.
+    Retorna (segmentos, simbolos): segmentos = [(origem, array('I'))], simbolos = {nome: endereço}.
+    """
+    with open(caminho, 'rb') as f:
+        tamanho = os.fstat(f.fileno()).st_size
+        if tamanho < CABECALHO.size:
+            # mmap de arquivo vazio lança ValueError sem o nome do arquivo
+            raise ErroObjeto(f"Objeto vazio ou truncado: {caminho} ({tamanho} bytes, "
+                             f"o cabeçalho tem {CABECALHO.size})")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            return decodificar_objeto(mapa, caminho)
+
+
+def decodificar_objeto(dados, origem='<bytes>'):
+    """Como ler_objeto, mas a partir de um buffer (bytes, mmap) já em memória."""
+    tamanho = len(dados)
+    if tamanho < CABECALHO.size:
+        raise ErroObjeto(f"Objeto vazio ou truncado: {origem} ({tamanho} bytes, "
+                         f"o cabeçalho tem {CABECALHO.size})")
+    magico, versao, _, n_segmentos, n_simbolos = CABECALHO.unpack_from(dados, 0)
+    if magico != MAGICO:
+        raise ErroObjeto(f"Arquivo não é um objeto UFLA-RISC: {origem}")
+    if versao != VERSAO:
+        raise ErroObjeto(f"Versão de objeto não suportada: {versao} ({origem})")
+
+    def truncado(fim, parte):
+        if fim > tamanho:
+            raise ErroObjeto(f"Objeto truncado: {origem} ({parte} até o byte {fim}, arquivo tem {tamanho})")
+
+    pos = CABECALHO.size
+    truncado(pos + SEGMENTO.size * n_segmentos, "tabela de segmentos")
+    tabela = []
+    for _ in range(n_segmentos):
+        tabela.append(SEGMENTO.unpack_from(dados, pos))
+        pos += SEGMENTO.size
+
+    simbolos = {}
+    for _ in range(n_simbolos):
+        truncado(pos + SIMBOLO.size, "tabela de símbolos")
+        endereco, tamanho_nome = SIMBOLO.unpack_from(dados, pos)
+        pos += SIMBOLO.size
+        truncado(pos + tamanho_nome, "tabela de símbolos")
+        simbolos[bytes(dados[pos:pos + tamanho_nome]).decode('utf-8')] = endereco
+        pos += tamanho_nome
+
+    segmentos = []
+    for origem_segmento, n_palavras, deslocamento in tabela:
+        truncado(deslocamento + 4 * n_palavras, f"segmento em {origem_segmento}")
+        palavras = array('I')
+        palavras.frombytes(dados[deslocamento:deslocamento + 4 * n_palavras])
+        if sys.byteorder != 'little':
+            palavras.byteswap()
+        segmentos.append((origem_segmento, palavras))
+
+    return segmentos, simbolos
+
+
+def converter(entrada, saida):
+    """Converte entre .bin (texto) e .uobj (objeto), conforme as extensões."""
+    from interpretador import Interpretador
+
+    interp = Interpretador(verbose=False)
+    if entrada.lower().endswith('.uobj'):
+        interp.carregar_objeto(entrada)
+        with open(saida, 'w') as f:
+            f.write(interp.segmentos_para_bin(interp.exportar_segmentos()))
+    else:
+        with open(entrada, 'r') as f:
+            interp.carregar_arquivo(f.read())
+        interp.salvar_objeto(saida)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Uso: python objeto.py <entrada.bin|entrada.uobj> <saida.uobj|saida.bin>")
+    else:
+        converter(sys.argv[1], sys.argv[2])
@@ -0,0 +1,117 @@
+"""
+Perfil de execução de programas UFLA-RISC.
+
+Perfil é um monitor do Simulador: conta execuções por opcode e por PC,
+desvios tomados/não tomados de cada beq/bne, leituras e escritas por endereço
+da memória de dados e o tempo de host gasto em cada classe de instrução
+(registrador / desvio / memória, conforme reg_ops / branch_ops / mem_ops).
+
+Uso:
+    perfil = Perfil()
+    sim.run(max_steps=100000, perfil=perfil)
+    print(perfil.relatorio())
+    perfil.salvar_json("perfil.json")
+"""
+import json
+import time
+from collections import Counter
+
+
+class Perfil:
+    def __init__(self):
+        self.por_opcode = Counter()
+        self.por_pc = Counter()
+        self.desvios = {}          # pc -> [tomados, não tomados] (beq/bne)
+        self.leituras = Counter()  # endereço -> nº de leituras
+        self.escritas = Counter()  # endereço -> nº de escritas
+        self.tempo_classe = {'registrador': 0.0, 'desvio': 0.0, 'memoria': 0.0}
+        self.contagem_classe = Counter()
+        self._inicio = 0.0
+        self._classe = None
+
+    def _classificar(self, sim, op):
+        if op in sim.branch_ops:
+            return 'desvio'
+        if op in sim.mem_ops:
+            return 'memoria'
+        return 'registrador'
+
+    # ------------------------------------------------------------------
+    # Interface de monitor do Simulador
+    # ------------------------------------------------------------------
+
+    def antes(self, sim, pc, dec):
+        _, op, ra, rb, rc, _ = dec
+        self.por_opcode[op] += 1
+        self.por_pc[pc] += 1
+
+        if op == 'beq' or op == 'bne':
+            tomado = (sim.reg[ra] == sim.reg[rb]) == (op == 'beq')
+            contagem = self.desvios.setdefault(pc, [0, 0])
+            contagem[0 if tomado else 1] += 1
+
+        for tipo, endereco in sim.acessos_memoria(op, ra, rc):
+            if tipo == 'r':
+                self.leituras[endereco] += 1
+            else:
+                self.escritas[endereco] += 1
+
+        self._classe = self._classificar(sim, op)
+        self._inicio = time.perf_counter()
+
+    def depois(self, sim, pc, dec):
+        self.tempo_classe[self._classe] += time.perf_counter() - self._inicio
+        self.contagem_classe[self._classe] += 1
+
+    # ------------------------------------------------------------------
+    # Exportação
+    # ------------------------------------------------------------------
+
+    def total_instrucoes(self):
+        return sum(self.por_opcode.values())
+
+    def para_dict(self):
+        return {
+            'total_instrucoes': self.total_instrucoes(),
+            'por_opcode': dict(self.por_opcode.most_common()),
+            'por_pc': {str(pc): n for pc, n in self.por_pc.most_common()},
+            'desvios': {str(pc): {'tomados': t, 'nao_tomados': nt}
+                        for pc, (t, nt) in sorted(self.desvios.items())},
+            'leituras': {str(e): n for e, n in self.leituras.most_common()},
+            'escritas': {str(e): n for e, n in self.escritas.most_common()},
+            'classes': {classe: {'instrucoes': self.contagem_classe[classe], 'tempo_s': tempo}
+                        for classe, tempo in self.tempo_classe.items()},
+        }
+
+    def salvar_json(self, caminho):
+        with open(caminho, 'w') as f:
+            json.dump(self.para_dict(), f, indent=2)
+
+    def relatorio(self, top=10):
+        """Relatório em texto, com cada seção ordenada da maior para a menor contagem."""
+        total = self.total_instrucoes() or 1
+        linhas = [f"=== Perfil: {self.total_instrucoes()} instruções ===", "", "--- Por opcode ---"]
+        for op, n in self.por_opcode.most_common():
+            linhas.append(f"{op:<9} {n:>10}  {100 * n / total:6.2f}%")
+
+        linhas += ["", f"--- PCs mais executados (top {top}) ---"]
+        for pc, n in self.por_pc.most_common(top):
+            linhas.append(f"PC={pc:<6} {n:>10}  {100 * n / total:6.2f}%")
+
+        if self.desvios:
+            linhas += ["", "--- Desvios condicionais ---"]
+            for pc, (t, nt) in sorted(self.desvios.items(), key=lambda item: -sum(item[1])):
+                linhas.append(f"PC={pc:<6} tomados={t:<8} não tomados={nt:<8} ({100 * t / (t + nt):.1f}% tomados)")
+
+        if self.leituras or self.escritas:
+            linhas += ["", f"--- Memória de dados (top {top}) ---"]
+            acessos = self.leituras + self.escritas
+            for endereco, n in acessos.most_common(top):
+                linhas.append(f"{endereco:<6} leituras={self.leituras[endereco]:<8} escritas={self.escritas[endereco]}")
+
+        linhas += ["", "--- Tempo de host por classe ---"]
+        for classe, tempo in sorted(self.tempo_classe.items(), key=lambda item: -item[1]):
+            n = self.contagem_classe[classe]
+            medio = 1e9 * tempo / n if n else 0.0
+            linhas.append(f"{classe:<12} {n:>10} instr  {tempo:.6f}s  ({medio:.0f} ns/instr)")
+        return "\n".join(linhas)
@@ -0,0 +1,187 @@
+"""
+Modelo ciclo a ciclo do pipeline de 4 estágios do UFLA-RISC: IF → ID → EX/MEM → WB.
+
+O modelo mantém um latch por estágio e avança todos a cada ciclo. A execução
+funcional acontece no EX/MEM, em ordem de programa, usando o próprio Simulador
+(um passo do motor configurado): por isso o estado arquitetural final é o mesmo
+do modo funcional, e o pipeline só acrescenta a contagem de ciclos.
+
+Hazards modelados:
+- Dados (RAW): a instrução em ID lê um registrador escrito pela instrução em EX.
+  Sem forwarding, ID espera 1 ciclo (a escrita em WB acontece na primeira metade
+  do ciclo e a leitura em ID na segunda). Com forwarding, o resultado do EX/MEM
+  é repassado ao próximo EX e não há stall.
+- Controle: desvios (beq, bne, j, jal, jr, ret, call) são resolvidos no EX/MEM
+  com predição "não tomado"; se o PC seguinte não for o sequencial, as
+  instruções buscadas no caminho errado (em IF e ID) são descartadas.
+
+Uso:
+    sim = Simulador(mem_instr, pc_start, engine='despacho')
+    pipe = SimuladorPipeline(sim, forwarding=True)
+    pipe.run()
+    print(pipe.relatorio())
+"""
+
+
+class InstrucaoPipeline:
+    """Conteúdo de um latch: instrução buscada e suas dependências."""
+
+    __slots__ = ('pc', 'op', 'lidos', 'escritos')
+
+    def __init__(self, pc, op, lidos, escritos):
+        self.pc = pc
+        self.op = op
+        self.lidos = lidos
+        self.escritos = escritos
+
+
+class SimuladorPipeline:
+    def __init__(self, sim, forwarding=True):
+        self.sim = sim
+        self.forwarding = forwarding
+
+        # latches (None = bolha)
+        self.estagio_if = None
+        self.estagio_id = None
+        self.estagio_ex = None
+        self.estagio_wb = None
+        self.pc_busca = sim.pc
+        self.buscando = sim.running
+
+        # estatísticas
+        self.ciclos = 0
+        self.instrucoes = 0        # instruções concluídas (WB)
+        self.executadas = 0        # instruções executadas no EX/MEM (passos do Simulador)
+        self.stalls = 0            # ciclos de bolha por hazard de dados
+        self.flushes = 0           # instruções descartadas do caminho errado
+        self.desvios_tomados = 0   # redirecionamentos de PC no EX/MEM
+
+    def buscar(self, pc):
+        """IF: busca e pré-decodifica a instrução em pc (sem exceção no caminho errado)."""
+        sim = self.sim
+        if pc >= len(sim.mem_instr):
+            return InstrucaoPipeline(pc, None, (), ())
+        dec = sim.decode_cache.get(pc)
+        if dec is None:
+            try:
+                dec = sim.decode_word(sim.mem_instr[pc])
+            except ValueError:
+                # só é erro se chegar ao EX/MEM pelo caminho correto
+                return InstrucaoPipeline(pc, None, (), ())
+            sim.decode_cache[pc] = dec
+        _, op, ra, rb, rc, _ = dec
+        lidos, escritos = sim.registradores_usados(op, ra, rb, rc)
+        return InstrucaoPipeline(pc, op, lidos, escritos)
+
+    def hazard_dados(self):
+        """Verdadeiro se a instrução em ID precisa esperar o resultado da instrução em EX."""
+        if self.forwarding or self.estagio_id is None or self.estagio_ex is None:
+            return False
+        escritos = self.estagio_ex.escritos
+        return any(r in escritos for r in self.estagio_id.lidos)
+
+    def ciclo(self):
+        """Avança o pipeline um ciclo."""
+        sim = self.sim
+        self.ciclos += 1
+
+        # WB: conclui a instrução
+        if self.estagio_wb is not None:
+            self.instrucoes += 1
+
+        # EX/MEM: execução funcional em ordem de programa
+        redirecionar = False
+        if self.estagio_ex is not None:
+            instr = self.estagio_ex
+            sim.pc = instr.pc
+            if sim.monitores:
+                sim.run_monitorado(1)  # perfil, preditor de desvios etc.
+            else:
+                sim.step()
+            self.executadas += 1
+            if not sim.running:
+                # halt (ou PC fora da memória): nada mais é buscado
+                self.buscando = False
+                redirecionar = True
+            elif sim.pc != instr.pc + 1:
+                self.desvios_tomados += 1
+                self.pc_busca = sim.pc
+                redirecionar = True
+
+        stall = not redirecionar and self.hazard_dados()
+
+        # Avanço dos latches
+        self.estagio_wb = self.estagio_ex
+        if redirecionar:
+            self.flushes += (self.estagio_id is not None) + (self.estagio_if is not None)
+            self.estagio_ex = None
+            self.estagio_id = None
+            self.estagio_if = None
+        elif stall:
+            self.stalls += 1
+            self.estagio_ex = None  # bolha; ID e IF ficam parados
+            return
+        else:
+            self.estagio_ex = self.estagio_id
+            self.estagio_id = self.estagio_if
+            self.estagio_if = None
+
+        # IF: busca a próxima instrução
+        if self.buscando:
+            self.estagio_if = self.buscar(self.pc_busca)
+            self.pc_busca += 1
+
+    def vazio(self):
+        return (self.estagio_if is None and self.estagio_id is None
+                and self.estagio_ex is None and self.estagio_wb is None)
+
+    def run(self, max_ciclos=None, max_instrucoes=None):
+        """
+        Executa até o pipeline esvaziar após halt (ou até max_ciclos / max_instrucoes
+        executadas). O limite de instruções é contado no EX/MEM: registradores,
+        memória, PC e passos ficam iguais aos do modo funcional com o mesmo limite,
+        e as instruções ainda em IF/ID continuam nos latches para um próximo run().
+        """
+        sim = self.sim
+        executadas = self.executadas
+        try:
+            while max_ciclos is None or self.ciclos < max_ciclos:
+                if max_instrucoes is not None and self.executadas - executadas >= max_instrucoes:
+                    break
+                self.ciclo()
+                if not self.buscando and self.vazio():
+                    break
+        finally:
+            # numa exceção do EX/MEM as instruções anteriores já contam
+            sim.passos += self.executadas - executadas
+        if sim.running:
+            sim.motivo_parada = 'max_steps'
+        else:
+            sim.motivo_parada = 'halt' if sim.parado_em_halt() else 'fim_memoria'
+
+    def cpi(self):
+        return self.ciclos / self.instrucoes if self.instrucoes else 0.0
+
+    def estatisticas(self):
+        return {
+            'forwarding': self.forwarding,
+            'ciclos': self.ciclos,
+            'instrucoes': self.instrucoes,
+            'stalls': self.stalls,
+            'flushes': self.flushes,
+            'desvios_tomados': self.desvios_tomados,
+            'cpi': self.cpi(),
+        }
+
+    def relatorio(self):
+        e = self.estatisticas()
+        return "\n".join([
+            "=== Pipeline IF → ID → EX/MEM → WB ===",
+            f"Forwarding:       {'sim' if e['forwarding'] else 'não'}",
+            f"Ciclos:           {e['ciclos']}",
+            f"Instruções:       {e['instrucoes']}",
+            f"Stalls (dados):   {e['stalls']}",
+            f"Flushes:          {e['flushes']}",
+            f"Desvios tomados:  {e['desvios_tomados']}",
+            f"CPI:              {e['cpi']:.3f}",
+        ])
@@ -0,0 +1,187 @@
+"""
+Simulação de preditores de desvio para o UFLA-RISC.
+
+Preditores disponíveis (todos predizem a direção: tomado / não tomado):
+- PreditorNaoTomado:     estático, sempre "não tomado"
+- PreditorParaTras:      estático, tomado se o alvo está antes do desvio (laços)
+- Preditor1Bit:          tabela de 1 bit por entrada (último resultado)
+- Preditor2Bits:         contador saturante de 2 bits por entrada
+- PreditorGshare:        contadores de 2 bits indexados por PC xor histórico global
+
+MonitorDesvios é um monitor do Simulador que observa cada instrução de
+branch_ops (beq, bne, j, jal, jr, ret), consulta o preditor antes da execução,
+o atualiza com o resultado real e acumula a taxa de acerto por PC e total.
+
+Uso:
+    monitor = MonitorDesvios(Preditor2Bits(), penalidade=2)
+    sim.adicionar_monitor(monitor)
+    sim.run(max_steps=100000)
+    print(monitor.relatorio())
+"""
+
+
+class PreditorNaoTomado:
+    nome = 'nao_tomado'
+
+    def prever(self, pc, alvo):
+        return False
+
+    def atualizar(self, pc, alvo, tomado):
+        pass
+
+
+class PreditorParaTras:
+    """Backward taken / forward not taken."""
+    nome = 'para_tras'
+
+    def prever(self, pc, alvo):
+        return alvo is not None and alvo <= pc
+
+    def atualizar(self, pc, alvo, tomado):
+        pass
+
+
+class Preditor1Bit:
+    nome = '1bit'
+
+    def __init__(self, tamanho=1024):
+        self.mascara = tamanho - 1
+        self.tabela = [False] * tamanho
+
+    def prever(self, pc, alvo):
+        return self.tabela[pc & self.mascara]
+
+    def atualizar(self, pc, alvo, tomado):
+        self.tabela[pc & self.mascara] = tomado
+
+
+class Preditor2Bits:
+    """Contador saturante: 0-1 prevê não tomado, 2-3 prevê tomado (inicia em 1)."""
+    nome = '2bits'
+
+    def __init__(self, tamanho=1024):
+        self.mascara = tamanho - 1
+        self.tabela = [1] * tamanho
+
+    def _indice(self, pc):
+        return pc & self.mascara
+
+    def prever(self, pc, alvo):
+        return self.tabela[self._indice(pc)] >= 2
+
+    def atualizar(self, pc, alvo, tomado):
+        i = self._indice(pc)
+        if tomado:
+            self.tabela[i] = min(3, self.tabela[i] + 1)
+        else:
+            self.tabela[i] = max(0, self.tabela[i] - 1)
+
+
+class PreditorGshare(Preditor2Bits):
+    """Contadores de 2 bits indexados por (PC xor histórico global de `bits` desvios)."""
+    nome = 'gshare'
+
+    def __init__(self, bits=10):
+        super().__init__(1 << bits)
+        self.historico = 0
+
+    def _indice(self, pc):
+        return (pc ^ self.historico) & self.mascara
+
+    def atualizar(self, pc, alvo, tomado):
+        super().atualizar(pc, alvo, tomado)
+        self.historico = ((self.historico << 1) | tomado) & self.mascara
+
+
+PREDITORES = {
+    'nao_tomado': PreditorNaoTomado,
+    'para_tras': PreditorParaTras,
+    '1bit': Preditor1Bit,
+    '2bits': Preditor2Bits,
+    'gshare': PreditorGshare,
+}
+
+
+def criar_preditor(nome, **parametros):
+    """Cria um preditor pelo nome (ver PREDITORES); parâmetros vão para o construtor."""
+    if nome not in PREDITORES:
+        raise ValueError(f"Preditor desconhecido: {nome} (use {', '.join(PREDITORES)})")
+    return PREDITORES[nome](**parametros)
+
+
+class MonitorDesvios:
+    """
+    Observa os desvios executados e mede o acerto do preditor.
+    penalidade: ciclos perdidos por predição errada no pipeline (2 no modelo de 4 estágios,
+    em que desvios são resolvidos no EX/MEM).
+    """
+
+    def __init__(self, preditor, penalidade=2):
+        self.preditor = preditor
+        self.penalidade = penalidade
+        self.por_pc = {}  # pc -> [acertos, total]
+
+    def antes(self, sim, pc, dec):
+        _, op, ra, rb, rc, addr = dec
+        if op not in sim.branch_ops:
+            return
+
+        reg = sim.reg
+        if op == 'beq':
+            tomado = reg[ra] == reg[rb]
+        elif op == 'bne':
+            tomado = reg[ra] != reg[rb]
+        else:
+            tomado = True  # j, jal, jr, ret: sempre desviam
+
+        if op == 'jr':
+            alvo = sim.base_adress + reg[ra]
+        elif op == 'ret':
+            alvo = sim.base_adress + reg[31]
+        else:
+            alvo = sim.base_adress + addr
+
+        previsto = self.preditor.prever(pc, alvo)
+        self.preditor.atualizar(pc, alvo, tomado)
+
+        contagem = self.por_pc.setdefault(pc, [0, 0])
+        contagem[0] += previsto == tomado
+        contagem[1] += 1
+
+    def totais(self):
+        acertos = sum(a for a, _ in self.por_pc.values())
+        total = sum(t for _, t in self.por_pc.values())
+        return acertos, total
+
+    def taxa_acerto(self):
+        acertos, total = self.totais()
+        return acertos / total if total else 0.0
+
+    def estatisticas(self):
+        acertos, total = self.totais()
+        erros = total - acertos
+        return {
+            'preditor': self.preditor.nome,
+            'desvios': total,
+            'acertos': acertos,
+            'taxa_acerto': self.taxa_acerto(),
+            'penalidade': self.penalidade,
+            # ciclos perdidos com o preditor vs. esperar a resolução de todo desvio
+            'ciclos_perdidos': erros * self.penalidade,
+            'ciclos_economizados': acertos * self.penalidade,
+            'por_pc': {str(pc): {'acertos': a, 'total': t, 'taxa_acerto': a / t}
+                       for pc, (a, t) in sorted(self.por_pc.items())},
+        }
+
+    def relatorio(self):
+        e = self.estatisticas()
+        linhas = [
+            f"=== Preditor de desvios: {e['preditor']} ===",
+            f"Desvios:              {e['desvios']}",
+            f"Acertos:              {e['acertos']} ({100 * e['taxa_acerto']:.2f}%)",
+            f"Ciclos perdidos:      {e['ciclos_perdidos']} (penalidade {e['penalidade']})",
+            f"Ciclos economizados:  {e['ciclos_economizados']} (vs. parar em todo desvio)",
+        ]
+        for pc, (a, t) in sorted(self.por_pc.items(), key=lambda item: -item[1][1]):
+            linhas.append(f"PC={pc:<6} {a:>8}/{t:<8} {100 * a / t:6.2f}%")
+        return "\n".join(linhas)
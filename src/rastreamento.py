@@ -0,0 +1,223 @@
+"""
+Rastreamento (trace) da execução do UFLA-RISC.
+
+Substitui os print() do caminho crítico do Interpretador/Simulador por eventos
+compactos enviados a uma saída plugável. Níveis:
+
+- DESLIGADO: nenhum evento (o simulador nem chama o rastreador)
+- RESUMO:    apenas eventos de fim de execução (HALT, limite de steps)
+- INSTRUCAO: um evento por instrução, carga e desvio (layout do modo didático)
+
+Cada evento é uma tupla (tipo, a, b). formatar_evento() reproduz o texto que o
+simulador imprimia; SaidaBinaria grava os eventos em registros de 9 bytes que
+decodificar_binario() converte de volta para o mesmo texto.
+
+Uso offline:
+    python rastreamento.py execucao.trbin > execucao.txt
+"""
+import struct
+import sys
+from collections import deque
+
+DESLIGADO, RESUMO, INSTRUCAO = 0, 1, 2
+NIVEIS = {'off': DESLIGADO, 'resumo': RESUMO, 'instrucao': INSTRUCAO}
+
+# Tipos de evento
+EV_INSTRUCAO = 1    # a=pc, b=palavra
+EV_REGISTRADOR = 2  # a=tmp_result
+EV_MEMORIA = 3      # a=tmp_result
+EV_BRANCH = 4       # a=novo pc
+EV_IGUAL = 5        # a=Ra, b=Rb
+EV_DESVIO = 6       # a=Ra, b=Rb
+EV_DIFERENTE = 7    # a=Ra, b=Rb
+EV_HALT = 8         # a=pc
+EV_ADDRESS = 9      # a=endereço
+EV_LOAD = 10        # a=endereço, b=palavra
+EV_MENSAGEM = 11    # a=texto
+
+# Nível mínimo para cada tipo de evento
+NIVEL_EVENTO = {tipo: INSTRUCAO for tipo in range(EV_INSTRUCAO, EV_MENSAGEM + 1)}
+NIVEL_EVENTO[EV_HALT] = RESUMO
+NIVEL_EVENTO[EV_MENSAGEM] = RESUMO
+
+# opcode (8 bits) -> mnemônico, para reconstruir o texto de EV_INSTRUCAO offline
+OPCODES_INT = {
+    0x01: 'add', 0x02: 'sub', 0x03: 'zeros', 0x04: 'xor', 0x05: 'or',
+    0x06: 'passnota', 0x07: 'and', 0x08: 'asl', 0x09: 'asr', 0x0A: 'lsl',
+    0x0B: 'lsr', 0x0C: 'passa', 0x0E: 'lch', 0x0F: 'lcl', 0x10: 'load',
+    0x11: 'store', 0x12: 'jal', 0x13: 'jr', 0x14: 'beq', 0x15: 'bne',
+    0x16: 'j', 0x18: 'mult', 0x19: 'div', 0x1A: 'cmp', 0x1B: 'inc',
+    0x1C: 'dec', 0x1D: 'push', 0x1F: 'call', 0x20: 'ret', 0xFF: 'halt'
+}
+
+MAGICO = b'URTR\x01'
+_REGISTRO = struct.Struct('<BII')
+SEM_VALOR = 0x80  # bit do tipo que indica a=None (tmp_result vazio)
+
+
+def formatar_evento(evento):
+    """Converte um evento no texto impresso pelo modo didático."""
+    tipo, a, b = evento
+    if tipo == EV_INSTRUCAO:
+        return f"\nPC={a} | Inst={b:032b} | Op={OPCODES_INT.get(b >> 24)}"
+    if tipo == EV_REGISTRADOR:
+        return f"Operação registrador: tmp_result={a}"
+    if tipo == EV_MEMORIA:
+        return f"Memória executada: tmp_result={a}"
+    if tipo == EV_BRANCH:
+        return f"Branch executado: PC agora = {a}"
+    if tipo == EV_IGUAL:
+        return f"Igual: Ra: {a} Rb: {b}"
+    if tipo == EV_DESVIO:
+        return f"Desvio: Ra: {a} Rb: {b}"
+    if tipo == EV_DIFERENTE:
+        return f"Diferente: Ra: {a} Rb: {b}"
+    if tipo == EV_HALT:
+        return f"HALT encontrado no PC={a}"
+    if tipo == EV_ADDRESS:
+        return f"[ADDRESS] Carga agora começará em {a}"
+    if tipo == EV_LOAD:
+        return f"[LOAD] mem_inst[{a}] = {b:032b}"
+    if tipo == EV_MENSAGEM:
+        return a
+    raise ValueError(f"Tipo de evento desconhecido: {tipo}")
+
+
+class SaidaTexto:
+    """Escreve os eventos como texto em um arquivo com buffer (padrão: stdout)."""
+
+    def __init__(self, arquivo=None, buffer=1 << 16):
+        if arquivo is None:
+            self.arquivo = sys.stdout
+            self.proprio = False
+        else:
+            self.arquivo = open(arquivo, 'w', buffering=buffer)
+            self.proprio = True
+
+    def registrar(self, evento):
+        self.arquivo.write(formatar_evento(evento) + "\n")
+
+    def fechar(self):
+        if self.proprio:
+            self.arquivo.close()
+        else:
+            self.arquivo.flush()
+
+
+class SaidaAnel:
+    """Mantém em memória apenas os últimos `capacidade` eventos."""
+
+    def __init__(self, capacidade=1000):
+        self.eventos = deque(maxlen=capacidade)
+        self.registrar = self.eventos.append
+
+    def linhas(self):
+        return [formatar_evento(evento) for evento in self.eventos]
+
+    def fechar(self):
+        pass
+
+
+class SaidaCallback:
+    """Repassa cada evento (tupla) para uma função do usuário."""
+
+    def __init__(self, funcao):
+        self.registrar = funcao
+
+    def fechar(self):
+        pass
+
+
+class SaidaBinaria:
+    """
+    Grava os eventos no formato binário compacto:
+    cabeçalho MAGICO seguido de registros '<BII' (tipo, a, b);
+    EV_MENSAGEM guarda em `a` o tamanho do texto UTF-8 que vem logo depois.
+    """
+
+    def __init__(self, arquivo, buffer=1 << 16):
+        self.arquivo = open(arquivo, 'wb', buffering=buffer)
+        self.arquivo.write(MAGICO)
+        self._pack = _REGISTRO.pack
+
+    def registrar(self, evento):
+        tipo, a, b = evento
+        if tipo == EV_MENSAGEM:
+            texto = a.encode('utf-8')
+            self.arquivo.write(self._pack(tipo, len(texto), 0) + texto)
+        elif a is None:
+            self.arquivo.write(self._pack(tipo | SEM_VALOR, 0, b or 0))
+        else:
+            self.arquivo.write(self._pack(tipo, a & 0xFFFFFFFF, (b or 0) & 0xFFFFFFFF))
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+def ler_binario(arquivo):
+    """Lê um trace binário e gera os eventos (tipo, a, b) na ordem gravada."""
+    with open(arquivo, 'rb') as f:
+        dados = f.read()
+    if not dados.startswith(MAGICO):
+        raise ValueError(f"Arquivo não é um trace UFLA-RISC: {arquivo}")
+
+    pos = len(MAGICO)
+    tamanho = _REGISTRO.size
+    while pos < len(dados):
+        tipo, a, b = _REGISTRO.unpack_from(dados, pos)
+        pos += tamanho
+        if tipo == EV_MENSAGEM:
+            a, pos = dados[pos:pos + a].decode('utf-8'), pos + a
+        elif tipo & SEM_VALOR:
+            tipo, a = tipo & ~SEM_VALOR, None
+        yield tipo, a, b
+
+
+def decodificar_binario(arquivo):
+    """Converte um trace binário nas linhas de texto do modo didático."""
+    for evento in ler_binario(arquivo):
+        yield formatar_evento(evento)
+
+
+class Rastreador:
+    """
+    Filtra eventos por nível e os envia para a saída configurada.
+    O Simulador só chama os métodos de INSTRUCAO quando esse nível está ativo,
+    então um rastreador DESLIGADO (ou ausente) não custa nada no laço principal.
+    """
+
+    def __init__(self, nivel=INSTRUCAO, saida=None):
+        if isinstance(nivel, str):
+            nivel = NIVEIS[nivel]
+        self.nivel = nivel
+        self.saida = saida if saida is not None else SaidaTexto()
+        self._registrar = self.saida.registrar
+
+    def ativo(self, nivel):
+        return self.nivel >= nivel
+
+    def evento(self, tipo, a=None, b=None):
+        if self.nivel >= NIVEL_EVENTO[tipo]:
+            self._registrar((tipo, a, b))
+
+    # Atalhos usados no caminho de execução (sem checagem de nível: o chamador
+    # só os usa quando o rastreador de instruções está ativo)
+    def instrucao(self, pc, palavra):
+        self._registrar((EV_INSTRUCAO, pc, palavra))
+
+    def registrar(self, tipo, a=None, b=None):
+        self._registrar((tipo, a, b))
+
+    def mensagem(self, texto):
+        self.evento(EV_MENSAGEM, texto)
+
+    def fechar(self):
+        self.saida.fechar()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python rastreamento.py <trace.trbin>")
+    else:
+        for linha in decodificar_binario(sys.argv[1]):
+            print(linha)
@@ -0,0 +1,96 @@
+"""
+Execução reversa do Simulador UFLA-RISC por diário de desfazer.
+
+DiarioExecucao é um monitor que, antes de cada instrução, guarda só o que ela
+vai alterar: PC, flag running, valor antigo do registrador escrito e valor
+antigo da palavra de memória escrita (registradores_usados / acessos_memoria).
+Cada instrução do UFLA-RISC escreve no máximo um registrador e uma palavra de
+memória, então cada entrada é uma tupla de 6 campos:
+
+    (pc, running, registrador, valor antigo, endereço, valor antigo)
+
+com None nos campos de registrador/memória que a instrução não escreve. As
+entradas ficam em um deque limitado (buffer circular): depois de `capacidade`
+instruções as mais antigas são descartadas.
+
+Uso:
+    sim.iniciar_gravacao(capacidade=1_000_000)
+    sim.run(max_steps=5_000_000)
+    sim.step_back(10)
+    sim.run_back_until(lambda s: s.reg[3] == 0)
+"""
+from collections import deque
+
+
+class DiarioExecucao:
+    def __init__(self, capacidade=1_000_000):
+        self.entradas = deque(maxlen=capacidade)
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def antes(self, sim, pc, dec):
+        _, op, ra, rb, rc, _ = dec
+        reg = sim.reg
+        registrador = valor_reg = endereco = valor_mem = None
+
+        _, escritos = sim.registradores_usados(op, ra, rb, rc)
+        if escritos and escritos[0] < len(reg):
+            registrador = escritos[0]
+            valor_reg = reg[registrador]
+
+        try:
+            acessos = sim.acessos_memoria(op, ra, rc)
+        except IndexError:
+            acessos = ()  # registrador inválido: a própria instrução vai falhar
+        for tipo, alvo in acessos:
+            if tipo == 'w' and 0 <= alvo < len(sim.mem_data):
+                endereco = alvo
+                valor_mem = sim.mem_data[alvo]
+
+        self.entradas.append((pc, sim.running, registrador, valor_reg, endereco, valor_mem))
+
+    def desfazer(self, sim):
+        """Desfaz a última instrução gravada; retorna False se o diário está vazio."""
+        if not sim.running and not 0 <= sim.pc < len(sim.mem_instr) and self.entradas:
+            # o passo que parou por PC fora da memória não passa pelos monitores:
+            # ele só desligou `running`
+            sim.running = True
+            sim.passos -= 1
+            return True
+        if not self.entradas:
+            return False
+        pc, running, registrador, valor_reg, endereco, valor_mem = self.entradas.pop()
+        if endereco is not None:
+            sim.mem_data[endereco] = valor_mem
+        if registrador is not None:
+            sim.reg[registrador] = valor_reg
+        sim.pc = pc
+        sim.running = running
+        sim.passos -= 1
+        return True
+
+
+def step_back(sim, diario, n=1):
+    """Volta até n instruções; retorna quantas foram desfeitas."""
+    desfeitas = 0
+    while desfeitas < n and diario.desfazer(sim):
+        desfeitas += 1
+    if desfeitas:
+        sim.motivo_parada = None
+    return desfeitas
+
+
+def run_back_until(sim, diario, predicado):
+    """
+    Volta instrução a instrução até predicado(sim) ser verdadeiro ou o diário acabar.
+    Retorna o número de instruções desfeitas.
+    """
+    desfeitas = 0
+    while diario.desfazer(sim):
+        desfeitas += 1
+        if predicado(sim):
+            break
+    if desfeitas:
+        sim.motivo_parada = None
+    return desfeitas
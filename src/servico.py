@@ -0,0 +1,451 @@
+"""
+Serviço local de simulação UFLA-RISC: front end asyncio + pool de workers aquecidos.
+
+Cada execução por main.py paga a partida do Python, os imports e a construção
+do Interpretador/Simulador. O serviço fica no ar e recebe pedidos por um socket
+Unix ou TCP em localhost, um JSON por linha:
+
+    {"id": 1, "asm": "<texto>", "max_passos": 1000000, "timeout": 5, "engine": "blocos"}
+    {"id": 2, "bin": "<texto .bin>"}
+    {"id": 3, "uobj": "<objeto .uobj em base64>", "detectar_laco": true}
+    {"id": 4, "comando": "metricas"}
+
+e devolve uma linha JSON por pedido, na ordem em que terminam (o "id" do
+pedido volta na resposta), com o estado final: motivo_parada, passos, pc,
+registradores, memória de dados não nula e os tempos de fila/execução.
+
+Os pedidos vão para um ProcessPoolExecutor cujos workers são aquecidos na
+partida (imports, tabelas e um programa curto em cada motor) e reaproveitam o
+mesmo Interpretador e um Simulador por motor (reiniciar()). Quando o mesmo
+programa chega de novo ao mesmo worker, a montagem, a decodificação e os
+blocos compilados são reaproveitados.
+
+Fila e limites: no máximo `max_fila` pedidos pendentes (os demais são
+recusados com erro "fila cheia"); cada pedido tem um prazo (timeout) que conta
+desde a chegada: o worker executa com max_tempo = tempo restante, e o front
+end desiste da resposta se o prazo estourar com folga. Um timeout que não é
+número > 0, ou max_passos que não é inteiro >= 0 (ou null), é recusado na
+chegada com {"ok": false, "erro": "..."}.
+
+Uso:
+    python servico.py --socket /tmp/ufla.sock --workers 4
+    python servico.py --porta 8765
+    python servico.py --cliente --socket /tmp/ufla.sock teste1.asm teste2.uobj
+    python servico.py --cliente --socket /tmp/ufla.sock --metricas
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from interpretador import Interpretador
+from objeto import decodificar_objeto
+from simulador import Simulador
+
+MAX_PASSOS_PADRAO = 1_000_000
+TIMEOUT_PADRAO = 10.0
+FOLGA_TIMEOUT = 1.0                 # além do prazo, espera pelo max_tempo cooperativo do worker
+LIMITE_LINHA = 64 * 1024 * 1024     # tamanho máximo de uma linha de pedido
+MONTAGENS_EM_MEMORIA = 128          # montagens guardadas por worker (LRU)
+
+AQUECIMENTO = "address 0\nzeros r0\nlcl r1, 1\nlcl r3, 100\nadd r0, r0, r1\nbne r0, r3, 3\nhalt\n"
+
+
+# ----------------------------------------------------------------------
+# Lado do worker (processo do pool)
+# ----------------------------------------------------------------------
+
+_interp = None
+_simuladores = {}     # engine -> Simulador reaproveitado
+_carregados = {}      # engine -> (chave do programa, mem_instr, pc inicial)
+_montagens = OrderedDict()
+
+
+def _aquecer():
+    """Inicializador do worker: cria as instâncias e executa um programa curto em cada motor."""
+    global _interp
+    _interp = Interpretador(verbose=False)
+    for engine in Simulador.ENGINES:
+        executar_pedido({'asm': AQUECIMENTO, 'engine': engine}, time.time() + 60)
+    _carregados.clear()
+
+
+def _pronto():
+    time.sleep(0.05)  # segura o worker para o pool criar os demais
+    return os.getpid()
+
+
+def _segmentos(pedido):
+    """(chave, segmentos, símbolos) do programa do pedido; montagens ficam em uma LRU."""
+    if 'asm' in pedido:
+        chave = ('asm', pedido['asm'])
+        if chave in _montagens:
+            _montagens.move_to_end(chave)
+            return chave, _montagens[chave], {}
+        segmentos = _interp.montar(pedido['asm'])
+        _montagens[chave] = segmentos
+        if len(_montagens) > MONTAGENS_EM_MEMORIA:
+            _montagens.popitem(last=False)
+        return chave, segmentos, {}
+    if 'uobj' in pedido:
+        segmentos, simbolos = decodificar_objeto(base64.b64decode(pedido['uobj']))
+        return ('uobj', pedido['uobj']), segmentos, simbolos
+    if 'bin' in pedido:
+        return ('bin', pedido['bin']), None, {}
+    raise ValueError("pedido sem programa: use 'asm', 'bin' ou 'uobj'")
+
+
+def validar_limites(pedido):
+    """
+    Mensagem de erro se 'timeout' (segundos, número > 0) ou 'max_passos'
+    (inteiro >= 0 ou null = sem limite) do pedido são inválidos, senão None.
+    """
+    if 'timeout' in pedido:
+        timeout = pedido['timeout']
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 < timeout < float('inf'):
+            return f"timeout inválido: {timeout!r} (use um número de segundos maior que zero)"
+    if 'max_passos' in pedido:
+        max_passos = pedido['max_passos']
+        if max_passos is not None and (isinstance(max_passos, bool) or not isinstance(max_passos, int)
+                                       or max_passos < 0):
+            return f"max_passos inválido: {max_passos!r} (use um inteiro >= 0 ou null)"
+    return None
+
+
+def executar_pedido(pedido, prazo):
+    """
+    Executa um pedido no worker e retorna o estado final.
+    `prazo` é absoluto (time.time()): o tempo passado na fila já foi descontado.
+    """
+    inicio = time.time()
+    resultado = {
+        'ok': False, 'motivo_parada': None, 'passos': 0, 'pc': None,
+        'registradores': None, 'memoria': None, 'tempo_fila_s': None,
+        'tempo_execucao_s': None, 'worker': os.getpid(), 'erro': None,
+    }
+    restante = prazo - inicio
+    if restante <= 0:
+        resultado['erro'] = 'timeout'
+        return resultado
+
+    try:
+        engine = pedido.get('engine', 'blocos')
+        chave, segmentos, simbolos = _segmentos(pedido)
+
+        anterior = _carregados.get(engine)
+        mesmo_programa = anterior is not None and anterior[0] == chave
+        if mesmo_programa:
+            _, mem_instr, pc_inicio = anterior
+        else:
+            _interp.reiniciar()
+            if segmentos is None:
+                _interp.carregar_arquivo(pedido['bin'])
+            else:
+                _interp.carregar_segmentos(segmentos)
+                _interp.simbolos.update(simbolos)
+            mem_info = _interp.exportar_memoria()
+            mem_instr, pc_inicio = mem_info['mem_instr'], mem_info['address_start']
+
+        sim = _simuladores.get(engine)
+        if sim is None:
+            sim = _simuladores[engine] = Simulador(mem_instr, pc_inicio, engine=engine)
+        else:
+            sim.reiniciar(mem_instr, pc_inicio, manter_caches=mesmo_programa)
+
+        execucao = time.time()
+        sim.run(max_steps=pedido.get('max_passos', MAX_PASSOS_PADRAO), max_tempo=prazo - execucao,
+                detectar_laco=pedido.get('detectar_laco', False))
+        resultado['tempo_execucao_s'] = time.time() - execucao
+
+        # caches só valem para a próxima vez se o programa não escreveu na própria memória
+        if sim._instr_compartilhada:
+            _carregados[engine] = (chave, mem_instr, pc_inicio)
+        else:
+            _carregados.pop(engine, None)
+
+        resultado['ok'] = True
+        resultado['motivo_parada'] = sim.motivo_parada
+        resultado['passos'] = sim.passos
+        resultado['pc'] = sim.pc
+        resultado['registradores'] = list(sim.reg)
+        resultado['memoria'] = {str(i): val for i, val in sim.mem_data.itens_nao_zero()}
+    except Exception as e:
+        _carregados.clear()
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+    return resultado
+
+
+# ----------------------------------------------------------------------
+# Front end asyncio
+# ----------------------------------------------------------------------
+
+class ServicoSimulacao:
+    def __init__(self, workers=None, max_fila=1000, timeout=TIMEOUT_PADRAO, engine='blocos',
+                 max_passos=MAX_PASSOS_PADRAO):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_fila = max_fila
+        self.timeout = timeout
+        self.engine = engine
+        self.max_passos = max_passos
+        self.pool = None
+        self.servidor = None
+        self.socket = None
+
+        # métricas
+        self.inicio = None
+        self.recebidos = 0
+        self.concluidos = 0
+        self.erros = 0
+        self.timeouts = 0
+        self.rejeitados = 0
+        self.pools_recriados = 0
+        self.pendentes = 0
+        self.instrucoes = 0
+        self.latencias = deque(maxlen=10_000)
+
+    async def iniciar(self, socket=None, host='127.0.0.1', porta=None):
+        """Cria e aquece o pool e abre o socket Unix (`socket`) ou TCP (`host`:`porta`)."""
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_aquecer)
+        await asyncio.gather(*[loop.run_in_executor(self.pool, _pronto) for _ in range(self.workers)])
+        if socket is not None:
+            if os.path.exists(socket):
+                os.remove(socket)
+            self.socket = socket
+            self.servidor = await asyncio.start_unix_server(self._atender, path=socket, limit=LIMITE_LINHA)
+        else:
+            self.servidor = await asyncio.start_server(self._atender, host, porta, limit=LIMITE_LINHA)
+        self.inicio = time.perf_counter()
+        return self.servidor
+
+    async def servir(self):
+        async with self.servidor:
+            await self.servidor.serve_forever()
+
+    async def encerrar(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        if self.socket is not None and os.path.exists(self.socket):
+            os.remove(self.socket)
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+    async def processar(self, pedido):
+        """Executa um pedido no pool respeitando fila e prazo; retorna o dicionário de resposta."""
+        if pedido.get('comando') == 'metricas':
+            return self.metricas()
+
+        self.recebidos += 1
+        if self.pendentes >= self.max_fila:
+            self.rejeitados += 1
+            return {'ok': False, 'erro': 'fila cheia'}
+
+        erro = validar_limites(pedido)
+        if erro is not None:
+            self.erros += 1
+            return {'ok': False, 'erro': erro}
+
+        chegada = time.perf_counter()
+        timeout = pedido.get('timeout', self.timeout)
+        programa = {chave: pedido[chave] for chave in ('asm', 'bin', 'uobj') if chave in pedido}
+        programa['engine'] = pedido.get('engine', self.engine)
+        programa['max_passos'] = pedido.get('max_passos', self.max_passos)
+        programa['detectar_laco'] = pedido.get('detectar_laco', False)
+
+        self.pendentes += 1
+        pool = self.pool
+        try:
+            futuro = asyncio.get_running_loop().run_in_executor(
+                pool, executar_pedido, programa, time.time() + timeout)
+            resultado = await asyncio.wait_for(futuro, timeout + FOLGA_TIMEOUT)
+        except asyncio.TimeoutError:
+            # o worker não pode ser interrompido: ele termina pelo max_tempo e a resposta é descartada
+            resultado = {'ok': False, 'erro': 'timeout'}
+        except BrokenProcessPool as e:
+            # um worker morreu (kill, falta de memória): o pool inteiro fica inutilizável
+            self._recriar_pool(pool)
+            resultado = {'ok': False, 'erro': f"worker encerrado inesperadamente: {e}"}
+        finally:
+            self.pendentes -= 1
+
+        latencia = time.perf_counter() - chegada
+        resultado['latencia_s'] = latencia
+        if resultado.get('tempo_execucao_s') is not None:
+            resultado['tempo_fila_s'] = max(0.0, latencia - resultado['tempo_execucao_s'])
+        self.latencias.append(latencia)
+        self.concluidos += 1
+        self.instrucoes += resultado.get('passos', 0)
+        if resultado.get('erro') == 'timeout' or resultado.get('motivo_parada') == 'max_tempo':
+            self.timeouts += 1
+        elif not resultado['ok']:
+            self.erros += 1
+        return resultado
+
+    def _recriar_pool(self, quebrado):
+        """Troca o pool quebrado por um novo (uma vez só, se vários pedidos falharem juntos)."""
+        if self.pool is quebrado:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_aquecer)
+            self.pools_recriados += 1
+            quebrado.shutdown(wait=False, cancel_futures=True)
+
+    def metricas(self):
+        uptime = time.perf_counter() - self.inicio if self.inicio is not None else 0.0
+        latencias = sorted(self.latencias)
+
+        def percentil(q):
+            return latencias[int(q * (len(latencias) - 1))] if latencias else None
+
+        return {
+            'ok': True, 'workers': self.workers, 'uptime_s': uptime,
+            'recebidos': self.recebidos, 'concluidos': self.concluidos, 'erros': self.erros,
+            'timeouts': self.timeouts, 'rejeitados': self.rejeitados, 'em_fila': self.pendentes,
+            'pools_recriados': self.pools_recriados,
+            'vazao_por_s': self.concluidos / uptime if uptime else 0.0,
+            'instrucoes_por_s': self.instrucoes / uptime if uptime else 0.0,
+            'latencia_media_s': sum(latencias) / len(latencias) if latencias else None,
+            'latencia_p50_s': percentil(0.50),
+            'latencia_p95_s': percentil(0.95),
+            'latencia_p99_s': percentil(0.99),
+        }
+
+    async def _responder(self, pedido, writer, trava):
+        resultado = await self.processar(pedido)
+        resultado['id'] = pedido.get('id')
+        async with trava:
+            writer.write((json.dumps(resultado) + '\n').encode('utf-8'))
+            await writer.drain()
+
+    async def _atender(self, reader, writer):
+        """Uma conexão: lê pedidos até EOF e responde cada um assim que termina."""
+        trava = asyncio.Lock()
+        tarefas = set()
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                try:
+                    pedido = json.loads(linha)
+                    if not isinstance(pedido, dict):
+                        raise ValueError("pedido deve ser um objeto JSON")
+                except ValueError as e:
+                    async with trava:
+                        writer.write((json.dumps({'ok': False, 'id': None, 'erro': f"JSON inválido: {e}"})
+                                      + '\n').encode('utf-8'))
+                    continue
+                tarefa = asyncio.create_task(self._responder(pedido, writer, trava))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+            if tarefas:
+                await asyncio.gather(*tarefas)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+# ----------------------------------------------------------------------
+# Cliente
+# ----------------------------------------------------------------------
+
+def pedido_de_arquivo(caminho, **opcoes):
+    """Monta o pedido para um arquivo .asm, .bin ou .uobj."""
+    ext = os.path.splitext(caminho)[1].lower()
+    if ext == '.uobj':
+        with open(caminho, 'rb') as f:
+            pedido = {'uobj': base64.b64encode(f.read()).decode('ascii')}
+    elif ext in ('.asm', '.bin'):
+        with open(caminho, 'r') as f:
+            pedido = {ext[1:]: f.read()}
+    else:
+        raise ValueError(f"Extensão não suportada: {caminho}")
+    pedido.update(opcoes)
+    return pedido
+
+
+async def enviar(pedidos, socket=None, host='127.0.0.1', porta=None):
+    """Envia os pedidos em uma conexão e retorna as respostas na ordem em que chegaram."""
+    if socket is not None:
+        reader, writer = await asyncio.open_unix_connection(socket, limit=LIMITE_LINHA)
+    else:
+        reader, writer = await asyncio.open_connection(host, porta, limit=LIMITE_LINHA)
+    for pedido in pedidos:
+        writer.write((json.dumps(pedido) + '\n').encode('utf-8'))
+    await writer.drain()
+    respostas = []
+    for _ in pedidos:
+        linha = await reader.readline()
+        if not linha:
+            break
+        respostas.append(json.loads(linha))
+    writer.close()
+    await writer.wait_closed()
+    return respostas
+
+
+async def _servir(args):
+    servico = ServicoSimulacao(args.workers, args.max_fila, args.timeout, args.engine, args.max_passos)
+    await servico.iniciar(args.socket, args.host, args.porta)
+    endereco = args.socket or f"{args.host}:{args.porta}"
+    print(f"Serviço UFLA-RISC em {endereco} com {servico.workers} workers", flush=True)
+
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, parar.set)
+        except NotImplementedError:
+            pass  # sem suporte a sinais no loop (Windows): encerra por KeyboardInterrupt
+    try:
+        await parar.wait()
+    finally:
+        await servico.encerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de simulação UFLA-RISC")
+    parser.add_argument("arquivos", nargs='*', help="(cliente) programas .asm/.bin/.uobj a enviar")
+    parser.add_argument("--socket", help="caminho do socket Unix")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--porta", type=int, help="porta TCP (sem --socket)")
+    parser.add_argument("--workers", type=int, default=None, help="processos do pool (padrão: nº de CPUs)")
+    parser.add_argument("--max-fila", type=int, default=1000, help="pedidos pendentes antes de recusar")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_PADRAO, help="prazo padrão por pedido (s)")
+    parser.add_argument("--engine", choices=Simulador.ENGINES, default='blocos')
+    parser.add_argument("--max-passos", type=int, default=MAX_PASSOS_PADRAO, help="limite padrão de instruções")
+    parser.add_argument("--cliente", action="store_true", help="envia os arquivos a um serviço em execução")
+    parser.add_argument("--metricas", action="store_true", help="(cliente) pede as métricas do serviço")
+    args = parser.parse_args()
+
+    if args.socket is None and args.porta is None:
+        parser.error("informe --socket ou --porta")
+
+    if not args.cliente:
+        try:
+            asyncio.run(_servir(args))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    pedidos = [dict(pedido_de_arquivo(a), id=a) for a in args.arquivos]
+    if args.metricas:
+        pedidos.append({'id': 'metricas', 'comando': 'metricas'})
+    if not pedidos:
+        parser.error("nada a enviar: informe arquivos ou --metricas")
+    for resposta in asyncio.run(enviar(pedidos, args.socket, args.host, args.porta)):
+        json.dump(resposta, sys.stdout, ensure_ascii=False)
+        print()
+
+
+if __name__ == "__main__":
+    main()
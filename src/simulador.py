@@ -1,17 +1,48 @@
+import time
+from array import array
+
+from analise import AvancadorLacos
+from checkpoint import salvar_checkpoint, restaurar_checkpoint
+from compilador import CompiladorBlocos
+from laco import DetectorLaco
+from memoria import MemoriaPaginada, TAMANHO_PADRAO
+from reverso import DiarioExecucao, step_back, run_back_until
+from rastreamento import (INSTRUCAO, RESUMO, EV_REGISTRADOR, EV_MEMORIA, EV_BRANCH,
+                          EV_IGUAL, EV_DESVIO, EV_DIFERENTE, EV_HALT)
+
+
 class Simulador:
     """
     Simulador/Executor para o processador UFLA-RISC.
     Recebe memória de instruções já carregada pelo interpretador e endereço inicial.
+
+    Motores de execução (parâmetro `engine`):
+    - 'classico': fetch/decode/execute/writeback com cadeias if/elif (modo didático)
+    - 'despacho': tabela de handlers indexada pelo opcode inteiro (mesmo estado final)
+    - 'blocos': run() executa blocos básicos compilados para funções Python (CompiladorBlocos);
+                step() e código não traduzível usam o motor 'despacho'
+
+    Estado da máquina: registradores em array('I') (palavras de 32 bits sem sinal) e
+    memórias em memoria.MemoriaPaginada (páginas alocadas na primeira escrita), com
+    tamanho_dados palavras de dados. Uma MemoriaPaginada recebida em mem_instr é usada
+    sem cópia (pode ser compartilhada entre vários simuladores); ela só é copiada na
+    primeira escrita via escrever_instrucao(). Listas e arrays são copiados.
+
+    Instrumentação: objetos em `monitores` (ex.: perfil.Perfil) são chamados com
+    antes(sim, pc, dec) e depois(sim, pc, dec) a cada instrução. Com algum monitor
+    ativo, run() executa instrução a instrução; sem monitores o laço não muda.
+
+    Saída de depuração: `rastreador` (rastreamento.Rastreador) recebe os eventos.
+    Sem rastreador nada é impresso; no nível INSTRUCAO a execução passa pelo
+    motor clássico, que gera o trace passo a passo.
     """
 
-    def __init__(self, mem_instr, pc_start=0):
-        self.reg = [0] * 32
-        self.mem_data = [0] * 32768
-        self.mem_instr = mem_instr.copy()
-        self.pc = pc_start
-        self.base_adress = pc_start
-        self.running = True
-        self.tmp_result = None  # temporário para write-back
+    ENGINES = ('classico', 'despacho', 'blocos')
+    PASSOS_POR_FATIA = 100_000  # tempo e checkpoints são conferidos a cada fatia de instruções
+
+    def __init__(self, mem_instr, pc_start=0, engine='classico', rastreador=None,
+                 tamanho_dados=TAMANHO_PADRAO):
+        self.reiniciar(mem_instr, pc_start, tamanho_dados)
 
         # Todos os opcodes
         self.opcodes = {
@@ -32,6 +63,129 @@ class Simulador:
         self.mem_ops    = {'load', 'store'}                        # instruções que acessam memória
         self.reg_ops    = {op for op in self.opcodes.values()} - self.branch_ops - self.mem_ops  # resto (aritméticas, lógicas, shifts, etc.)
 
+        # opcode inteiro (8 bits) -> mnemônico, usado pela decodificação por máscaras
+        self.opcodes_int = {int(k, 2): v for k, v in self.opcodes.items()}
+
+        # Tabela de despacho: opcode inteiro -> handler (ra, rb, rc, addr)
+        self.tabela_despacho = self._montar_tabela_despacho()
+
+        if engine not in self.ENGINES:
+            raise ValueError(f"Motor de execução desconhecido: {engine} (use {', '.join(self.ENGINES)})")
+        self.engine = engine
+
+        self.rastreador = rastreador
+        # Rastreador por instrução: None quando desligado (checado com um único `is not None`)
+        self._rastro = rastreador if rastreador is not None and rastreador.ativo(INSTRUCAO) else None
+
+        if engine == 'classico' or self._rastro is not None:
+            self._passo = self.step_classico
+        else:
+            self._passo = self.step_despacho
+
+        self.compilador = CompiladorBlocos(self)
+
+    def reiniciar(self, mem_instr, pc_start=0, tamanho_dados=TAMANHO_PADRAO, manter_caches=False):
+        """
+        Carrega um novo programa e volta ao estado inicial, reaproveitando as
+        tabelas de opcodes/despacho e o compilador (workers do servico.py).
+        manter_caches=True preserva a decodificação e os blocos compilados: só
+        vale se mem_instr, pc_start e tamanho_dados são os da execução anterior.
+        """
+        self.reg = array('I', bytes(4 * 32))
+        self.mem_data = MemoriaPaginada(tamanho_dados)
+        if isinstance(mem_instr, MemoriaPaginada):
+            self.mem_instr = mem_instr          # entrega sem cópia (ver escrever_instrucao)
+            self._instr_compartilhada = True
+        else:
+            self.mem_instr = MemoriaPaginada.de_palavras(mem_instr)
+            self._instr_compartilhada = False
+        self.pc = pc_start
+        self.base_adress = pc_start
+        self.running = True
+        self.tmp_result = None  # temporário para write-back
+        self.passos = 0              # total de instruções executadas por run()
+        self.motivo_parada = None    # 'halt', 'fim_memoria', 'max_steps', 'max_tempo',
+                                     # 'breakpoint', 'watchpoint' ou 'loop_infinito' após run()
+        self.detalhe_parada = None   # ('breakpoint', pc), ('watchpoint', alvo, antigo, novo, pc)
+                                     # ou ('loop_infinito', pc, periodo)
+
+        # Controle de execução: run() para antes de executar um PC de `breakpoints`
+        # e logo após uma instrução mudar um registrador/endereço vigiado.
+        self.breakpoints = set()
+        self.watch_reg = set()
+        self.watch_mem = set()
+
+        self.monitores = []
+        self.diario = None  # DiarioExecucao do modo de gravação (execução reversa)
+        self.avanco = None  # analise.AvancadorLacos quando o avanço de laços está ativo
+        self.passos_saltados = 0  # instruções contadas em passos sem execução (avanço de laços)
+        self._parcial = 0  # instruções da fatia interrompida por exceção, somadas em passos por run()
+        self._voltas = 0   # voltas começadas por um bloco-laço compilado interrompido por exceção
+
+        if not manter_caches:
+            # Cache de decodificação: PC -> (opcode, op, ra, rb, rc, addr).
+            # Cada palavra é decodificada uma única vez; escrever_instrucao() invalida a entrada.
+            self.decode_cache = {}
+            # Cache de blocos compilados: PC de entrada -> (funcao, n_instrucoes, eh_laco) ou None
+            self.cache_blocos = {}
+
+    def escrever_instrucao(self, endereco, palavra):
+        """Escreve uma palavra na memória de instruções e invalida o cache de decodificação."""
+        if self._instr_compartilhada:
+            # copy-on-write: não altera a memória de outros simuladores/do interpretador
+            self.mem_instr = self.mem_instr.copia()
+            self._instr_compartilhada = False
+        self.mem_instr[endereco] = palavra & 0xFFFFFFFF
+        self.decode_cache.pop(endereco, None)
+        # um bloco compilado pode conter o endereço em qualquer posição: descarta todos
+        self.cache_blocos.clear()
+        if self.avanco is not None:
+            self.avanco.invalidar()
+
+    def limpar_cache_decodificacao(self):
+        """Descarta todas as instruções pré-decodificadas (ex.: após alterar mem_instr diretamente)."""
+        self.decode_cache.clear()
+        self.cache_blocos.clear()
+        if self.avanco is not None:
+            self.avanco.invalidar()
+
+    def decode_word(self, inst_word):
+        """
+        Decodifica uma palavra de 32 bits usando apenas máscaras e deslocamentos.
+        Retorna (opcode, op, ra, rb, rc, addr), com os mesmos campos de decode().
+        """
+        opcode = inst_word >> 24
+        op = self.opcodes_int.get(opcode, None)
+        if op is None:
+            raise ValueError(f"Instrução inválida no PC={self.pc}: {inst_word:032b}")
+
+        ra = (inst_word >> 16) & 0xFF
+        rb = (inst_word >> 8) & 0xFF
+        rc = inst_word & 0xFF
+
+        addr = None
+        if op == 'j' or op == 'jal':
+            addr = inst_word & 0xFFFFFF  # 24 bits (bits 8-31)
+        elif op == 'beq' or op == 'bne':
+            addr = rc                    # 8 bits (bits 24-31)
+
+        return opcode, op, ra, rb, rc, addr
+
+    def fetch_decoded(self):
+        """
+        Busca a instrução do PC atual já decodificada, consultando o cache.
+        Retorna None se o PC saiu da memória de instruções.
+        """
+        pc = self.pc
+        dec = self.decode_cache.get(pc)
+        if dec is None:
+            if pc >= len(self.mem_instr):
+                self.running = False
+                return None
+            dec = self.decode_word(self.mem_instr[pc])
+            self.decode_cache[pc] = dec
+        return dec
+
 
     def fetch(self):
         if self.pc >= len(self.mem_instr):
@@ -108,14 +262,15 @@ class Simulador:
         elif op == 'lsr':  # logical shift right
             self.tmp_result = (self.reg[ra] >> 1) & 0xFFFFFFFF
         elif op == 'push':
-            self.reg[31] -= 1
-            self.mem_data[self.reg[31]] = self.reg[ra]
+            # endereço da pilha dá a volta na memória de dados: r31 == 0 empilha no topo
+            self.reg[31] = (self.reg[31] - 1) & 0xFFFFFFFF
+            self.mem_data[self.reg[31] % len(self.mem_data)] = self.reg[ra]
         elif op == 'pop':
-            self.reg[ra] = self.mem_data[self.reg[31]]
-            self.reg[31] += 1
+            self.reg[ra] = self.mem_data[self.reg[31] % len(self.mem_data)]
+            self.reg[31] = (self.reg[31] + 1) & 0xFFFFFFFF
         elif op == 'call':
-            self.reg[31] -= 1
-            self.mem_data[self.reg[31]] = self.pc + 1
+            self.reg[31] = (self.reg[31] - 1) & 0xFFFFFFFF
+            self.mem_data[self.reg[31] % len(self.mem_data)] = self.pc + 1
             self.pc = self.reg[ra]
         else:
             raise ValueError(f"Instrução de registrador desconhecida: {op}")
@@ -131,17 +286,21 @@ class Simulador:
             self.pc = self.base_adress + self.reg[ra]
         elif op == 'beq':
             if self.reg[ra] == self.reg[rb]:
-                print("Igual: Ra:", self.reg[ra], "Rb:", self.reg[rb])
+                if self._rastro is not None:
+                    self._rastro.registrar(EV_IGUAL, self.reg[ra], self.reg[rb])
                 self.pc = self.base_adress + addr
             else:
-                print("Desvio: Ra:", self.reg[ra], "Rb:", self.reg[rb])
+                if self._rastro is not None:
+                    self._rastro.registrar(EV_DESVIO, self.reg[ra], self.reg[rb])
                 self.pc += 1
         elif op == 'bne':
             if self.reg[ra] != self.reg[rb]:
                 self.pc = self.base_adress + addr
-                print("Diferente: Ra:", self.reg[ra], "Rb:", self.reg[rb])
+                if self._rastro is not None:
+                    self._rastro.registrar(EV_DIFERENTE, self.reg[ra], self.reg[rb])
             else:
-                print("Igual: Ra:", self.reg[ra], "Rb:", self.reg[rb])
+                if self._rastro is not None:
+                    self._rastro.registrar(EV_IGUAL, self.reg[ra], self.reg[rb])
                 self.pc += 1
         elif op == 'ret':
             self.pc = self.base_adress + self.reg[31]
@@ -182,45 +341,557 @@ class Simulador:
         if op not in self.branch_ops:
             self.pc += 1
 
+    # ------------------------------------------------------------------
+    # Motor 'despacho': um handler por opcode, cada um atualiza o PC
+    # ------------------------------------------------------------------
+
+    def _montar_tabela_despacho(self):
+        tabela = [None] * 256
+        for opcode, op in self.opcodes_int.items():
+            tabela[opcode] = getattr(self, '_op_' + op)
+        return tabela
+
+    def _op_add(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (reg[ra] + reg[rb]) & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_sub(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (reg[ra] - reg[rb]) & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_xor(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = reg[ra] ^ reg[rb]
+        self.pc += 1
+
+    def _op_or(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = reg[ra] | reg[rb]
+        self.pc += 1
+
+    def _op_and(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = reg[ra] & reg[rb]
+        self.pc += 1
+
+    def _op_mult(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (reg[ra] * reg[rb]) & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_div(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = 0 if reg[rb] == 0 else (reg[ra] // reg[rb]) & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_cmp(self, ra, rb, rc, addr):
+        # Mesmo comportamento do motor clássico: cmp não tem semântica definida
+        raise ValueError("Instrução de registrador desconhecida: cmp")
+
+    def _op_inc(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (reg[rc] + 1) & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_dec(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (reg[rc] - 1) & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_zeros(self, ra, rb, rc, addr):
+        self.reg[rc] = 0
+        self.pc += 1
+
+    def _op_passnota(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (~reg[ra]) & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_passa(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = reg[ra]
+        self.pc += 1
+
+    def _op_lcl(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (reg[rc] & 0xFFFF0000) | (ra << 8) | rb
+        self.pc += 1
+
+    def _op_lch(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (((ra << 8) | rb) << 16) | (reg[rc] & 0x0000FFFF)
+        self.pc += 1
+
+    def _op_asl(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = (reg[ra] << 1) & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_asr(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = reg[ra] >> 1
+        self.pc += 1
+
+    _op_lsl = _op_asl
+    _op_lsr = _op_asr
+
+    def _op_push(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[31] = (reg[31] - 1) & 0xFFFFFFFF
+        self.mem_data[reg[31] % len(self.mem_data)] = reg[ra]
+        self.pc += 1
+
+    def _op_call(self, ra, rb, rc, addr):
+        # call não está em branch_ops: o writeback do motor clássico ainda soma 1 ao PC
+        reg = self.reg
+        reg[31] = (reg[31] - 1) & 0xFFFFFFFF
+        self.mem_data[reg[31] % len(self.mem_data)] = self.pc + 1
+        self.pc = reg[ra] + 1
+
+    def _op_load(self, ra, rb, rc, addr):
+        reg = self.reg
+        reg[rc] = self.mem_data[self.base_adress + reg[ra]] & 0xFFFFFFFF
+        self.pc += 1
+
+    def _op_store(self, ra, rb, rc, addr):
+        reg = self.reg
+        self.mem_data[self.base_adress + reg[rc]] = reg[ra]
+        self.pc += 1
+
+    def _op_j(self, ra, rb, rc, addr):
+        self.pc = self.base_adress + addr
+
+    def _op_jal(self, ra, rb, rc, addr):
+        self.reg[31] = self.pc + 1
+        self.pc = self.base_adress + addr
+
+    def _op_jr(self, ra, rb, rc, addr):
+        self.pc = self.base_adress + self.reg[ra]
+
+    def _op_beq(self, ra, rb, rc, addr):
+        reg = self.reg
+        if reg[ra] == reg[rb]:
+            self.pc = self.base_adress + addr
+        else:
+            self.pc += 1
+
+    def _op_bne(self, ra, rb, rc, addr):
+        reg = self.reg
+        if reg[ra] != reg[rb]:
+            self.pc = self.base_adress + addr
+        else:
+            self.pc += 1
+
+    def _op_ret(self, ra, rb, rc, addr):
+        self.pc = self.base_adress + self.reg[31]
+
+    def _op_halt(self, ra, rb, rc, addr):
+        self.running = False
+
+    def step_despacho(self):
+        if not self.running:
+            return
+
+        dec = self.fetch_decoded()
+        if dec is None:
+            self.running = False
+            return
+
+        opcode, _, ra, rb, rc, addr = dec
+        self.tabela_despacho[opcode](ra, rb, rc, addr)
+
     def step(self):
+        """Executa uma instrução com o motor selecionado em `engine`."""
+        self._passo()
+
+    def step_classico(self):
         if not self.running:
             return
 
-        inst_bin = self.fetch()
-        if inst_bin is None:
+        dec = self.fetch_decoded()
+        if dec is None:
             self.running = False
             return
 
-        op, ra, rb, rc, addr = self.decode(inst_bin)
+        _, op, ra, rb, rc, addr = dec
 
         # --- Debug: mostra a instrução e registradores ---
-        print(f"\nPC={self.pc} | Inst={inst_bin} | Op={op}")
+        rastro = self._rastro
+        if rastro is not None:
+            rastro.instrucao(self.pc, self.mem_instr[self.pc])
 
         # --------- Escolhe tipo de execução ---------
         if op == 'halt':
             self.running = False
-            print(f"HALT encontrado no PC={self.pc}")
+            if self.rastreador is not None:
+                self.rastreador.evento(EV_HALT, self.pc)
             return
         elif op in self.branch_ops:
             self.execute_branch(op, ra, rb, rc, addr)
-            print(f"Branch executado: PC agora = {self.pc}")
+            if rastro is not None:
+                rastro.registrar(EV_BRANCH, self.pc)
         elif op in {'load', 'store'}:
             self.execute_memory(op, ra, rc)
-            print(f"Memória executada: tmp_result={self.tmp_result}")
+            if rastro is not None:
+                rastro.registrar(EV_MEMORIA, self.tmp_result)
         else:
             self.execute_register(op, ra, rb, rc)
-            print(f"Operação registrador: tmp_result={self.tmp_result}")
+            if rastro is not None:
+                rastro.registrar(EV_REGISTRADOR, self.tmp_result)
 
         # --- Debug: writeback ---
         self.writeback(op, rc)
 
-    def run(self, max_steps=1000):
+    def run_blocos(self, max_steps, lacos=None, limite_avanco=None):
+        """
+        Laço do motor 'blocos': executa um bloco compilado por iteração.
+        Se o bloco não cabe no limite restante de steps, ou se o PC não tem
+        tradução, executa uma única instrução pelo interpretador.
+        lacos: {PC do cabeçalho: analise.FormaFechada} dos laços que podem ser avançados.
+        limite_avanco: instruções que os avanços podem somar nesta chamada, mesmo
+        além de max_steps (None = sem limite).
+        Retorna o número de instruções executadas; se uma exceção interrompe o
+        laço, esse número fica em self._parcial (como nos demais laços).
+        """
+        cache = self.cache_blocos
+        compilar = self.compilador.compilar
+        passo = self.step_despacho
+        reg, mem = self.reg, self.mem_data
         steps = 0
-        while self.running and steps < max_steps:
-            self.step()
-            steps += 1
-        if steps >= max_steps:
-            print(f"Máximo de {max_steps} steps atingido, execução interrompida.")
+        entrada = None  # PC do bloco compilado em execução
+        try:
+            while self.running and steps < max_steps:
+                pc = self.pc
+                if lacos is not None and pc in lacos:
+                    n = lacos[pc].avancar(self, None if limite_avanco is None else limite_avanco - steps)
+                    if n:
+                        steps += n
+                        self.passos_saltados += n
+                        continue
+                if pc in cache:
+                    bloco = cache[pc]
+                else:
+                    bloco = cache[pc] = compilar(pc)
+
+                if bloco is None or steps + bloco[1] > max_steps:
+                    passo()
+                    steps += 1
+                elif bloco[2]:
+                    funcao, n = bloco[0], bloco[1]
+                    entrada = pc
+                    self.pc, voltas = funcao(self, reg, mem, (max_steps - steps) // n)
+                    entrada = None
+                    steps += voltas * n
+                else:
+                    entrada = pc
+                    self.pc = bloco[0](self, reg, mem)
+                    entrada = None
+                    steps += bloco[1]
+        except BaseException:
+            if entrada is not None:
+                # o bloco é sequencial e registra o PC antes do que pode falhar:
+                # executou as voltas completas e as instruções de entrada até sim.pc
+                if bloco[2]:
+                    steps += (self._voltas - 1) * bloco[1]
+                steps += self.pc - entrada
+            self._parcial = steps
+            raise
+        return steps
+
+    def acessos_memoria(self, op, ra, rc):
+        """
+        Acessos à memória de dados que a instrução fará, calculados antes de executá-la:
+        lista de ('r' | 'w', endereço).
+        """
+        if op == 'load':
+            return [('r', self.base_adress + self.reg[ra])]
+        if op == 'store':
+            return [('w', self.base_adress + self.reg[rc])]
+        if op == 'push' or op == 'call':
+            return [('w', ((self.reg[31] - 1) & 0xFFFFFFFF) % len(self.mem_data))]
+        return []
+
+    def registradores_usados(self, op, ra, rb, rc):
+        """Retorna (lidos, escritos): registradores lidos e escritos pela instrução."""
+        campos = {'ra': ra, 'rb': rb, 'rc': rc, 31: 31}
+        lidos = CompiladorBlocos.LEITURAS.get(op, ())
+        escritos = CompiladorBlocos.ESCRITAS.get(op, ())
+        return tuple(campos[c] for c in lidos), tuple(campos[c] for c in escritos)
+
+    def adicionar_monitor(self, monitor):
+        self.monitores.append(monitor)
+
+    def remover_monitor(self, monitor):
+        self.monitores.remove(monitor)
+
+    def run_monitorado(self, max_steps, parar_no_inicio=False):
+        """
+        Laço instrução a instrução que chama os monitores antes e depois de cada passo
+        e confere breakpoints e watchpoints. Uma parada por breakpoint/watchpoint
+        fica em self.detalhe_parada. Retorna o número de instruções executadas.
+        parar_no_inicio: o breakpoint também vale para a primeira instrução do laço
+        (run() passa True, exceto ao retomar de uma parada nesse breakpoint).
+        """
+        antes = [m.antes for m in self.monitores if hasattr(m, 'antes')]
+        depois = [m.depois for m in self.monitores if hasattr(m, 'depois')]
+        passo = self._passo
+        breakpoints = self.breakpoints
+        reg, mem = self.reg, self.mem_data
+        # valores vigiados no início: a primeira mudança interrompe o laço
+        vigiados_reg = [(r, reg[r]) for r in sorted(self.watch_reg)]
+        vigiados_mem = [(e, mem[e]) for e in sorted(self.watch_mem)]
+        steps = 0
+        try:
+            while self.running and steps < max_steps:
+                pc = self.pc
+                if pc in breakpoints and (steps or parar_no_inicio):
+                    self.detalhe_parada = ('breakpoint', pc)
+                    break
+                dec = self.fetch_decoded()
+                if dec is None:
+                    # PC fora da memória: o passo do motor encerra a execução
+                    passo()
+                    steps += 1
+                    break
+                for chamada in antes:
+                    chamada(self, pc, dec)
+                passo()
+                steps += 1
+                for chamada in depois:
+                    chamada(self, pc, dec)
+                if self.detalhe_parada is not None:
+                    break  # parada pedida por um monitor (ex.: laco.DetectorLaco)
+                for r, antigo in vigiados_reg:
+                    if reg[r] != antigo:
+                        self.detalhe_parada = ('watchpoint', f"R{r:02}", antigo, reg[r], pc)
+                        return steps
+                for e, antigo in vigiados_mem:
+                    if mem[e] != antigo:
+                        self.detalhe_parada = ('watchpoint', f"mem[{e}]", antigo, mem[e], pc)
+                        return steps
+        except BaseException:
+            self._parcial = steps
+            raise
+        return steps
+
+    def _executar(self, max_steps, parar_no_inicio=False, limite_avanco=None):
+        """
+        Executa até max_steps instruções no laço adequado; retorna quantas foram executadas.
+        Com o avanço de laços ativo, os laços avançados podem passar de max_steps
+        até limite_avanco (None = sem limite).
+        """
+        if self.monitores or self.breakpoints or self.watch_reg or self.watch_mem:
+            return self.run_monitorado(max_steps, parar_no_inicio)
+        lacos = None
+        if self.avanco is not None and self._rastro is None:
+            lacos = self.avanco.lacos() or None
+        if self.engine == 'blocos' and self._rastro is None:
+            return self.run_blocos(max_steps, lacos, limite_avanco)
+        if lacos is not None:
+            return self.run_avancando(max_steps, lacos, limite_avanco)
+        passo = self._passo
+        steps = 0
+        try:
+            while self.running and steps < max_steps:
+                passo()
+                steps += 1
+        except BaseException:
+            self._parcial = steps
+            raise
+        return steps
+
+    def run_avancando(self, max_steps, lacos, limite_avanco=None):
+        """
+        Laço instrução a instrução que avança em forma fechada os laços de `lacos`
+        (até limite_avanco instruções somadas, como em run_blocos).
+        """
+        passo = self._passo
+        steps = 0
+        try:
+            while self.running and steps < max_steps:
+                forma = lacos.get(self.pc)
+                if forma is not None:
+                    n = forma.avancar(self, None if limite_avanco is None else limite_avanco - steps)
+                    if n:
+                        steps += n
+                        self.passos_saltados += n
+                        continue
+                passo()
+                steps += 1
+        except BaseException:
+            self._parcial = steps
+            raise
+        return steps
+
+    def ativar_avanco_lacos(self):
+        """
+        Liga o avanço de laços contados em forma fechada (analise.py): run() pula
+        as voltas e soma as instruções puladas em passos e em passos_saltados.
+        Não vale com monitores, breakpoints, watchpoints ou trace por instrução.
+        """
+        self.avanco = AvancadorLacos(self)
+        return self.avanco
+
+    def desativar_avanco_lacos(self):
+        self.avanco = None
+
+    def run(self, max_steps=1000, perfil=None, checkpoint_cada=None, checkpoint_arquivo=None,
+            max_tempo=None, detectar_laco=False):
+        """
+        Executa até halt, max_steps instruções (None = sem limite), max_tempo segundos,
+        breakpoint (PC em self.breakpoints) ou watchpoint (mudança de registrador em
+        self.watch_reg ou de endereço em self.watch_mem). O motivo fica em motivo_parada.
+
+        Os limites de tempo e os checkpoints são conferidos entre fatias de
+        PASSOS_POR_FATIA instruções, fora do laço interno do motor.
+
+        perfil: perfil.Perfil opcional que coleta estatísticas só durante esta chamada.
+        checkpoint_cada: grava o estado em checkpoint_arquivo a cada N instruções (ver checkpoint.py).
+        detectar_laco: para com motivo 'loop_infinito' se o estado completo se repetir (ver laco.py).
+
+        Uma exceção de instrução (opcode inválido, endereço fora da memória) é
+        propagada; passos inclui as instruções executadas antes dela.
+        """
+        if perfil is not None or detectar_laco:
+            temporarios = [m for m in (perfil, DetectorLaco() if detectar_laco else None) if m is not None]
+            for monitor in temporarios:
+                self.adicionar_monitor(monitor)
+            try:
+                return self.run(max_steps, checkpoint_cada=checkpoint_cada,
+                                checkpoint_arquivo=checkpoint_arquivo, max_tempo=max_tempo)
+            finally:
+                for monitor in temporarios:
+                    self.remover_monitor(monitor)
+
+        if checkpoint_cada is not None and not checkpoint_arquivo:
+            raise ValueError("checkpoint_cada requer checkpoint_arquivo")
+
+        limite_tempo = None if max_tempo is None else time.perf_counter() + max_tempo
+        # retomar de uma parada em breakpoint executa a instrução do breakpoint;
+        # nas demais fatias (e execuções) um breakpoint no PC da fronteira para
+        retomando = (self.motivo_parada == 'breakpoint' and self.detalhe_parada is not None
+                     and self.detalhe_parada[1] == self.pc)
+        self.detalhe_parada = None
+        sem_tempo = False
+        steps = 0
+        desde_checkpoint = 0
+        while self.running:
+            fatia = self.PASSOS_POR_FATIA
+            if max_steps is not None:
+                if steps >= max_steps:
+                    break
+                fatia = min(fatia, max_steps - steps)
+            if checkpoint_cada is not None:
+                fatia = min(fatia, checkpoint_cada - desde_checkpoint)
+
+            if limite_tempo is None and checkpoint_cada is None:
+                # sem limite conferido entre fatias: um laço avançado pode pular
+                # todo o orçamento restante de uma vez
+                limite_avanco = None if max_steps is None else max_steps - steps
+            else:
+                limite_avanco = fatia
+            self._parcial = 0
+            try:
+                executados = self._executar(fatia, not retomando, limite_avanco)
+            except BaseException:
+                # as instruções da fatia executadas antes da exceção também contam
+                self.passos += self._parcial
+                raise
+            retomando = False
+            steps += executados
+            self.passos += executados
+            desde_checkpoint += executados
+
+            if checkpoint_cada is not None and desde_checkpoint >= checkpoint_cada:
+                self.salvar_checkpoint(checkpoint_arquivo)
+                desde_checkpoint = 0
+            if self.detalhe_parada is not None:
+                break
+            if limite_tempo is not None and self.running and time.perf_counter() >= limite_tempo:
+                sem_tempo = True
+                break
+        if checkpoint_cada is not None and desde_checkpoint:
+            self.salvar_checkpoint(checkpoint_arquivo)  # estado final, para retomar depois
+
+        if self.detalhe_parada is not None:
+            self.motivo_parada = self.detalhe_parada[0]
+        elif sem_tempo:
+            self.motivo_parada = 'max_tempo'
+        elif self.running:
+            self.motivo_parada = 'max_steps'
+        else:
+            self.motivo_parada = 'halt' if self.parado_em_halt() else 'fim_memoria'
+
+        rastreador = self.rastreador
+        if rastreador is not None and rastreador.ativo(RESUMO):
+            # o motor clássico já registra o HALT no próprio passo
+            if steps and self._passo != self.step_classico and self.motivo_parada == 'halt':
+                rastreador.evento(EV_HALT, self.pc)
+            if max_steps is not None and steps >= max_steps:
+                rastreador.mensagem(f"Máximo de {max_steps} steps atingido, execução interrompida.")
+            elif self.motivo_parada != 'halt' and self.motivo_parada != 'fim_memoria':
+                rastreador.mensagem(self.descrever_parada())
+
+    def descrever_parada(self):
+        """Texto do motivo da última parada de run()."""
+        motivo = self.motivo_parada
+        if motivo == 'breakpoint':
+            return f"Breakpoint no PC={self.detalhe_parada[1]}, execução interrompida."
+        if motivo == 'watchpoint':
+            _, alvo, antigo, novo, pc = self.detalhe_parada
+            return f"Watchpoint: {alvo} mudou de {antigo} para {novo} no PC={pc}, execução interrompida."
+        if motivo == 'loop_infinito':
+            _, pc, periodo = self.detalhe_parada
+            return (f"Loop infinito no PC={pc}: o estado se repete a cada {periodo} instruções, "
+                    "execução interrompida.")
+        if motivo == 'max_tempo':
+            return "Tempo máximo atingido, execução interrompida."
+        if motivo == 'max_steps':
+            return "Máximo de steps atingido, execução interrompida."
+        if motivo == 'fim_memoria':
+            return "PC fora da memória de instruções, execução encerrada."
+        return "Execução encerrada por halt."
+
+    def iniciar_gravacao(self, capacidade=1_000_000):
+        """
+        Liga o modo de gravação: run() passa a guardar, para as últimas `capacidade`
+        instruções, o estado que cada uma alterou (reverso.DiarioExecucao).
+        """
+        if self.diario is not None:
+            self.remover_monitor(self.diario)
+        self.diario = DiarioExecucao(capacidade)
+        self.adicionar_monitor(self.diario)
+
+    def parar_gravacao(self):
+        if self.diario is not None:
+            self.remover_monitor(self.diario)
+            self.diario = None
+
+    def step_back(self, n=1):
+        """Desfaz as últimas n instruções gravadas; retorna quantas foram desfeitas."""
+        if self.diario is None:
+            raise RuntimeError("Execução reversa requer iniciar_gravacao()")
+        return step_back(self, self.diario, n)
+
+    def run_back_until(self, predicado):
+        """Volta instrução a instrução até predicado(sim) ser verdadeiro; retorna quantas foram desfeitas."""
+        if self.diario is None:
+            raise RuntimeError("Execução reversa requer iniciar_gravacao()")
+        return run_back_until(self, self.diario, predicado)
+
+    def salvar_checkpoint(self, caminho):
+        """Grava o estado completo da máquina em um arquivo .ckpt (checkpoint.py)."""
+        salvar_checkpoint(self, caminho)
+
+    def restaurar_checkpoint(self, caminho):
+        """Restaura registradores, PC, memórias e contagem de passos de um arquivo .ckpt."""
+        restaurar_checkpoint(self, caminho)
+
+    def parado_em_halt(self):
+        """Verdadeiro se o PC atual aponta para uma instrução halt."""
+        return 0 <= self.pc < len(self.mem_instr) and self.mem_instr[self.pc] >> 24 == 0xFF
 
     def dump_regs(self):
         print("=== Registradores ===")
@@ -229,7 +900,6 @@ class Simulador:
 
     def dump_mem_data(self):
         print("=== Memória de Dados (não zero) ===")
-        for i, val in enumerate(self.mem_data):
-            if val != 0:
-                print(f"{i}: {val:032b}  ({val})")
+        for i, val in self.mem_data.itens_nao_zero():
+            print(f"{i}: {val:032b}  ({val})")
 
@@ -0,0 +1,267 @@
+"""
+Simulação vetorizada (lock-step) de N instâncias do mesmo programa UFLA-RISC.
+
+Cada instância ("lane") tem seus próprios registradores, memória de dados e PC:
+- registradores: matriz N x 32 uint32
+- memória de dados: matriz N x 32768 uint32
+- PC: vetor de N posições
+
+A cada step, as lanes ainda em execução são agrupadas pelo PC; cada grupo executa
+a instrução do seu PC de uma vez com operações NumPy. Lanes que divergem em
+beq/bne passam a formar grupos diferentes e voltam a se juntar quando os PCs
+coincidem. A semântica de cada instrução é a mesma do Simulador escalar.
+
+Requer NumPy (dependência opcional: o resto do simulador não precisa dela).
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+from simulador import Simulador
+
+TAM_MEM_DATA = 32768
+
+
+class SimuladorVetorizado:
+    """
+    Executa N instâncias do mesmo binário em lock-step.
+
+    - mem_instr, pc_start: como no Simulador
+    - n: número de instâncias
+    - reg_inicial: matriz N x 32 (ou vetor de 32, replicado) com os registradores iniciais
+    - mem_inicial: dicionário {endereço: valores} (escalar ou vetor de N) para a memória de dados
+    """
+
+    def __init__(self, mem_instr, pc_start=0, n=1, reg_inicial=None, mem_inicial=None):
+        if np is None:
+            raise ImportError("SimuladorVetorizado requer NumPy: pip install numpy")
+
+        self.n = n
+        self.base_adress = pc_start
+        self.reg = np.zeros((n, 32), dtype=np.uint32)
+        self.mem_data = np.zeros((n, TAM_MEM_DATA), dtype=np.uint32)
+        self.pc = np.full(n, pc_start, dtype=np.int64)
+        self.running = np.ones(n, dtype=bool)
+        self.passos = np.zeros(n, dtype=np.int64)
+
+        if reg_inicial is not None:
+            self.reg[:] = np.asarray(reg_inicial, dtype=np.uint32)
+        for endereco, valores in (mem_inicial or {}).items():
+            self.mem_data[:, endereco] = valores
+
+        # Decodificação reaproveitada do Simulador escalar (cache por PC)
+        self._decodificador = Simulador(mem_instr, pc_start, engine='despacho')
+        self.mem_instr = self._decodificador.mem_instr
+
+        self._handlers = {op: getattr(self, '_v_' + op)
+                          for op in self._decodificador.opcodes.values() if op != 'cmp'}
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def _decodificar(self, pc):
+        dec = self._decodificador.decode_cache.get(pc)
+        if dec is None:
+            self._decodificador.pc = pc
+            dec = self._decodificador.decode_word(self.mem_instr[pc])
+            self._decodificador.decode_cache[pc] = dec
+        return dec
+
+    def _executar_grupo(self, pc, lanes):
+        """Executa a instrução em `pc` para as lanes indicadas (vetor de índices)."""
+        # como no Simulador, o passo que encontra o fim da memória conta, e o que
+        # levanta exceção não
+        if pc >= len(self.mem_instr):
+            self.running[lanes] = False
+            self.passos[lanes] += 1
+            return
+
+        _, op, ra, rb, rc, addr = self._decodificar(pc)
+        handler = self._handlers.get(op)
+        if handler is None:
+            raise ValueError(f"Instrução de registrador desconhecida: {op}")
+        handler(lanes, pc, ra, rb, rc, addr)
+        self.passos[lanes] += 1
+
+    def step(self):
+        """Executa uma instrução em todas as lanes ainda em execução."""
+        ativas = np.flatnonzero(self.running)
+        if ativas.size == 0:
+            return
+        pcs = self.pc[ativas]
+        primeiro = int(pcs[0])
+        if (pcs == primeiro).all():
+            # caso comum: todas as lanes no mesmo PC
+            self._executar_grupo(primeiro, ativas)
+            return
+        for pc in np.unique(pcs):
+            self._executar_grupo(int(pc), ativas[pcs == pc])
+
+    def run(self, max_steps=1000):
+        steps = 0
+        while steps < max_steps and self.running.any():
+            self.step()
+            steps += 1
+        return steps
+
+    # ------------------------------------------------------------------
+    # Resultados
+    # ------------------------------------------------------------------
+
+    def estado(self, i):
+        """Estado final da lane i: (registradores, pc, memória não zero, running)."""
+        mem = self.mem_data[i]
+        nao_zero = np.flatnonzero(mem)
+        return ([int(v) for v in self.reg[i]], int(self.pc[i]),
+                {int(e): int(mem[e]) for e in nao_zero}, bool(self.running[i]))
+
+    # ------------------------------------------------------------------
+    # Handlers vetorizados: mesma semântica dos _op_* do Simulador.
+    # Aritmética em uint32 já é módulo 2^32.
+    # ------------------------------------------------------------------
+
+    def _avanca(self, lanes):
+        self.pc[lanes] += 1
+
+    def _v_add(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra] + self.reg[lanes, rb]
+        self._avanca(lanes)
+
+    def _v_sub(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra] - self.reg[lanes, rb]
+        self._avanca(lanes)
+
+    def _v_xor(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra] ^ self.reg[lanes, rb]
+        self._avanca(lanes)
+
+    def _v_or(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra] | self.reg[lanes, rb]
+        self._avanca(lanes)
+
+    def _v_and(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra] & self.reg[lanes, rb]
+        self._avanca(lanes)
+
+    def _v_mult(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra] * self.reg[lanes, rb]
+        self._avanca(lanes)
+
+    def _v_div(self, lanes, pc, ra, rb, rc, addr):
+        b = self.reg[lanes, rb]
+        zero = b == 0
+        if zero.all():
+            # como no escalar, ra nem é lido quando o divisor é zero
+            self.reg[lanes, rc] = 0
+        else:
+            a = self.reg[lanes, ra]
+            self.reg[lanes, rc] = np.where(zero, np.uint32(0), a // np.where(zero, np.uint32(1), b))
+        self._avanca(lanes)
+
+    def _v_inc(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, rc] + np.uint32(1)
+        self._avanca(lanes)
+
+    def _v_dec(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, rc] - np.uint32(1)
+        self._avanca(lanes)
+
+    def _v_zeros(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = 0
+        self._avanca(lanes)
+
+    def _v_passnota(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = ~self.reg[lanes, ra]
+        self._avanca(lanes)
+
+    def _v_passa(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra]
+        self._avanca(lanes)
+
+    def _v_lcl(self, lanes, pc, ra, rb, rc, addr):
+        const16 = np.uint32((ra << 8) | rb)
+        self.reg[lanes, rc] = (self.reg[lanes, rc] & np.uint32(0xFFFF0000)) | const16
+        self._avanca(lanes)
+
+    def _v_lch(self, lanes, pc, ra, rb, rc, addr):
+        const16 = np.uint32(((ra << 8) | rb) << 16)
+        self.reg[lanes, rc] = const16 | (self.reg[lanes, rc] & np.uint32(0x0000FFFF))
+        self._avanca(lanes)
+
+    def _v_asl(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra] << np.uint32(1)
+        self._avanca(lanes)
+
+    def _v_asr(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, rc] = self.reg[lanes, ra] >> np.uint32(1)
+        self._avanca(lanes)
+
+    _v_lsl = _v_asl
+    _v_lsr = _v_asr
+
+    def _v_push(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, 31] = self.reg[lanes, 31] - np.uint32(1)
+        self.mem_data[lanes, self.reg[lanes, 31] % TAM_MEM_DATA] = self.reg[lanes, ra]
+        self._avanca(lanes)
+
+    def _v_call(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, 31] = self.reg[lanes, 31] - np.uint32(1)
+        self.mem_data[lanes, self.reg[lanes, 31] % TAM_MEM_DATA] = pc + 1
+        self.pc[lanes] = self.reg[lanes, ra].astype(np.int64) + 1
+
+    def _v_load(self, lanes, pc, ra, rb, rc, addr):
+        enderecos = self.base_adress + self.reg[lanes, ra].astype(np.int64)
+        self.reg[lanes, rc] = self.mem_data[lanes, enderecos]
+        self._avanca(lanes)
+
+    def _v_store(self, lanes, pc, ra, rb, rc, addr):
+        enderecos = self.base_adress + self.reg[lanes, rc].astype(np.int64)
+        self.mem_data[lanes, enderecos] = self.reg[lanes, ra]
+        self._avanca(lanes)
+
+    def _v_j(self, lanes, pc, ra, rb, rc, addr):
+        self.pc[lanes] = self.base_adress + addr
+
+    def _v_jal(self, lanes, pc, ra, rb, rc, addr):
+        self.reg[lanes, 31] = pc + 1
+        self.pc[lanes] = self.base_adress + addr
+
+    def _v_jr(self, lanes, pc, ra, rb, rc, addr):
+        self.pc[lanes] = self.base_adress + self.reg[lanes, ra].astype(np.int64)
+
+    def _v_beq(self, lanes, pc, ra, rb, rc, addr):
+        tomado = self.reg[lanes, ra] == self.reg[lanes, rb]
+        self.pc[lanes] = np.where(tomado, self.base_adress + addr, pc + 1)
+
+    def _v_bne(self, lanes, pc, ra, rb, rc, addr):
+        tomado = self.reg[lanes, ra] != self.reg[lanes, rb]
+        self.pc[lanes] = np.where(tomado, self.base_adress + addr, pc + 1)
+
+    def _v_ret(self, lanes, pc, ra, rb, rc, addr):
+        self.pc[lanes] = self.base_adress + self.reg[lanes, 31].astype(np.int64)
+
+    def _v_halt(self, lanes, pc, ra, rb, rc, addr):
+        self.running[lanes] = False
+
+
+def verificar_contra_escalar(mem_instr, pc_start, reg_inicial, max_steps=1000, engine='despacho'):
+    """
+    Executa o mesmo programa vetorizado e em N Simuladores escalares
+    (N = len(reg_inicial)) e retorna a lista de lanes cujo estado final difere.
+    """
+    vet = SimuladorVetorizado(mem_instr, pc_start, n=len(reg_inicial), reg_inicial=reg_inicial)
+    vet.run(max_steps)
+
+    divergentes = []
+    for i, regs in enumerate(reg_inicial):
+        sim = Simulador(mem_instr, pc_start, engine=engine)
+        for r, valor in enumerate(regs):
+            sim.reg[r] = int(valor)
+        sim.run(max_steps)
+        escalar = (list(sim.reg), sim.pc,
+                   dict(sim.mem_data.itens_nao_zero()), sim.running)
+        if vet.estado(i) != escalar:
+            divergentes.append(i)
+    return divergentes
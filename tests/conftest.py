@@ -0,0 +1,5 @@
+import os
+import sys
+
+# os módulos do simulador ficam soltos em src/ (são executados como scripts)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,122 @@
+"""
+Testes diferenciais: os motores e as variantes de execução (avanço de laços,
+pipeline, vetorizado, checkpoint) têm de chegar ao mesmo estado que o motor
+classico, que é a referência.
+"""
+import glob
+import os
+import random
+
+import pytest
+
+import fuzzer
+from checkpoint import carregar_checkpoint
+from interpretador import Interpretador
+from simulador import Simulador
+
+TESTES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'testes')
+EXEMPLOS = sorted(glob.glob(os.path.join(TESTES, '*.asm')))
+VARIANTES = [e for e in fuzzer.variantes() if e != fuzzer.VETORIZADO]
+
+# laço contado: 1000 voltas de dec/bne, que o avanço de laços pula em forma fechada
+LACO = "address 0\nlcl r1, 1000\nlcl r2, 7\nstore r2, r1\ndec r1\nbne r1, r0, 3\nhalt\n"
+
+
+def carregar(texto):
+    interp = Interpretador(verbose=False)
+    interp.carregar_segmentos(interp.montar(texto))
+    mem_info = interp.exportar_memoria()
+    return mem_info['mem_instr'], mem_info['address_start']
+
+
+def estado(sim):
+    return (list(sim.reg), sim.pc, sim.running, sim.passos, dict(sim.mem_data.itens_nao_zero()))
+
+
+def programas_aleatorios(n, tamanho=32):
+    return [fuzzer.texto_programa(*fuzzer.gerar_programa(random.Random(s), tamanho)) for s in range(n)]
+
+
+@pytest.mark.parametrize('caminho', EXEMPLOS, ids=os.path.basename)
+def test_variantes_concordam_nos_exemplos(caminho):
+    with open(caminho) as f:
+        texto = f.read()
+    assert fuzzer.executar_diferencial(texto, VARIANTES, passos=100000, fatia=64) is None
+
+
+@pytest.mark.parametrize('fatia', [1, 16])
+def test_variantes_concordam_em_programas_aleatorios(fatia):
+    for texto in programas_aleatorios(150):
+        assert fuzzer.executar_diferencial(texto, VARIANTES, passos=300, fatia=fatia) is None, texto
+
+
+def test_vetorizado_concorda_em_programas_aleatorios():
+    pytest.importorskip('numpy')
+    for texto in programas_aleatorios(100):
+        falha = fuzzer.executar_diferencial(texto, [fuzzer.REFERENCIA, fuzzer.VETORIZADO], passos=300)
+        assert falha is None, texto
+
+
+@pytest.mark.parametrize('engine', Simulador.ENGINES)
+def test_avanco_de_lacos_igual_a_execucao_normal(engine):
+    mem_instr, inicio = carregar(LACO)
+    normal = Simulador(mem_instr, inicio, engine=engine)
+    normal.run(max_steps=10000)
+
+    avancando = Simulador(mem_instr, inicio, engine=engine)
+    avancando.ativar_avanco_lacos()
+    avancando.run(max_steps=10000)
+
+    assert avancando.passos_saltados > 0
+    assert estado(avancando) == estado(normal)
+
+
+@pytest.mark.parametrize('engine', Simulador.ENGINES)
+def test_avanco_de_lacos_respeita_max_steps(engine):
+    mem_instr, inicio = carregar(LACO)
+    for limite in (1, 5, 100, 1001, 2003):
+        normal = Simulador(mem_instr, inicio, engine=engine)
+        normal.run(max_steps=limite)
+        avancando = Simulador(mem_instr, inicio, engine=engine)
+        avancando.ativar_avanco_lacos()
+        avancando.run(max_steps=limite)
+        assert estado(avancando) == estado(normal), limite
+
+
+@pytest.mark.parametrize('engine', Simulador.ENGINES)
+def test_checkpoint_ida_e_volta(engine, tmp_path):
+    caminho = str(tmp_path / 'estado.ckpt')
+    mem_instr, inicio = carregar(LACO)
+    direto = Simulador(mem_instr, inicio, engine=engine)
+    direto.run(max_steps=1500)
+
+    parcial = Simulador(mem_instr, inicio, engine=engine)
+    parcial.run(max_steps=777, checkpoint_cada=100, checkpoint_arquivo=caminho)
+    assert parcial.passos == 777
+
+    retomado = carregar_checkpoint(caminho)
+    assert retomado.engine == engine
+    retomado.run(max_steps=1500 - 777)
+    assert estado(retomado) == estado(direto)
+
+    restaurado = Simulador(mem_instr, inicio, engine='classico')
+    restaurado.restaurar_checkpoint(caminho)
+    restaurado.run(max_steps=1500 - 777)
+    assert estado(restaurado) == estado(direto)
+
+
+def test_checkpoint_ida_e_volta_em_programas_aleatorios(tmp_path):
+    caminho = str(tmp_path / 'estado.ckpt')
+    for texto in programas_aleatorios(60):
+        mem_instr, inicio = carregar(texto)
+        direto = Simulador(mem_instr, inicio, engine='blocos')
+        try:
+            direto.run(max_steps=200)
+        except Exception:
+            continue
+        parcial = Simulador(mem_instr, inicio, engine='blocos')
+        parcial.run(max_steps=77)
+        parcial.salvar_checkpoint(caminho)
+        retomado = carregar_checkpoint(caminho)
+        retomado.run(max_steps=123)
+        assert estado(retomado) == estado(direto), texto